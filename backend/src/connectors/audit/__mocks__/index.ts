@@ -12,6 +12,7 @@ const audit = {
   onUpdateModelCard: vi.fn(),
 
   onViewFiles: vi.fn(),
+  onViewFile: vi.fn(),
   onDeleteFile: vi.fn(),
   onCreateFile: vi.fn(),
 
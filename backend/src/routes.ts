@@ -3,6 +3,7 @@ import path from 'path'
 import { fileURLToPath } from 'url'
 
 import authentication from './connectors/authentication/index.js'
+import { compressResponse } from './routes/middleware/compressResponse.js'
 import { expressErrorHandler } from './routes/middleware/expressErrorHandler.js'
 import { expressLogger } from './routes/middleware/expressLogger.js'
 import { requestId } from './routes/middleware/requestId.js'
@@ -75,6 +76,7 @@ export const server = express()
 
 server.use('/api/v2', requestId)
 server.use('/api/v2', expressLogger)
+server.use('/api/v2', compressResponse)
 const middlewareConfigs = authentication.authenticationMiddleware()
 for (const middlewareConf of middlewareConfigs) {
   server.use(middlewareConf?.path || '/', middlewareConf.middleware)
@@ -0,0 +1,51 @@
+import { NextFunction, Request, Response } from 'express'
+import { promisify } from 'util'
+import zlib from 'zlib'
+
+// JSON bodies smaller than this (in bytes) are sent uncompressed, as compressing them saves less than it costs
+export const compressionThreshold = 1024
+
+const brotliCompress = promisify(zlib.brotliCompress)
+const gzip = promisify(zlib.gzip)
+
+// In order of preference when the client accepts several
+const encoders = {
+  br: (payload: Buffer) => brotliCompress(payload, { params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 4 } }),
+  gzip: (payload: Buffer) => gzip(payload),
+}
+
+type Encoding = keyof typeof encoders
+
+function hasBody(req: Request, res: Response) {
+  return req.method !== 'HEAD' && res.statusCode >= 200 && res.statusCode !== 204 && res.statusCode !== 304
+}
+
+export async function compressResponse(req: Request, res: Response, next: NextFunction) {
+  const json = res.json.bind(res)
+  const send = res.send.bind(res)
+
+  res.json = (body?: unknown) => {
+    const encoding = req.headers['accept-encoding'] && req.acceptsEncodings(Object.keys(encoders))
+    const payload = Buffer.from(JSON.stringify(body) ?? '')
+    if (!encoding || payload.length < compressionThreshold || !hasBody(req, res)) {
+      return json(body)
+    }
+
+    res.vary('Accept-Encoding')
+    // Sent with res.send so the compressed body still gets an ETag and conditional requests still get a 304
+    encoders[encoding as Encoding](payload).then(
+      (compressed) => {
+        res.setHeader('Content-Type', 'application/json; charset=utf-8')
+        res.setHeader('Content-Encoding', encoding)
+        send(compressed)
+      },
+      (error) => {
+        req.log?.warn({ error }, 'Unable to compress response.')
+        json(body)
+      },
+    )
+    return res
+  }
+
+  next()
+}
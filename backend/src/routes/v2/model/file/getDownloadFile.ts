@@ -10,7 +10,7 @@ import { FileInterface, FileInterfaceDoc } from '../../../../models/File.js'
 import { downloadFile, getFileById } from '../../../../services/file.js'
 import { getFileByReleaseFileName } from '../../../../services/release.js'
 import { registerPath } from '../../../../services/specification.js'
-import { BadReq, InternalError } from '../../../../utils/error.js'
+import { BadReq, GenericError, InternalError } from '../../../../utils/error.js'
 import { parse } from '../../../../utils/validate.js'
 
 export const getDownloadFileSchema = z
@@ -54,6 +54,17 @@ registerPath({
         },
       },
     },
+    206: {
+      description: 'The requested byte range of the file.',
+      content: {
+        'application/octet-stream': {
+          schema: {
+            type: 'string',
+            format: 'binary',
+          },
+        },
+      },
+    },
   },
 })
 
@@ -80,6 +91,17 @@ registerPath({
         },
       },
     },
+    206: {
+      description: 'The requested byte range of the file.',
+      content: {
+        'application/octet-stream': {
+          schema: {
+            type: 'string',
+            format: 'binary',
+          },
+        },
+      },
+    },
   },
 })
 
@@ -99,15 +121,27 @@ export const getDownloadFile = [
       file = await getFileById(req.user, params.fileId)
     }
 
+    let range: { start: number; end: number } | undefined
     if (req.headers.range) {
-      // TODO: support ranges
-      throw BadReq('Ranges are not supported', { fileId: file._id })
+      const ranges = req.range(file.size, { combine: true })
+      if (ranges === -1) {
+        res.set('Content-Range', `bytes */${file.size}`)
+        throw GenericError(416, 'Range not satisfiable', { fileId: file._id, range: req.headers.range })
+      }
+      if (ranges === undefined || ranges === -2 || ranges.type !== 'bytes' || ranges.length !== 1) {
+        throw BadReq('Only a single byte range is supported', { fileId: file._id, range: req.headers.range })
+      }
+      range = { start: ranges[0].start, end: ranges[0].end }
     }
 
-    res.set('Content-Length', String(file.size))
-    // TODO: support ranges
-    // res.set('Accept-Ranges', 'bytes')
-    const stream = await downloadFile(req.user, file._id)
+    res.set('Accept-Ranges', 'bytes')
+    if (range) {
+      res.set('Content-Range', `bytes ${range.start}-${range.end}/${file.size}`)
+      res.set('Content-Length', String(range.end - range.start + 1))
+    } else {
+      res.set('Content-Length', String(file.size))
+    }
+    const stream = await downloadFile(req.user, file._id, range)
 
     if (!stream.Body) {
       throw InternalError('We were not able to retrieve the body of this file', { fileId: file._id })
@@ -120,7 +154,7 @@ export const getDownloadFile = [
     res.set('Content-Type', file.mime)
     res.set('Cache-Control', 'public, max-age=604800, immutable')
 
-    res.writeHead(200)
+    res.writeHead(range ? 206 : 200)
 
     // The AWS library doesn't seem to properly type 'Body' as being pipeable?
     ;(stream.Body as stream.Readable).pipe(res)
@@ -0,0 +1,62 @@
+import express from 'express'
+import supertest from 'supertest'
+import { describe, expect, test } from 'vitest'
+
+import { compressionThreshold, compressResponse } from '../../../src/routes/middleware/compressResponse.js'
+
+const app = express()
+app.use(compressResponse)
+app.get('/small', (_req, res) => res.json({ models: [] }))
+app.get('/large', (_req, res) => res.json({ models: 'x'.repeat(compressionThreshold) }))
+app.get('/empty', (_req, res) => res.status(204).json({ models: 'x'.repeat(compressionThreshold) }))
+
+describe('middleware > compressResponse', () => {
+  test('compresses large bodies', async () => {
+    const res = await supertest(app).get('/large').set('Accept-Encoding', 'gzip')
+
+    expect(res.statusCode).toBe(200)
+    expect(res.header['content-encoding']).toBe('gzip')
+    expect(res.header['vary']).toContain('Accept-Encoding')
+    expect(res.body).toEqual({ models: 'x'.repeat(compressionThreshold) })
+  })
+
+  test('prefers brotli', async () => {
+    const res = await supertest(app).get('/large').set('Accept-Encoding', 'gzip, br')
+
+    expect(res.header['content-encoding']).toBe('br')
+  })
+
+  test('leaves small bodies uncompressed', async () => {
+    const res = await supertest(app).get('/small').set('Accept-Encoding', 'gzip')
+
+    expect(res.header['content-encoding']).toBeUndefined()
+    expect(res.body).toEqual({ models: [] })
+  })
+
+  test('leaves bodies uncompressed for clients without compression', async () => {
+    const res = await supertest(app).get('/large').set('Accept-Encoding', 'identity')
+
+    expect(res.header['content-encoding']).toBeUndefined()
+  })
+
+  test('keeps etags and conditional requests', async () => {
+    const res = await supertest(app).get('/large').set('Accept-Encoding', 'gzip')
+    const cached = await supertest(app)
+      .get('/large')
+      .set('Accept-Encoding', 'gzip')
+      .set('If-None-Match', res.header['etag'])
+
+    expect(res.header['etag']).toBeDefined()
+    expect(cached.statusCode).toBe(304)
+  })
+
+  test('leaves responses without a body uncompressed', async () => {
+    const head = await supertest(app).head('/large').set('Accept-Encoding', 'gzip')
+    const empty = await supertest(app).get('/empty').set('Accept-Encoding', 'gzip')
+
+    expect(head.header['content-encoding']).toBeUndefined()
+    expect(head.text).toBeUndefined()
+    expect(empty.statusCode).toBe(204)
+    expect(empty.header['content-encoding']).toBeUndefined()
+  })
+})
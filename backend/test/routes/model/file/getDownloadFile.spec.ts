@@ -0,0 +1,71 @@
+import { Readable } from 'stream'
+import { describe, expect, test, vi } from 'vitest'
+
+import audit from '../../../../src/connectors/audit/__mocks__/index.js'
+import { testGet } from '../../../testUtils/routes.js'
+
+vi.mock('../../../../src/utils/config.js')
+vi.mock('../../../../src/utils/user.js')
+vi.mock('../../../../src/connectors/audit/index.js')
+vi.mock('../../../../src/connectors/authorisation/index.js')
+
+const fileMock = vi.hoisted(() => {
+  const content = Buffer.from('0123456789')
+  return {
+    getFileById: vi.fn(() => ({ _id: 'file-id', name: 'weights.bin', size: 10, mime: 'application/octet-stream' })),
+    downloadFile: vi.fn(async (_user: unknown, _fileId: string, range?: { start: number; end: number }) => ({
+      Body: Readable.from([range ? content.subarray(range.start, range.end + 1) : content]),
+    })),
+  }
+})
+vi.mock('../../../../src/services/file.js', () => fileMock)
+
+vi.mock('../../../../src/services/release.js', () => ({
+  getFileByReleaseFileName: vi.fn(),
+}))
+
+const path = '/api/v2/model/model-id/file/file-id/download'
+
+describe('routes > file > getDownloadFile', () => {
+  test('200 > ok', async () => {
+    const res = await testGet(path)
+
+    expect(res.statusCode).toBe(200)
+    expect(res.header['accept-ranges']).toBe('bytes')
+    expect(res.header['content-length']).toBe('10')
+    expect(res.header['content-range']).toBeUndefined()
+    expect(res.body.toString()).toBe('0123456789')
+    expect(fileMock.downloadFile.mock.calls.at(-1)?.at(2)).toBeUndefined()
+  })
+
+  test('206 > single range', async () => {
+    const res = await testGet(path).set('Range', 'bytes=2-5')
+
+    expect(res.statusCode).toBe(206)
+    expect(res.header['content-range']).toBe('bytes 2-5/10')
+    expect(res.header['content-length']).toBe('4')
+    expect(res.body.toString()).toBe('2345')
+    expect(fileMock.downloadFile.mock.calls.at(-1)?.at(2)).toEqual({ start: 2, end: 5 })
+  })
+
+  test('416 > unsatisfiable range', async () => {
+    const res = await testGet(path).set('Range', 'bytes=20-30')
+
+    expect(res.statusCode).toBe(416)
+    expect(res.header['content-range']).toBe('bytes */10')
+  })
+
+  test('400 > multiple ranges', async () => {
+    const res = await testGet(path).set('Range', 'bytes=0-1,5-6')
+
+    expect(res.statusCode).toBe(400)
+    expect(res.body.error.message).toBe('Only a single byte range is supported')
+  })
+
+  test('audit > expected call', async () => {
+    const res = await testGet(path).set('Range', 'bytes=0-3')
+
+    expect(res.statusCode).toBe(206)
+    expect(audit.onViewFile).toBeCalled()
+  })
+})
@@ -12,10 +12,14 @@ __version__ = "2.3.1"
 
 
 from bailo.core.agent import Agent, PkiAgent, TokenAgent
-from bailo.core.client import Client
-from bailo.core.enums import EntryKind, ModelVisibility, Role, SchemaKind
+from bailo.core.client import Client, ConcurrentClient
+from bailo.core.enums import EntryKind, FsyncPolicy, ModelVisibility, Role, SchemaKind
+from bailo.core.transport import HttpxTransport, RequestsTransport
 from bailo.helper.access_request import AccessRequest
+from bailo.helper.checkpoint import Checkpoint
 from bailo.helper.datacard import Datacard
 from bailo.helper.model import Experiment, Model
 from bailo.helper.release import Release
+from bailo.helper.review import Review, ReviewIndex
 from bailo.helper.schema import Schema
+from bailo.helper.sync import Mirror, Replicator
@@ -0,0 +1,252 @@
+"""Command line interface for transferring models and releases to and from Bailo.
+
+.. code-block:: console
+
+   $ bailo --url https://bailo.example.com download yolo-abc123 1.0.0 --path weights --workers 16 --resume
+   $ bailo --url https://bailo.example.com upload yolo-abc123 1.0.1 weights.pt config.yaml
+   $ bailo --url https://bailo.example.com release ls yolo-abc123
+   $ bailo --url https://bailo.example.com sync /data/bailo-mirror yolo-abc123 --dry-run
+
+Every command prints a JSON summary of what it did and how long it took to stdout, and errors to stderr as JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from bailo.core.agent import Agent, PkiAgent, TokenAgent
+from bailo.core.client import Client
+from bailo.core.enums import FsyncPolicy
+from bailo.core.exceptions import BailoException, ResponseException
+from bailo.core.transport import HttpxTransport
+from bailo.core.utils import MAX_WORKERS
+from bailo.helper.release import ZSTD_LEVEL, Release, is_complete, local_name
+from bailo.helper.sync import CHUNK_SIZE, Mirror
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the bailo command line interface.
+
+    :param argv: Command line arguments, defaults to sys.argv
+    :return: Exit code
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.url is None:
+        parser.error("--url or $BAILO_URL is required")
+
+    if getattr(args, "extract", False) and args.cache is not None:
+        parser.error("--extract cannot be used with --cache")
+
+    start = time.perf_counter()
+    try:
+        summary = args.func(_client(args), args)
+    except (BailoException, ResponseException, OSError, ImportError) as e:
+        print(json.dumps({"command": args.command, "error": str(e)}), file=sys.stderr)
+        return 1
+
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    if "bytes" in summary:
+        summary["bytes_per_second"] = round(summary["bytes"] / summary["seconds"]) if summary["seconds"] else None
+    print(json.dumps({"command": args.command, **summary}, default=str))
+    return 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="bailo", description="Transfer models and releases to and from Bailo.")
+    parser.add_argument("--url", default=os.environ.get("BAILO_URL"), help="Bailo URL, defaults to $BAILO_URL")
+    parser.add_argument(
+        "--auth", choices=("none", "token", "pki"), default="none", help="Authentication method, defaults to none"
+    )
+    parser.add_argument("--cert", help="Path to PKI cert file")
+    parser.add_argument("--key", help="Path to PKI key file")
+    parser.add_argument("--ca", help="Path to certificate authority file")
+    parser.add_argument("--no-progress", action="store_true", help="Hide progress bars")
+    parser.add_argument("--rate", type=float, help="Maximum metadata requests per second")
+    parser.add_argument("--max-in-flight", type=int, help="Maximum concurrent metadata requests")
+    parser.add_argument("--transfer-rate", type=float, help="Maximum transfers started per second")
+    parser.add_argument("--max-transfers", type=int, help="Maximum concurrent transfers")
+    parser.add_argument("--bandwidth", type=float, help="Maximum bytes per second across all transfers")
+    parser.add_argument("--http2", action="store_true", help="Multiplex requests over HTTP/2, needs httpx")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    download = commands.add_parser("download", help="Download the files of a release")
+    download.add_argument("model_id")
+    download.add_argument("version")
+    download.add_argument("--path", default=os.getcwd(), help="Local directory to write files to")
+    download.add_argument("--include", nargs="*", help="Fnmatch statements for file names to include")
+    download.add_argument("--exclude", nargs="*", help="Fnmatch statements for file names to exclude")
+    download.add_argument("--resume", action="store_true", help="Skip files already downloaded with the expected size")
+    download.add_argument("--cache", help="Directory of previously downloaded files, laid out as by bailo sync")
+    download.add_argument("--extract", action="store_true", help="Extract zip files as they download")
+    download.add_argument(
+        "--no-decompress", action="store_true", help="Keep compressed files compressed, as with --cache"
+    )
+    download.add_argument(
+        "--fsync",
+        choices=[str(policy) for policy in FsyncPolicy],
+        default=str(FsyncPolicy.NONE),
+        help="When to flush downloaded files to disk",
+    )
+    _transfer_options(download)
+    download.set_defaults(func=_download)
+
+    upload = commands.add_parser("upload", help="Upload files or directories to an existing release")
+    upload.add_argument("model_id")
+    upload.add_argument("version")
+    upload.add_argument("paths", nargs="+")
+    upload.add_argument("--workers", type=int, default=MAX_WORKERS, help="Maximum concurrent transfers")
+    upload.add_argument(
+        "--compress",
+        type=int,
+        nargs="?",
+        const=ZSTD_LEVEL,
+        default=0,
+        metavar="LEVEL",
+        help=f"Compress files with zstd, at level {ZSTD_LEVEL} unless given, needs zstandard",
+    )
+    upload.set_defaults(func=_upload)
+
+    release = commands.add_parser("release", help="Manage releases")
+    release_commands = release.add_subparsers(dest="release_command", required=True)
+    release_ls = release_commands.add_parser("ls", help="List the releases of a model")
+    release_ls.add_argument("model_id")
+    release_ls.set_defaults(func=_release_ls)
+
+    sync = commands.add_parser("sync", help="Mirror models, releases and files into a local directory")
+    sync.add_argument("path")
+    sync.add_argument("model_ids", nargs="+")
+    sync.add_argument("--dry-run", action="store_true", help="Only report what would be transferred")
+    sync.add_argument("--verify", action="store_true", help="Re-hash local files rather than trusting their size")
+    sync.add_argument("--no-prune", action="store_true", help="Keep local files no longer in any release")
+    sync.add_argument("--workers", type=int, default=MAX_WORKERS, help="Maximum concurrent transfers")
+    sync.set_defaults(func=_sync)
+
+    return parser
+
+
+def _transfer_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Maximum concurrent transfers")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Bytes written to disk at a time")
+
+
+def _client(args: argparse.Namespace) -> Client:
+    limits = {
+        "rate": args.rate,
+        "max_in_flight": args.max_in_flight,
+        "transfer_rate": args.transfer_rate,
+        "max_transfers": args.max_transfers,
+        "transport": HttpxTransport() if args.http2 else None,
+    }
+    if args.auth == "pki":
+        agent = PkiAgent(cert=args.cert, key=args.key, auth=args.ca, **limits)
+    elif args.auth == "token":
+        agent = TokenAgent(**limits)
+    else:
+        agent = Agent(verify=args.ca if args.ca is not None else True, **limits)
+
+    return Client(args.url, agent, bandwidth=args.bandwidth, progress=not args.no_progress)
+
+
+def _download(client: Client, args: argparse.Namespace) -> dict[str, Any]:
+    release = Release.from_version(client, args.model_id, args.version)
+    if args.cache is None:
+        names = release.download_all(
+            path=args.path,
+            include=args.include,
+            exclude=args.exclude,
+            max_workers=args.workers,
+            chunk_size=args.chunk_size,
+            resume=args.resume,
+            fsync=args.fsync,
+            extract=args.extract,
+            decompress=not args.no_decompress,
+        )
+        local_names = [local_name(name, args.extract, not args.no_decompress) for name in names]
+        return {"files": names, "bytes": sum(_size(os.path.join(args.path, name)) for name in local_names)}
+
+    files = release.select_files(args.include, args.exclude)
+    if args.resume:
+        files = [file for file in files if not is_complete(os.path.join(args.path, file["name"]), file.get("size"))]
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        transferred = list(executor.map(lambda file: _download_cached(release, file, args), files))
+
+    return {
+        "files": [file["name"] for file in files],
+        "bytes": sum(transferred),
+        "cached": sum(1 for size in transferred if size == 0),
+    }
+
+
+def _download_cached(release: Release, file: dict[str, Any], args: argparse.Namespace) -> int:
+    cached = os.path.join(args.cache, release.model_id, "files", file["_id"], os.path.basename(file["name"]))
+    transferred = 0
+    if not is_complete(cached, file.get("size")):
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        # The cache holds files exactly as they are on the server, as laid out by bailo sync
+        release.download(file["name"], path=cached, chunk_size=args.chunk_size, fsync=args.fsync, decompress=False)
+        transferred = os.path.getsize(cached)
+
+    path = os.path.join(args.path, file["name"])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+    try:
+        # Files are never changed in place, so the cache and destination can share the same data on disk
+        os.link(cached, path)
+    except OSError:
+        shutil.copyfile(cached, path)
+
+    return transferred
+
+
+def _size(path: str) -> int:
+    """Get the size of a file, or of every file within a directory."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def _upload(client: Client, args: argparse.Namespace) -> dict[str, Any]:
+    release = Release.from_version(client, args.model_id, args.version)
+    file_ids = release.upload_all(args.paths, max_workers=args.workers, compress=args.compress)
+
+    return {
+        "files": dict(zip(args.paths, file_ids)),
+        "bytes": sum(_size(path) for path in args.paths),
+    }
+
+
+def _release_ls(client: Client, args: argparse.Namespace) -> dict[str, Any]:
+    releases = client.get_all_releases(model_id=args.model_id)["releases"]
+
+    return {
+        "releases": [
+            {
+                "version": release["semver"],
+                "draft": release.get("draft", False),
+                "files": len(release.get("fileIds", [])),
+                "created_at": release.get("createdAt"),
+            }
+            for release in releases
+        ]
+    }
+
+
+def _sync(client: Client, args: argparse.Namespace) -> dict[str, Any]:
+    mirror = Mirror(client, args.path, max_workers=args.workers)
+    plan = mirror.sync(args.model_ids, dry_run=args.dry_run, prune=not args.no_prune, verify=args.verify)
+
+    return {
+        "dry_run": args.dry_run,
+        "files": [file["name"] for file in plan["download"]],
+        "removed": [file["name"] for file in plan["remove"]],
+        "bytes": plan["bytes"],
+    }
@@ -1,12 +1,37 @@
 from __future__ import annotations
 
+import copy
+import gzip
+import json
+from concurrent.futures import Future
 from json import JSONDecodeError
+from typing import Any
 
 import requests
 import os
 import getpass
+import threading
 from requests.auth import HTTPBasicAuth
 from bailo.core.exceptions import BailoException, ResponseException
+from bailo.core.transport import RequestsTransport, _ssl_context
+from bailo.core.utils import TokenBucket
+
+try:
+    import brotli
+
+    brotli_available = True
+except ImportError:
+    brotli_available = False
+
+try:
+    import zstandard
+
+    zstandard_available = True
+except ImportError:
+    zstandard_available = False
+
+# JSON request bodies smaller than this many bytes are sent uncompressed, as compressing them saves less than it costs
+COMPRESSION_THRESHOLD = 1024
 
 
 class Agent:
@@ -18,25 +43,158 @@ class Agent:
     def __init__(
         self,
         verify: str | bool = True,
+        rate: float | None = None,
+        max_in_flight: int | None = None,
+        transfer_rate: float | None = None,
+        max_transfers: int | None = None,
+        transport: Any = None,
+        coalesce: bool = False,
+        compression: str | None = None,
     ):
         """Initiate a standard agent.
 
+        Metadata calls and bulk transfers (streamed uploads and downloads) are limited separately, so small API calls
+        are not stuck behind large transfers. Every helper using a client shares the limits of its agent.
+
+        With coalesce, identical GET requests (by url, query parameters and headers) made from several threads at once
+        are sent only once. Every caller is given its own copy of the response, parsed separately, or the same error.
+
+        With compression, JSON request bodies of at least COMPRESSION_THRESHOLD bytes are compressed. If the server turns
+        the encoding down, the request is sent again uncompressed, and the agent stops compressing. Responses are compressed by the
+        server with any encoding the transport accepts, and decompressed as they are read.
+
         :param verify: Path to certificate authority file, or bool for SSL verification.
+        :param rate: Maximum metadata requests per second, defaults to unlimited
+        :param max_in_flight: Maximum concurrent metadata requests, defaults to unlimited
+        :param transfer_rate: Maximum transfers started per second, defaults to unlimited
+        :param max_transfers: Maximum concurrent transfers, defaults to unlimited
+        :param transport: Object used to send requests, such as HttpxTransport, defaults to a RequestsTransport
+        :param coalesce: Share one request between identical concurrent GET requests, defaults to False
+        :param compression: Encoding of large JSON request bodies, one of gzip, br or zstd, or None to send them
+            uncompressed, defaults to None
         """
+        if compression is not None and compression not in _COMPRESSORS:
+            raise BailoException(f"Unknown compression {compression}, expected one of {', '.join(_COMPRESSORS)}.")
+        if compression == "br" and not brotli_available:
+            raise ImportError("Optional brotli dependencies (needed for this compression) are not installed.")
+        if compression == "zstd" and not zstandard_available:
+            raise ImportError("Optional zstandard dependencies (needed for this compression) are not installed.")
+
         self.verify = verify
+        self.transport = transport if transport is not None else RequestsTransport()
+        self.coalesce = coalesce
+        self.compression = compression
+
+        # Futures of the GET requests currently being sent, by request
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self.limit(rate=rate, max_in_flight=max_in_flight, transfer_rate=transfer_rate, max_transfers=max_transfers)
+
+    def limit(
+        self,
+        rate: float | None = None,
+        max_in_flight: int | None = None,
+        transfer_rate: float | None = None,
+        max_transfers: int | None = None,
+    ) -> None:
+        """Set the rate and concurrency limits of the agent, replacing any existing limits.
+
+        :param rate: Maximum metadata requests per second, defaults to unlimited
+        :param max_in_flight: Maximum concurrent metadata requests, defaults to unlimited
+        :param transfer_rate: Maximum transfers started per second, defaults to unlimited
+        :param max_transfers: Maximum concurrent transfers, defaults to unlimited
+        ..note:: Requests already in flight keep counting against the limits they started under.
+        """
+        self.metadata_budget = _Budget(rate, max_in_flight)
+        self.transfer_budget = _Budget(transfer_rate, max_transfers)
 
     def __request(self, method, *args, **kwargs):
         kwargs["verify"] = self.verify
 
-        res = requests.request(method, *args, **kwargs)
+        if self.compression is not None and kwargs.get("json") is not None:
+            return self.__send_compressed(method, *args, **kwargs)
+
+        key = self.__coalesce_key(method, args, kwargs)
+        if key is None:
+            return self.__send(method, *args, **kwargs)
+
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+
+        if not leader:
+            # The body is shared, but each caller parses it into objects of its own
+            return copy.copy(future.result())
+
+        try:
+            res = self.__send(method, *args, **kwargs)
+        except BaseException as e:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self._in_flight_lock:
+            del self._in_flight[key]
+        future.set_result(res)
+        return res
+
+    def __coalesce_key(self, method, args, kwargs) -> str | None:
+        # Only requests without side effects or a body to stream can be shared
+        if not self.coalesce or method != "GET" or kwargs.get("stream") or "data" in kwargs or "json" in kwargs:
+            return None
+        url = args[0] if args else kwargs.get("url")
+        return json.dumps([url, kwargs.get("params"), kwargs.get("headers")], sort_keys=True, default=str)
+
+    def __send_compressed(self, method, *args, **kwargs):
+        # Serialised as requests would, so uncompressed bodies are unchanged
+        body = json.dumps(kwargs.pop("json"), allow_nan=False).encode()
+        headers = {**(kwargs.pop("headers", None) or {}), "Content-Type": "application/json"}
+
+        compression = self.compression
+        if compression is not None and len(body) >= COMPRESSION_THRESHOLD:
+            try:
+                return self.__send(
+                    method,
+                    *args,
+                    data=_COMPRESSORS[compression](body),
+                    headers={**headers, "Content-Encoding": compression},
+                    **kwargs,
+                )
+            except _UnsupportedEncoding:
+                self.compression = None
+
+        return self.__send(method, *args, data=body, headers=headers, **kwargs)
+
+    def __send(self, method, *args, **kwargs):
+        # Uploads and downloads are the only streamed requests
+        streamed = kwargs.get("stream", False)
+        budget = self.transfer_budget if streamed else self.metadata_budget
+        budget.acquire()
+        try:
+            res = self.transport.request(method, *args, **kwargs)
+        except BaseException:
+            budget.release()
+            raise
 
         # Check response for a valid range
         if res.status_code < 400:
+            if streamed:
+                _release_when_consumed(res, budget.release)
+            else:
+                budget.release()
             return res
 
+        budget.release()
+
+        if res.status_code == 415 and "Content-Encoding" in (kwargs.get("headers") or {}):
+            raise _UnsupportedEncoding()
+
         try:
             # Give the error message issued by bailo
-            raise BailoException(res.json()["error"]["message"])
+            raise BailoException(res.json()["error"]["message"], status_code=res.status_code)
         except JSONDecodeError:
             # No response given
             raise ResponseException(f"{res.status_code} Cannot {method} to {res.request.url}")
@@ -66,14 +224,25 @@ class PkiAgent(Agent):
         cert: str,
         key: str,
         auth: str,
+        share_sessions: bool = True,
+        **limits,
     ):
         """Initiate an agent for PKI authentication.
 
+        The certificates are loaded once into an SSL context used by every connection of the agent, and each new
+        connection resumes an earlier TLS session where the server allows, rather than repeating the full handshake.
+
         :param cert: Path to cert file
         :param key: Path to key file
         :param auth: Path to certificate authority file
+        :param share_sessions: Share the SSL context and TLS sessions with other agents in the process using the same
+            certificates, defaults to True
+        :param limits: Rate and concurrency limits, and transport, see Agent
         """
-        super().__init__(verify=auth)
+        self.ssl_context = _ssl_context(auth, (cert, key), shared=share_sessions)
+        if limits.get("transport") is None:
+            limits["transport"] = RequestsTransport(ssl_context=self.ssl_context)
+        super().__init__(verify=auth, **limits)
 
         self.cert = cert
         self.key = key
@@ -99,13 +268,15 @@ class TokenAgent(Agent):
         self,
         access_key: str | None = None,
         secret_key: str | None = None,
+        **limits,
     ):
         """Initiate an agent for API token authentication.
 
         :param access_key: Access key
         :param secret_key: Secret key
+        :param limits: Rate and concurrency limits, and transport, see Agent
         """
-        super().__init__()
+        super().__init__(**limits)
 
         if access_key is None:
             try:
@@ -137,3 +308,65 @@ class TokenAgent(Agent):
 
     def delete(self, *args, **kwargs):
         return super().delete(*args, auth=self.basic, **kwargs)
+
+
+class _UnsupportedEncoding(Exception):
+    """Raised when the server will not accept a compressed request body."""
+
+
+_COMPRESSORS = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6),
+    "br": lambda body: brotli.compress(body, quality=4),
+    "zstd": lambda body: zstandard.ZstdCompressor().compress(body),
+}
+
+
+class _Budget:
+    """A request rate and a number of requests allowed in flight at once, either of which may be unlimited."""
+
+    def __init__(self, rate: float | None = None, max_in_flight: int | None = None):
+        self.rate = rate
+        self.max_in_flight = max_in_flight
+        self._bucket = TokenBucket(rate) if rate else None
+        self._semaphore = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+
+    def acquire(self) -> None:
+        # Wait for the rate first, so a slot is never held while sleeping
+        if self._bucket is not None:
+            self._bucket.acquire()
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+
+    def release(self) -> None:
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+
+def _release_when_consumed(res: requests.Response, release) -> None:
+    """Hold a streamed response's slot until its content has been read or it is closed."""
+    lock = threading.Lock()
+    released = []
+
+    def release_once():
+        with lock:
+            if released:
+                return
+            released.append(True)
+        release()
+
+    iter_content, close = res.iter_content, res.close
+
+    def iter_content_then_release(*args, **kwargs):
+        try:
+            yield from iter_content(*args, **kwargs)
+        finally:
+            release_once()
+
+    def close_then_release():
+        try:
+            close()
+        finally:
+            release_once()
+
+    res.iter_content = iter_content_then_release
+    res.close = close_then_release
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from io import BytesIO
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
 
 from bailo.core.agent import Agent, TokenAgent
 from bailo.core.enums import EntryKind, ModelVisibility, SchemaKind
-from bailo.core.utils import filter_none
+from bailo.core.utils import MAX_WORKERS, Throttle, filter_none
 
 
 class Client:
@@ -13,11 +18,25 @@ class Client:
 
     :param url: Url of bailo website
     :param agent: An agent object to handle requests
+    :param bandwidth: Maximum bytes per second across all uploads and downloads, defaults to unlimited
+    :param progress: Show progress bars for uploads and downloads, defaults to True
+    ..note:: The bandwidth limit can be changed at any time by setting client.bandwidth.rate.
     """
 
-    def __init__(self, url: str, agent: Agent = Agent()):
+    def __init__(self, url: str, agent: Agent = Agent(), bandwidth: float | None = None, progress: bool = True):
         self.url = url.rstrip("/") + "/api"
         self.agent = agent
+        self.bandwidth = Throttle(bandwidth)
+        self.progress = progress
+
+    def concurrent(self, max_workers: int = MAX_WORKERS, max_queued: int | None = None) -> ConcurrentClient:
+        """Get a view of the client whose methods run in a thread pool and return futures.
+
+        :param max_workers: Maximum number of calls running at once, defaults to MAX_WORKERS
+        :param max_queued: Maximum number of calls waiting to run before submitting blocks, defaults to max_workers
+        :return: A ConcurrentClient for this client
+        """
+        return ConcurrentClient(self, max_workers=max_workers, max_queued=max_queued)
 
     def post_model(
         self,
@@ -299,20 +318,28 @@ class Client:
         self,
         model_id: str,
         file_id: str,
+        byte_range: tuple[int, int] | None = None,
     ):
         """Download a specific file by it's id.
 
         :param model_id: Unique model ID
         :param file_id: Unique file ID
+        :param byte_range: Inclusive start and end byte offsets to download, defaults to the whole file
         :return: The unique file ID
         """
         if isinstance(self.agent, TokenAgent):
             return self.agent.get(
-                f"{self.url}/v2/token/model/{model_id}/file/{file_id}/download", stream=True, timeout=10_000
+                f"{self.url}/v2/token/model/{model_id}/file/{file_id}/download",
+                headers=_range_headers(byte_range),
+                stream=True,
+                timeout=10_000,
             )
         else:
             return self.agent.get(
-                f"{self.url}/v2/model/{model_id}/file/{file_id}/download", stream=True, timeout=10_000
+                f"{self.url}/v2/model/{model_id}/file/{file_id}/download",
+                headers=_range_headers(byte_range),
+                stream=True,
+                timeout=10_000,
             )
 
     def get_download_by_filename(
@@ -320,23 +347,30 @@ class Client:
         model_id: str,
         semver: str,
         filename: str,
+        byte_range: tuple[int, int] | None = None,
     ):
         """Download a specific file.
 
         :param model_id: Unique model ID
         :param semver: Semver of the release
         :param filename: The filename trying to download from
+        :param byte_range: Inclusive start and end byte offsets to download, defaults to the whole file
         :return: The filename
+        ..note:: A ranged download returns 206 Partial Content, unless the server ignores ranges and returns 200.
         """
         if isinstance(self.agent, TokenAgent):
             return self.agent.get(
                 f"{self.url}/v2/token/model/{model_id}/release/{semver}/file/{filename}/download",
+                headers=_range_headers(byte_range),
                 stream=True,
                 timeout=10_000,
             )
         else:
             return self.agent.get(
-                f"{self.url}/v2/model/{model_id}/release/{semver}/file/{filename}/download", stream=True, timeout=10_000
+                f"{self.url}/v2/model/{model_id}/release/{semver}/file/{filename}/download",
+                headers=_range_headers(byte_range),
+                stream=True,
+                timeout=10_000,
             )
 
     def simple_upload(self, model_id: str, name: str, buffer: BytesIO):
@@ -660,3 +694,148 @@ class Client:
             f"{self.url}/v2/model/{model_id}/access-request/{access_request_id}",
             json=filtered_json,
         ).json()
+
+
+class ConcurrentClient:
+    """A view of a client whose methods run in a thread pool, each returning a concurrent.futures.Future.
+
+    Calls share the client's agent, so they reuse its connections and count against its rate and concurrency limits.
+    Submitting blocks while max_workers calls are running and max_queued more are waiting, so submitting a large number
+    of calls never holds more than that in memory. Leaving a with block because of an error cancels every call not yet
+    started.
+
+    .. code-block:: python
+
+       with client.concurrent(max_workers=16) as pool:
+           model = pool.get_model("yolo-abc123")
+           releases = pool.get_all_releases("yolo-abc123")
+           print(model.result(), releases.result())
+
+           for model in pool.map(client.get_model, model_ids):
+               print(model["model"]["name"])
+
+    :param client: A client object used to interact with Bailo
+    :param max_workers: Maximum number of calls running at once, defaults to MAX_WORKERS
+    :param max_queued: Maximum number of calls waiting to run before submitting blocks, defaults to max_workers
+    """
+
+    def __init__(self, client: Client, max_workers: int = MAX_WORKERS, max_queued: int | None = None) -> None:
+        if max_queued is None:
+            max_queued = max_workers
+
+        self.client = client
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Callable[..., Future]:
+        if name.startswith("_") or name == "client":
+            raise AttributeError(name)
+
+        method = getattr(self.client, name)
+        if not callable(method):
+            raise AttributeError(f"{name} is not a Client method")
+
+        @functools.wraps(method)
+        def submit(*args, **kwargs) -> Future:
+            return self.submit(method, *args, **kwargs)
+
+        return submit
+
+    def __enter__(self) -> ConcurrentClient:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            self.cancel()
+        self.shutdown()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Run a function in the thread pool, waiting for room in the queue first.
+
+        :param fn: Function to run, usually a method of the client
+        :param args: Positional arguments to fn
+        :param kwargs: Keyword arguments to fn
+        :return: Future of the function's result
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def map(
+        self, fn: Callable[..., Any] | str, *iterables: Iterable[Any], timeout: float | None = None
+    ) -> Iterator[Any]:
+        """Call a function for every item of the iterables in the thread pool, yielding the results in order.
+
+        Unlike Executor.map, calls are only submitted as results are consumed, so at most max_workers + max_queued
+        results are held at once. Closing the iterator early, or an error from any call, cancels calls not yet started.
+
+        :param fn: Function to call, or the name of a client method
+        :param iterables: Iterables of arguments, one for each positional argument of fn
+        :param timeout: Seconds to wait for all results from when map is called, defaults to no limit
+        :raises TimeoutError: If the results are not all returned in time
+        :return: Iterator of results
+        """
+        if isinstance(fn, str):
+            fn = getattr(self.client, fn)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        return self._map(fn, zip(*iterables), deadline)
+
+    def _map(self, fn: Callable[..., Any], calls: Iterator[tuple[Any, ...]], deadline: float | None) -> Iterator[Any]:
+        futures = deque()
+        try:
+            for args in calls:
+                if len(futures) >= self.max_workers + self.max_queued:
+                    yield _result(futures.popleft(), deadline)
+                futures.append(self.submit(fn, *args))
+            while futures:
+                yield _result(futures.popleft(), deadline)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def cancel(self) -> int:
+        """Cancel every call that has not started yet.
+
+        :return: Number of calls cancelled
+        """
+        with self._lock:
+            pending = list(self._pending)
+        return sum(future.cancel() for future in pending)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting calls, and free the thread pool once the calls already submitted have finished.
+
+        :param wait: Wait for the calls already submitted to finish, defaults to True
+        """
+        self._executor.shutdown(wait=wait)
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+
+def _result(future: Future, deadline: float | None) -> Any:
+    if deadline is None:
+        return future.result()
+    return future.result(max(deadline - time.monotonic(), 0))
+
+
+def _range_headers(byte_range: tuple[int, int] | None) -> dict[str, str] | None:
+    if byte_range is None:
+        return None
+    start, end = byte_range
+    return {"Range": f"bytes={start}-{end}"}
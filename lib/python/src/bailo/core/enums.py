@@ -35,3 +35,11 @@ class EntryKind(ValuedEnum):
 
     MODEL = "model"
     DATACARD = "data-card"
+
+
+class FsyncPolicy(ValuedEnum):
+    """When to flush downloaded files to disk."""
+
+    NONE = "none"
+    END = "end"
+    PERIODIC = "periodic"
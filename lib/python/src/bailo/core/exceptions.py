@@ -2,8 +2,23 @@ from __future__ import annotations
 
 
 class BailoException(Exception):
-    """General exception for Bailo response errors."""
+    """General exception for Bailo response errors.
+
+    :param status_code: HTTP status code of the response giving the error, if any
+    """
+
+    def __init__(self, *args, status_code: int | None = None):
+        super().__init__(*args)
+        self.status_code = status_code
 
 
 class ResponseException(Exception):
     """Exception used if an endpoint gave no response."""
+
+
+class SchemaValidationException(BailoException):
+    """Exception used if metadata fails local validation against its schema."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import json
+import os
+import ssl
+import threading
+from typing import Any, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from requests.utils import DEFAULT_CA_BUNDLE_PATH, super_len
+
+try:
+    import httpx
+
+    httpx_available = True
+except ImportError:
+    httpx_available = False
+
+# Number of bytes read at a time from file-like request bodies sent with httpx
+CONTENT_CHUNK_SIZE = 1024 * 1024
+
+# SSL contexts shared by every agent in the process, keyed by certificate paths and modification times
+_CONTEXTS = {}
+_CONTEXTS_LOCK = threading.Lock()
+
+
+class RequestsTransport:
+    """Send requests with requests over HTTP/1.1, reusing connections through a single session.
+
+    :param ssl_context: Context used for every https connection in place of the verify and cert arguments of each
+        request, so certificates are loaded once and TLS sessions are resumed, defaults to building one per connection
+    """
+
+    def __init__(self, ssl_context: ssl.SSLContext | None = None) -> None:
+        # A single session keeps connections (and their TLS handshakes) alive between requests
+        self.session = requests.Session()
+        self.ssl_context = ssl_context
+        if ssl_context is not None:
+            self.session.mount("https://", _SSLContextAdapter(ssl_context))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request.
+
+        :param method: HTTP method
+        :param url: Url to send the request to
+        :param kwargs: Any arguments to requests.Session.request
+        :return: Response object
+        """
+        return self.session.request(method, url, **kwargs)
+
+
+class HttpxTransport:
+    """Send requests with httpx, multiplexing concurrent requests over a single HTTP/2 connection per host.
+
+    Requests take the same arguments as with RequestsTransport, so PkiAgent certificates and TokenAgent credentials
+    work unchanged, and responses offer the parts of the requests response interface used by the client and helpers.
+
+    .. code-block:: python
+
+       agent = PkiAgent(cert="user.crt", key="user.key", auth="ca.crt", transport=HttpxTransport())
+       client = Client("https://bailo.example.com", agent)
+
+    :param http2: Negotiate HTTP/2 where the server supports it, defaults to True
+    :param max_connections: Maximum number of connections kept open per agent, defaults to 10
+    ..note:: HTTP/2 is negotiated during the TLS handshake, so plain http urls use HTTP/1.1.
+    """
+
+    def __init__(self, http2: bool = True, max_connections: int = 10) -> None:
+        if not httpx_available:
+            raise ImportError("Optional httpx dependencies (needed for this transport) are not installed.")
+
+        self.http2 = http2
+        self.max_connections = max_connections
+
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: dict[str, Any] | None = None,
+        json: Any = None,
+        data: Any = None,
+        headers: dict[str, str] | None = None,
+        auth: HTTPBasicAuth | tuple[str, str] | None = None,
+        cert: tuple[str, str] | None = None,
+        verify: str | bool = True,
+        stream: bool = False,
+        timeout: float | None = None,
+    ) -> _HttpxResponse:
+        """Send a request.
+
+        :param method: HTTP method
+        :param url: Url to send the request to
+        :param params: Query parameters, where None values are left out
+        :param json: JSON body
+        :param data: Bytes, file-like or iterable body
+        :param headers: Request headers
+        :param auth: Basic authentication credentials
+        :param cert: Paths to the client certificate and key
+        :param verify: Path to certificate authority file, or bool for SSL verification
+        :param stream: Leave the body to be read through iter_content, defaults to False
+        :param timeout: Seconds to wait for the server, defaults to no limit
+        :return: Response object
+        """
+        client = self._client(verify, cert)
+        headers = dict(headers or {})
+
+        if isinstance(auth, HTTPBasicAuth):
+            auth = (auth.username, auth.password)
+        if params is not None:
+            # Match how requests encodes query parameters
+            params = {
+                key: str(value) if isinstance(value, bool) else value
+                for key, value in params.items()
+                if value is not None
+            }
+
+        content = None
+        if data is not None:
+            length = super_len(data)
+            if length:
+                headers.setdefault("Content-Length", str(length))
+            content = _content(data)
+
+        request = client.build_request(
+            method, url, params=params, json=json, content=content, headers=headers, timeout=timeout
+        )
+        return _HttpxResponse(client.send(request, auth=auth, stream=stream))
+
+    def _client(self, verify: str | bool, cert: tuple[str, str] | None) -> httpx.Client:
+        key = (verify, cert)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = httpx.Client(
+                    http2=self.http2,
+                    verify=_ssl_context(verify, cert),
+                    limits=httpx.Limits(max_connections=self.max_connections),
+                )
+            return self._clients[key]
+
+
+class _HttpxResponse:
+    """An httpx response, presented with the parts of the requests response interface used by Bailo."""
+
+    def __init__(self, response: httpx.Response) -> None:
+        self._response = response
+        self._content = None
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.request = response.request
+
+    @property
+    def content(self) -> bytes:
+        # Read through iter_content, as requests does, so anything wrapping it sees the body consumed
+        if self._content is None:
+            self._content = b"".join(self.iter_content(CONTENT_CHUNK_SIZE))
+        return self._content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self._response.encoding or "utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        if self._content is not None:
+            return iter([self._content])
+        return self._response.iter_bytes(chunk_size)
+
+    def close(self) -> None:
+        self._response.close()
+
+
+class _SSLContextAdapter(HTTPAdapter):
+    """A requests adapter opening every connection with the same SSL context."""
+
+    def __init__(self, ssl_context: ssl.SSLContext, **kwargs) -> None:
+        self.ssl_context = ssl_context
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs, **self._pool_kwargs())
+
+    def proxy_manager_for(self, *args, **kwargs):
+        return super().proxy_manager_for(*args, **kwargs, **self._pool_kwargs())
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        # Since requests 2.32, certificate paths are otherwise given to every pool to load into the context again
+        host_params, _ = super().build_connection_pool_key_attributes(request, verify)
+        return host_params, self._pool_kwargs()
+
+    def cert_verify(self, conn, url, verify, cert) -> None:
+        # Certificates are already loaded into the context, so connections are not given paths to load again
+        pass
+
+    def _pool_kwargs(self) -> dict[str, Any]:
+        # urllib3 sets the verify mode of the context it is given from cert_reqs
+        return {"ssl_context": self.ssl_context, "cert_reqs": self.ssl_context.verify_mode}
+
+
+class _ResumableSocket(ssl.SSLSocket):
+    """An SSL socket handing its TLS session back to its context when closed.
+
+    TLS 1.3 session tickets arrive after the handshake, so the session is only worth resuming once the connection has
+    been used.
+    """
+
+    def close(self) -> None:
+        self.context._keep_session(self)
+        super().close()
+
+
+class _ResumingSSLContext(ssl.SSLContext):
+    """An SSL context resuming the last TLS session with each server, skipping the full handshake where it can."""
+
+    sslsocket_class = _ResumableSocket
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+
+    def wrap_socket(self, sock, *args, server_hostname: str | None = None, session=None, **kwargs) -> ssl.SSLSocket:
+        if session is None:
+            with self._sessions_lock:
+                session = self._sessions.get(server_hostname)
+
+        ssl_sock = super().wrap_socket(sock, *args, server_hostname=server_hostname, session=session, **kwargs)
+        self._keep_session(ssl_sock)
+        return ssl_sock
+
+    def _keep_session(self, ssl_sock: ssl.SSLSocket) -> None:
+        try:
+            session = ssl_sock.session
+        except (OSError, ValueError):
+            return
+        if session is None:
+            return
+
+        with self._sessions_lock:
+            kept = self._sessions.get(ssl_sock.server_hostname)
+            # Never swap a session with a ticket for one without, which could not be resumed
+            if kept is None or session.has_ticket or not kept.has_ticket:
+                self._sessions[ssl_sock.server_hostname] = session
+
+
+def _ssl_context(verify: str | bool | None, cert: tuple[str, str] | None, shared: bool = True) -> ssl.SSLContext:
+    """Get an SSL context loaded with the given certificates, resuming TLS sessions across the connections using it.
+
+    :param verify: Path to certificate authority file or directory, or bool for SSL verification
+    :param cert: Paths to the client certificate and key
+    :param shared: Reuse the context (and its TLS sessions) of any other agent in the process with the same
+        certificates, defaults to True
+    :return: SSL context
+    """
+    if not shared:
+        return _build_ssl_context(verify, cert)
+
+    paths = [path for path in (verify, *(cert or ())) if isinstance(path, str)]
+    # Certificates renewed on disk get a new context
+    key = (verify, cert, tuple(os.stat(path).st_mtime_ns for path in paths))
+    with _CONTEXTS_LOCK:
+        if key not in _CONTEXTS:
+            _CONTEXTS[key] = _build_ssl_context(verify, cert)
+        return _CONTEXTS[key]
+
+
+def _build_ssl_context(verify: str | bool | None, cert: tuple[str, str] | None) -> ssl.SSLContext:
+    context = _ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    if verify is False:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    else:
+        # Match requests, which verifies against the certifi bundle by default
+        cafile = verify if isinstance(verify, str) else DEFAULT_CA_BUNDLE_PATH
+        if os.path.isdir(cafile):
+            context.load_verify_locations(capath=cafile)
+        else:
+            context.load_verify_locations(cafile=cafile)
+
+    if cert is not None:
+        context.load_cert_chain(*cert)
+    return context
+
+
+def _content(data: Any) -> Any:
+    if isinstance(data, (bytes, str)):
+        return data
+
+    if hasattr(data, "read"):
+        return iter(lambda: data.read(CONTENT_CHUNK_SIZE), b"")
+
+    # h2 frames must be built from bytes, so memoryview chunks are copied
+    return (bytes(chunk) for chunk in data)
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
+from copy import copy
+from functools import lru_cache
 from typing import Any
 
 NO_COLOR = "NO_COLOR" in os.environ
 
+# Default thread pool size used by helpers that fan out requests to Bailo
+MAX_WORKERS = 8
+
 
 def filter_none(json: dict[str, Any]) -> dict[str, Any]:
     """Remove None attributes from a dictionary.
@@ -16,7 +23,147 @@ def filter_none(json: dict[str, Any]) -> dict[str, Any]:
     return res
 
 
+class TokenBucket:
+    """A thread-safe token bucket, used to limit how often something happens across threads.
+
+    :param rate: Number of tokens added per second
+    :param capacity: Maximum number of tokens that can be saved up for a burst, defaults to rate
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if capacity is None:
+            capacity = max(rate, 1)
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Take tokens from the bucket, sleeping until enough are available.
+
+        :param tokens: Number of tokens to take, defaults to 1
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            # Reserve the tokens now, so concurrent callers queue up behind each other
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+
+
+class Throttle:
+    """Limit the number of bytes transferred per second, optionally within a limit shared with other transfers.
+
+    The rate can be changed at any time, including part way through a transfer.
+
+    :param rate: Maximum bytes per second, defaults to unlimited
+    :param parent: A throttle that also limits every byte passing through this one, defaults to None
+    """
+
+    def __init__(self, rate: float | None = None, parent: Throttle | None = None):
+        self.parent = parent
+        self.rate = rate
+
+    @property
+    def rate(self) -> float | None:
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate: float | None) -> None:
+        self._rate = rate
+        self._bucket = TokenBucket(rate) if rate else None
+
+    @property
+    def limit(self) -> float | None:
+        """The lowest rate of this throttle and its parents, or None if unlimited."""
+        rates = [rate for rate in (self.rate, self.parent.limit if self.parent else None) if rate]
+        return min(rates) if rates else None
+
+    def consume(self, size: int) -> None:
+        """Account for bytes transferred, sleeping until they are within the rate.
+
+        :param size: Number of bytes transferred
+        """
+        bucket = self._bucket
+        if bucket is not None:
+            bucket.acquire(size)
+        if self.parent is not None:
+            self.parent.consume(size)
+
+
+def json_diff(old: Any, new: Any, path: str = "") -> list[dict[str, Any]]:
+    """Find the changes between two JSON-like objects as JSON Patch (RFC 6902) operations.
+
+    Dictionaries are compared key by key and lists of equal length item by item, so only the parts that
+    actually changed are reported.
+
+    :param old: Original object
+    :param new: Updated object
+    :param path: JSON pointer to the objects being compared, defaults to the root
+    :return: List of add, remove and replace operations, empty if nothing changed
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            key_path = f"{path}/{_escape_pointer(key)}"
+            if key not in new:
+                ops.append({"op": "remove", "path": key_path})
+            else:
+                ops.extend(json_diff(old[key], new[key], key_path))
+        for key in new:
+            if key not in old:
+                ops.append({"op": "add", "path": f"{path}/{_escape_pointer(key)}", "value": new[key]})
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            ops.extend(json_diff(old_item, new_item, f"{path}/{index}"))
+        return ops
+
+    if type(old) is not type(new) or old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def _escape_pointer(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+@lru_cache(maxsize=1024)
+def compile_path(path: str) -> tuple[str, ...]:
+    """Split a dotted path (e.g. performance.performanceMetrics) into a key tuple for NestedDict, caching the result.
+
+    :param path: Dotted path
+    :return: Tuple of keys
+    """
+    return tuple(path.split("."))
+
+
 class NestedDict(dict):
+    """A dictionary that can also be indexed by a tuple of keys to reach into nested dictionaries and lists.
+
+    Setting a nested value copies only the containers along its path the first time they are written to
+    (copy-on-write), so the objects the dictionary was built from are never modified and untouched subtrees stay
+    shared rather than being deep-copied.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Containers copied by this dictionary, by the path they were copied to, which can be written to directly
+        self._owned = {}
+
+    def __reduce__(self):
+        # Pickle as a plain dictionary, as items would otherwise be restored through __setitem__ before _owned exists
+        return self.__class__, (dict(self),)
+
     def __getitem__(self, keytuple):
         # if key is not a tuple then access as normal
         if not isinstance(keytuple, tuple):
@@ -29,10 +176,71 @@ class NestedDict(dict):
     def __setitem__(self, keytuple, item):
         # if key is not a tuple then access as normal
         if not isinstance(keytuple, tuple):
+            self._disown((keytuple,))
             return super().__setitem__(keytuple, item)
-        d = self
-        for index, key in enumerate(keytuple):
-            if index != len(keytuple) - 1:
-                d = d.setdefault(key, {})
+        self._disown(keytuple)
+        self._writable(self, (), keytuple[:-1])[keytuple[-1]] = item
+
+    def get(self, keytuple, default=None):
+        """Get a value by key or tuple of keys, returning a default if it does not exist.
+
+        :param keytuple: Key, or tuple of keys
+        :param default: Value to return if the key does not exist, defaults to None
+        :return: The value or default
+        """
+        if not isinstance(keytuple, tuple):
+            return super().get(keytuple, default)
+        try:
+            return self[keytuple]
+        except (KeyError, IndexError, TypeError):
+            return default
+
+    def set_many(self, items: dict[tuple, Any]) -> None:
+        """Set many nested values, walking each shared path prefix only once.
+
+        :param items: Dictionary of key tuples, or dotted paths, to values
+        """
+        nodes = {(): self}
+        for keytuple, item in items.items():
+            if not isinstance(keytuple, tuple):
+                keytuple = compile_path(keytuple)
+            prefix = keytuple[:-1]
+            depth = len(prefix)
+            while prefix[:depth] not in nodes:
+                depth -= 1
+            node = nodes[prefix[:depth]]
+            for index in range(depth, len(prefix)):
+                node = self._writable(node, prefix[:index], prefix[index : index + 1])
+                nodes[prefix[: index + 1]] = node
+
+            # Replacing a container invalidates any cached nodes beneath it
+            if keytuple in nodes:
+                nodes = {path: cached for path, cached in nodes.items() if path[: len(keytuple)] != keytuple}
+            self._disown(keytuple)
+            node[keytuple[-1]] = item
+
+    def _writable(self, d, path, keytuple):
+        for key in keytuple:
+            path += (key,)
+            try:
+                child = d[key]
+            except KeyError:
+                child = {}
             else:
-                d[key] = item
+                # Only the exact container copied to this path is ours, anything since put in its place is shared
+                if self._owned.get(path) is child or not isinstance(child, (dict, list)):
+                    d = child
+                    continue
+                child = copy(child)
+
+            d[key] = child
+            self._owned[path] = child
+            d = child
+        return d
+
+    def _disown(self, keytuple):
+        # Containers at or beneath a replaced path are no longer reachable through it, and as every container above an
+        # owned one is owned too there is nothing to release unless the path itself was
+        if keytuple in self._owned:
+            for path in [path for path in self._owned if path[: len(keytuple)] == keytuple]:
+                del self._owned[path]
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import os
+import struct
+import zipfile
+import zlib
+from io import RawIOBase
+from typing import Iterator
+
+from bailo.core.enums import FsyncPolicy
+from bailo.core.exceptions import BailoException
+
+# Number of bytes read from each file at a time when streaming a directory as a zip
+ZIP_CHUNK_SIZE = 1024 * 1024
+# Signatures of the zip records read when extracting an archive as it downloads
+ZIP_LOCAL_HEADER = b"PK\x03\x04"
+ZIP_DATA_DESCRIPTOR = b"PK\x07\x08"
+ZIP_CENTRAL_DIRECTORY = b"PK\x01\x02"
+ZIP_END_OF_CENTRAL_DIRECTORY = b"PK\x05\x06"
+# Name of the file written beside a directory once an archive has been fully extracted into it
+EXTRACTED_MARKER = ".{}.extracted"
+
+
+class _ZipBuffer(RawIOBase):
+    """A write-only, unseekable buffer that zip data is written into and drained from."""
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self.buffer += b
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        del self.buffer[:]
+        return data
+
+
+def _zip_stream(
+    path: str, chunk_size: int = ZIP_CHUNK_SIZE, compression: int = zipfile.ZIP_DEFLATED
+) -> Iterator[bytes]:
+    """Yield a zip archive of a directory as it is being written, without creating it on disk.
+
+    :param path: Local directory to archive
+    :param chunk_size: Number of bytes of each file to read at a time, defaults to ZIP_CHUNK_SIZE
+    :param compression: Compression method of each entry, defaults to ZIP_DEFLATED
+    """
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=compression) as archive:
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in dirs:
+                dir_path = os.path.join(root, name)
+                archive.writestr(zipfile.ZipInfo.from_file(dir_path, os.path.relpath(dir_path, path)), b"")
+
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                info = zipfile.ZipInfo.from_file(file_path, os.path.relpath(file_path, path))
+                info.compress_type = compression
+                with open(file_path, "rb") as src, archive.open(info, "w") as dest:
+                    while chunk := src.read(chunk_size):
+                        dest.write(chunk)
+                        if len(buffer.buffer) >= chunk_size:
+                            yield buffer.drain()
+
+    # An empty chunk would end a chunked transfer early, so only yield what is left if anything
+    if buffer.buffer:
+        yield buffer.drain()
+
+
+class _ZipExtractor:
+    """Extract a zip archive into a directory as its bytes arrive, without writing the archive itself to disk.
+
+    At most one entry header and one chunk of data are held in memory, and each entry is inflated in ZIP_CHUNK_SIZE
+    pieces so a highly compressed entry cannot exhaust memory. Entries that would be written outside of the
+    directory are rejected.
+
+    :param path: Local directory to extract into
+    :param fsync: When to flush extracted files to disk, defaults to none
+    """
+
+    def __init__(self, path: str, fsync: FsyncPolicy = FsyncPolicy.NONE) -> None:
+        self.path = os.path.realpath(path)
+        self.fsync = fsync
+        self.names = []
+
+        self._buffer = bytearray()
+        self._entry = None
+        self._done = False
+        os.makedirs(self.path, exist_ok=True)
+        if os.path.exists(_extracted_marker(self.path)):
+            os.remove(_extracted_marker(self.path))
+
+    def feed(self, data: bytes) -> None:
+        """Extract as much of the archive as the bytes received so far allow.
+
+        :param data: The next bytes of the archive
+        """
+        if self._done:
+            return
+
+        self._buffer += data
+        while not self._done and (self._read_header() if self._entry is None else self._read_entry()):
+            pass
+
+    def close(self) -> None:
+        """Check the whole archive was received, then mark the directory as fully extracted.
+
+        :raises BailoException: If the archive ended part way through
+        """
+        if not self._done:
+            self.abort()
+            raise BailoException("Archive ended before its central directory.")
+
+        with open(_extracted_marker(self.path), "w"):
+            pass
+
+    def abort(self) -> None:
+        """Remove the partly extracted entry, if any, leaving only complete entries in place."""
+        if self._entry is not None and self._entry["file"] is not None:
+            self._entry["file"].close()
+            os.remove(self._entry["part"])
+        self._entry = None
+
+    def _read_header(self) -> bool:
+        if len(self._buffer) < 4:
+            return False
+
+        signature = bytes(self._buffer[:4])
+        if signature in (ZIP_CENTRAL_DIRECTORY, ZIP_END_OF_CENTRAL_DIRECTORY):
+            # Every entry has been extracted, the rest of the archive only describes them again
+            self._done = True
+            self._buffer.clear()
+            return False
+        if signature != ZIP_LOCAL_HEADER:
+            raise BailoException("File is not a zip archive.")
+        if len(self._buffer) < 30:
+            return False
+
+        _, _, flags, method, _, _, crc, compressed, size, name_length, extra_length = struct.unpack(
+            "<4sHHHHHLLLHH", self._buffer[:30]
+        )
+        if len(self._buffer) < 30 + name_length + extra_length:
+            return False
+
+        name = self._buffer[30 : 30 + name_length].decode("utf-8" if flags & 0x800 else "cp437")
+        extra = bytes(self._buffer[30 + name_length : 30 + name_length + extra_length])
+        del self._buffer[: 30 + name_length + extra_length]
+
+        zip64 = False
+        while len(extra) >= 4:
+            extra_id, extra_size = struct.unpack("<HH", extra[:4])
+            if extra_id == 0x0001:
+                zip64 = True
+                values = list(struct.unpack(f"<{extra_size // 8}Q", extra[4 : 4 + extra_size - extra_size % 8]))
+                if size == 0xFFFFFFFF and values:
+                    size = values.pop(0)
+                if compressed == 0xFFFFFFFF and values:
+                    compressed = values.pop(0)
+            extra = extra[4 + extra_size :]
+
+        if method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            raise BailoException(f"Archive member {name} uses an unsupported compression method.")
+
+        # With a data descriptor the sizes follow the data, so the end of the entry has to be found in the stream
+        descriptor = bool(flags & 0x08)
+        target = _safe_path(self.path, name)
+        if name.endswith("/"):
+            os.makedirs(target, exist_ok=True)
+            file = None
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            file = open(f"{target}.part", "wb")
+
+        self._entry = {
+            "name": name,
+            "target": target,
+            "part": f"{target}.part",
+            "file": file,
+            "inflater": zlib.decompressobj(-15) if method == zipfile.ZIP_DEFLATED else None,
+            "remaining": None if descriptor else compressed,
+            "crc": None if descriptor else crc,
+            "zip64": zip64,
+            "checksum": 0,
+            "written": 0,
+            "inflated": False,
+        }
+        return True
+
+    def _read_entry(self) -> bool:
+        entry = self._entry
+
+        if entry["inflated"]:
+            # Data descriptor, with an optional signature, then the CRC and the compressed and uncompressed sizes
+            offset = 4 if bytes(self._buffer[:4]) == ZIP_DATA_DESCRIPTOR else 0
+            length = offset + (20 if entry["zip64"] else 12)
+            if len(self._buffer) < max(length, 4):
+                return False
+            (entry["crc"],) = struct.unpack("<L", self._buffer[offset : offset + 4])
+            del self._buffer[:length]
+            self._finish()
+            return True
+
+        if entry["remaining"] == 0:
+            if entry["inflater"] is not None:
+                self._write(entry["inflater"].flush())
+            self._finish()
+            return True
+
+        if not self._buffer:
+            return False
+
+        if entry["remaining"] is None and entry["inflater"] is None:
+            return self._read_stored()
+
+        if entry["remaining"] is None:
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[: entry["remaining"]])
+            del self._buffer[: entry["remaining"]]
+            entry["remaining"] -= len(data)
+
+        inflater = entry["inflater"]
+        if inflater is None:
+            self._write(data)
+            return True
+
+        while data:
+            self._write(inflater.decompress(data, ZIP_CHUNK_SIZE))
+            data = inflater.unconsumed_tail
+        if inflater.eof and entry["remaining"] is None:
+            # Whatever followed the end of the compressed data is the data descriptor and the next entry
+            self._buffer[:0] = inflater.unused_data
+            entry["inflated"] = True
+        return True
+
+    def _read_stored(self) -> bool:
+        # Uncompressed data of unknown size ends at the first data descriptor whose size and CRC match what came before
+        entry = self._entry
+        length = 4 + (20 if entry["zip64"] else 12)
+        size_format = "<Q" if entry["zip64"] else "<L"
+
+        index = self._buffer.find(ZIP_DATA_DESCRIPTOR)
+        while index != -1 and index + length <= len(self._buffer):
+            (crc,) = struct.unpack("<L", self._buffer[index + 4 : index + 8])
+            (size,) = struct.unpack(size_format, self._buffer[index + 8 : index + 8 + struct.calcsize(size_format)])
+            data = bytes(self._buffer[:index])
+            if size == entry["written"] + index and zlib.crc32(data, entry["checksum"]) == crc:
+                self._write(data)
+                entry["crc"] = crc
+                del self._buffer[: index + length]
+                self._finish()
+                return True
+            index = self._buffer.find(ZIP_DATA_DESCRIPTOR, index + 1)
+
+        # Keep back enough bytes to hold a descriptor that has only partly arrived
+        safe = len(self._buffer) - length + 1
+        if safe <= 0:
+            return False
+        self._write(bytes(self._buffer[:safe]))
+        del self._buffer[:safe]
+        return False
+
+    def _write(self, data: bytes) -> None:
+        if data and self._entry["file"] is None:
+            raise BailoException(f"Archive member {self._entry['name']} is a directory but has data.")
+        if self._entry["file"] is not None:
+            self._entry["file"].write(data)
+        self._entry["checksum"] = zlib.crc32(data, self._entry["checksum"])
+        self._entry["written"] += len(data)
+
+    def _finish(self) -> None:
+        entry, self._entry = self._entry, None
+        if entry["file"] is None:
+            return
+
+        if self.fsync != FsyncPolicy.NONE:
+            entry["file"].flush()
+            os.fsync(entry["file"].fileno())
+        entry["file"].close()
+
+        if entry["checksum"] != entry["crc"]:
+            os.remove(entry["part"])
+            raise BailoException(f"Archive member {entry['name']} failed its CRC check.")
+
+        os.replace(entry["part"], entry["target"])
+        self.names.append(entry["name"])
+
+
+def _safe_path(root: str, name: str) -> str:
+    target = os.path.realpath(os.path.join(root, name))
+    if os.path.isabs(name) or os.path.commonpath([root, target]) != root:
+        raise BailoException(f"Archive member {name} would be extracted outside of {root}.")
+    return target
+
+
+def _extracted_marker(path: str) -> str:
+    path = os.path.normpath(path)
+    return os.path.join(os.path.dirname(path), EXTRACTED_MARKER.format(os.path.basename(path)))
+
+
+def _is_extracted(path: str) -> bool:
+    """Check whether an archive has been fully extracted into a directory by _ZipExtractor."""
+    return os.path.isdir(path) and os.path.isfile(_extracted_marker(path))
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import Iterator
+
+from bailo.core.exceptions import BailoException
+
+try:
+    import zstandard
+
+    zstandard_available = True
+except ImportError:
+    zstandard_available = False
+
+# Default zstd compression level, a good balance of speed and ratio for most artifacts
+ZSTD_LEVEL = 3
+# Number and size of the samples taken through a file to estimate whether it is worth compressing
+ENTROPY_SAMPLES = 8
+ENTROPY_SAMPLE_SIZE = 64 * 1024
+# Files with more bits of entropy per byte than this are treated as already compressed (or encrypted)
+ENTROPY_THRESHOLD = 7.5
+
+
+def _is_compressible(f, size: int) -> bool:
+    """Estimate whether a file is worth compressing from the entropy of the bytes in samples spread through it.
+
+    :param f: Seekable binary file, left at the position it was found at
+    :param size: Size of the file
+    :return: True unless the file looks already compressed
+    """
+    if size == 0:
+        return False
+
+    position = f.tell()
+    counts = Counter()
+    try:
+        step = max(size // ENTROPY_SAMPLES, ENTROPY_SAMPLE_SIZE)
+        for offset in range(0, size, step)[:ENTROPY_SAMPLES]:
+            f.seek(offset)
+            counts.update(f.read(ENTROPY_SAMPLE_SIZE))
+    finally:
+        f.seek(position)
+
+    total = sum(counts.values())
+    entropy = -sum(count / total * math.log2(count / total) for count in counts.values())
+    return entropy < ENTROPY_THRESHOLD
+
+
+def _compress_stream(chunks: Iterator[bytes], level: int = ZSTD_LEVEL) -> Iterator[bytes]:
+    """Compress chunks into a single zstd frame, using every core.
+
+    :param chunks: Data to compress
+    :param level: zstd compression level, defaults to ZSTD_LEVEL
+    """
+    compressor = zstandard.ZstdCompressor(level=level, threads=-1).compressobj()
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        # An empty chunk would end a chunked transfer early
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _decompress_stream(chunks: Iterator[bytes], callback) -> Iterator[bytes]:
+    """Decompress a zstd frame as its chunks arrive, reporting the size of each compressed chunk to callback."""
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    for chunk in chunks:
+        callback(len(chunk))
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+
+    if not decompressor.eof:
+        raise BailoException("Compressed file ended unexpectedly.")
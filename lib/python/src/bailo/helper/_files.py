@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import mmap
+import os
+from io import RawIOBase
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from bailo.helper.release import Release
+
+# Number of bytes sent at a time when uploading a memory-mapped file
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class _RemoteFile(RawIOBase):
+    """A seekable, read-only view of a file in a release, reading each part with a ranged request."""
+
+    def __init__(self, release: Release, filename: str, size: int) -> None:
+        self.release = release
+        self.filename = filename
+        self.size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self.size
+        self._position = max(offset, 0)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, b) -> int:
+        data = self.release.read_range(self.filename, self._position, min(self._position + len(b), self.size))
+        b[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+class _MappedFile:
+    """An upload body that sends a file straight from a memory map, as memoryview slices rather than copies.
+
+    The body has a length, so it is sent with a Content-Length rather than chunked.
+    """
+
+    def __init__(self, path: str, chunk_size: int = UPLOAD_CHUNK_SIZE, callback=None) -> None:
+        self.path = path
+        self.chunk_size = chunk_size
+        self.callback = callback
+        self.size = os.path.getsize(path)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[memoryview]:
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                for offset in range(0, len(view), self.chunk_size):
+                    # Each slice is released once sent, as the map cannot be closed while any are still exported
+                    with view[offset : offset + self.chunk_size] as chunk:
+                        if self.callback is not None:
+                            self.callback(len(chunk))
+                        yield chunk
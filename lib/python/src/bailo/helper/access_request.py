@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Any
 
 from bailo.core.client import Client
+from bailo.helper.schema import Schema
 
 
 class AccessRequest:
@@ -64,7 +65,9 @@ class AccessRequest:
         )
 
     @classmethod
-    def create(cls, client: Client, model_id: str, schema_id: str, metadata: Any) -> AccessRequest:
+    def create(
+        cls, client: Client, model_id: str, schema_id: str, metadata: Any, validate: bool = False
+    ) -> AccessRequest:
         """Make an access request for the model.
 
         Posts an access request to Bailo to be reviewed
@@ -73,8 +76,13 @@ class AccessRequest:
         :param name: The name of the access request
         :param model_id: A unique model ID within Bailo
         :param schema_id: A unique schema ID
+        :param validate: Validate the metadata against the schema locally before uploading, defaults to False
+        :raises SchemaValidationException: If validate is set and the metadata is not valid
         :return: JSON response object
         """
+        if validate:
+            Schema.validate_metadata(client=client, schema_id=schema_id, metadata=metadata)
+
         access_request_json = client.post_access_request(model_id, metadata, schema_id)["accessRequest"]
 
         deleted = access_request_json["deleted"]
@@ -100,8 +108,15 @@ class AccessRequest:
         self.client.delete_access_request(self.model_id, self.access_request_id)
         return True
 
-    def update(self):
-        """Update the current state of the access request to Bailo."""
+    def update(self, validate: bool = False):
+        """Update the current state of the access request to Bailo.
+
+        :param validate: Validate the metadata against the schema locally before uploading, defaults to False
+        :raises SchemaValidationException: If validate is set and the metadata is not valid
+        """
+        if validate:
+            Schema.validate_metadata(client=self.client, schema_id=self.schema_id, metadata=self.metadata)
+
         self.client.patch_access_request(self.model_id, self.access_request_id, metadata=self.metadata)
 
     def __str__(self) -> str:
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from typing import Any
+
+from bailo.core.exceptions import BailoException
+from bailo.core.utils import MAX_WORKERS
+from bailo.helper.release import Release
+
+# Number of bytes read from the start of each shard, enough to hold most safetensors headers in one request
+HEADER_READ_SIZE = 64 * 1024
+# Tensors separated by at most this many bytes are fetched in the same ranged request
+RANGE_MERGE_GAP = 64 * 1024
+
+
+class Checkpoint:
+    """Inspect and selectively fetch a safetensors checkpoint in a release, without downloading whole shards.
+
+    The checkpoint is either described by a ``*.safetensors.index.json`` file in the release, or made up of every
+    ``*.safetensors`` file in the release. Shard headers are read with small ranged requests.
+
+    .. code-block:: python
+
+       checkpoint = Checkpoint(Release.from_version(client, "llama-abc123", "1.0.0"))
+       checkpoint.tensors()
+       checkpoint.download("weights", tensors=["model.embed_tokens.weight"])
+       checkpoint.extract("layer_0.safetensors", tensors=checkpoint.match("model.layers.0.*"))
+
+    :param release: The release holding the checkpoint
+    :param max_workers: Maximum number of concurrent requests, defaults to MAX_WORKERS
+    """
+
+    def __init__(self, release: Release, max_workers: int = MAX_WORKERS) -> None:
+        self.release = release
+        self.max_workers = max_workers
+
+        self._shards = None
+        self._index = None
+        self._weight_map = {}
+        self._headers = {}
+
+    def shards(self) -> list[str]:
+        """Get the names of the safetensors files making up the checkpoint.
+
+        :return: List of file names
+        """
+        if self._shards is None:
+            names = [file["name"] for file in self.release.select_files()]
+            indexes = [name for name in names if name.endswith(".safetensors.index.json")]
+            if indexes:
+                self._index = indexes[0]
+                self._weight_map = self.release.download(self._index, write=False).json()["weight_map"]
+                self._shards = sorted(set(self._weight_map.values()))
+            else:
+                self._shards = [name for name in names if name.endswith(".safetensors")]
+
+        return self._shards
+
+    def tensors(self, names: list[str] | None = None) -> dict[str, dict[str, Any]]:
+        """List tensors in the checkpoint, reading only the headers of the shards that hold them.
+
+        :param names: Names of the tensors to describe, defaults to all tensors
+        :raises BailoException: If any of the named tensors are not in the checkpoint
+        :return: Dictionary of tensor names to their file, dtype, shape and absolute byte range within the file
+        """
+        shards = self.shards()
+        if names is not None and self._index is not None:
+            shards = sorted({self._weight_map[name] for name in names if name in self._weight_map})
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            headers = dict(zip(shards, executor.map(self._header, shards)))
+
+        tensors = {}
+        for shard, (data_start, header) in headers.items():
+            for name, tensor in header.items():
+                if name == "__metadata__":
+                    continue
+                begin, end = tensor["data_offsets"]
+                tensors[name] = {
+                    "file": shard,
+                    "dtype": tensor["dtype"],
+                    "shape": tensor["shape"],
+                    "offsets": (data_start + begin, data_start + end),
+                }
+
+        if names is None:
+            return tensors
+
+        missing = [name for name in names if name not in tensors]
+        if missing:
+            raise BailoException(f"Tensors not found in checkpoint: {', '.join(missing)}")
+        return {name: tensors[name] for name in names}
+
+    def match(self, *patterns: str) -> list[str]:
+        """Get the names of tensors matching any of the given fnmatch patterns.
+
+        :param patterns: Fnmatch statements for tensor names
+        :return: List of tensor names
+        """
+        self.shards()
+        names = list(self._weight_map) if self._index is not None else list(self.tensors())
+        return [name for name in names if any(fnmatch(name, pattern) for pattern in patterns)]
+
+    def download(self, path: str = os.getcwd(), tensors: list[str] | None = None, **kwargs) -> list[str]:
+        """Download only the shards holding the given tensors, along with the index file.
+
+        :param path: Local directory to write files to
+        :param tensors: Names of the tensors needed, defaults to all tensors
+        :param kwargs: Any other arguments to Release.download_all
+        :return: List of names of the files downloaded
+        """
+        shards = self.shards()
+        if tensors is not None:
+            shards = sorted({tensor["file"] for tensor in self.tensors(tensors).values()})
+
+        include = shards + ([self._index] if self._index is not None else [])
+        return self.release.download_all(path=path, include=include, **kwargs)
+
+    def read(self, tensors: list[str]) -> dict[str, bytes]:
+        """Read the raw data of the given tensors with ranged requests, without downloading the rest of the shards.
+
+        :param tensors: Names of the tensors to read
+        :return: Dictionary of tensor names to their little-endian data, see Checkpoint.tensors for dtypes and shapes
+        """
+        infos = self.tensors(tensors)
+
+        # Group tensors that sit close together in the same file into a single ranged request
+        requests = []
+        for name, info in sorted(infos.items(), key=lambda item: (item[1]["file"], item[1]["offsets"])):
+            begin, end = info["offsets"]
+            if requests and requests[-1][0] == info["file"] and begin - requests[-1][2] <= RANGE_MERGE_GAP:
+                requests[-1][2] = max(requests[-1][2], end)
+                requests[-1][3].append(name)
+            else:
+                requests.append([info["file"], begin, end, [name]])
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            blobs = executor.map(lambda request: self.release.read_range(*request[:3]), requests)
+
+            data = {}
+            for (_, start, _, names), blob in zip(requests, blobs):
+                for name in names:
+                    begin, end = infos[name]["offsets"]
+                    data[name] = blob[begin - start : end - start]
+
+        return {name: data[name] for name in tensors}
+
+    def extract(self, path: str, tensors: list[str]) -> str:
+        """Write the given tensors to a new safetensors file, fetching only their data.
+
+        :param path: Local path of the safetensors file to write
+        :param tensors: Names of the tensors to include
+        :return: The path written to
+        """
+        infos = self.tensors(tensors)
+        data = self.read(tensors)
+
+        header = {}
+        offset = 0
+        for name in tensors:
+            size = len(data[name])
+            header[name] = {
+                "dtype": infos[name]["dtype"],
+                "shape": infos[name]["shape"],
+                "data_offsets": [offset, offset + size],
+            }
+            offset += size
+
+        encoded = json.dumps(header, separators=(",", ":")).encode()
+        # The data must start on an 8 byte boundary, so the header is padded with spaces
+        encoded += b" " * (-len(encoded) % 8)
+        with open(path, "wb") as f:
+            f.write(struct.pack("<Q", len(encoded)))
+            f.write(encoded)
+            for name in tensors:
+                f.write(data[name])
+
+        return path
+
+    def _header(self, shard: str) -> tuple[int, dict[str, Any]]:
+        if shard not in self._headers:
+            head = self.release.read_range(shard, 0, HEADER_READ_SIZE)
+            (size,) = struct.unpack("<Q", head[:8])
+            if 8 + size > len(head):
+                head += self.release.read_range(shard, len(head), 8 + size)
+            self._headers[shard] = (8 + size, json.loads(head[8 : 8 + size]))
+        return self._headers[shard]
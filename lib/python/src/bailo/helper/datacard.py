@@ -96,14 +96,23 @@ class Datacard(Entry):
 
         return datacard
 
-    def update_data_card(self, data_card: dict[str, Any] | None = None) -> None:
+    def update_data_card(
+        self, data_card: dict[str, Any] | None = None, validate: bool = False, force: bool = False
+    ) -> list[dict[str, Any]]:
         """Upload and retrieve any changes to the datacard on Bailo.
 
         :param data_card: Datacard dictionary, defaults to None
-
-        ..note:: If a datacard is not provided, the current datacard attribute value is used
+        :param validate: Validate the datacard against its schema locally before uploading, defaults to False
+        :param force: Upload the datacard even if it is unchanged, defaults to False
+        :raises SchemaValidationException: If validate is set and the datacard is not valid
+        :return: List of JSON Patch operations describing what changed since the datacard was last retrieved from
+                 Bailo, empty if nothing changed
+
+        ..note:: If a datacard is not provided, the current datacard attribute value is used. Nothing is uploaded
+                 if the datacard matches the one last retrieved from Bailo, unless force is set. A datacard that
+                 has never been retrieved from Bailo is always uploaded.
         """
-        self._update_card(card=data_card)
+        return self._update_card(card=data_card, validate=validate, force=force)
 
     @property
     def data_card(self):
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import copy
 from typing import Any
 
 from bailo.core.client import Client
 from bailo.core.enums import EntryKind, ModelVisibility
 from bailo.core.exceptions import BailoException
+from bailo.core.utils import json_diff
+from bailo.helper.schema import Schema
 
 
 class Entry:
@@ -28,6 +31,7 @@ class Entry:
         self._card = None
         self._card_version = None
         self._card_schema = None
+        self._card_remote = None
 
     def update(self) -> None:
         """Upload and retrieve any changes to the entry summary on Bailo."""
@@ -89,12 +93,34 @@ class Entry:
 
         return res["roles"]
 
-    def _update_card(self, card: dict[str, Any] | None = None) -> None:
+    def diff_card(self, card: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        """Get the changes between a card and the card last retrieved from Bailo.
+
+        :param card: Card dictionary, defaults to the current card attribute value
+        :return: List of JSON Patch operations, empty if the card is unchanged
+        """
         if card is None:
             card = self._card
 
+        return json_diff(self._card_remote, card)
+
+    def _update_card(
+        self, card: dict[str, Any] | None = None, validate: bool = False, force: bool = False
+    ) -> list[dict[str, Any]]:
+        if card is None:
+            card = self._card
+
+        changes = self.diff_card(card)
+        # A card never retrieved from Bailo has nothing to compare against, so it is always uploaded
+        if self._card_remote is not None and not changes and not force:
+            return changes
+
+        if validate:
+            Schema.validate_metadata(client=self.client, schema_id=self._card_schema, metadata=card)
+
         res = self.client.put_model_card(model_id=self.id, metadata=card)
         self.__unpack_card(res["card"])
+        return changes
 
     def _unpack(self, res):
         self.id = res["id"]
@@ -114,3 +140,6 @@ class Entry:
             self._card = res["metadata"]
         except KeyError:
             self._card = None
+
+        # Keep an untouched copy so local edits to the card can be diffed against it
+        self._card_remote = copy.deepcopy(self._card)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from typing import Any
+
+from bailo.core.client import Client
+from bailo.core.exceptions import BailoException
+from bailo.helper.release import Release
+
+try:
+    from fsspec import AbstractFileSystem
+    from fsspec.spec import AbstractBufferedFile
+except ImportError as e:
+    raise ImportError("Optional fsspec dependencies (needed for this module) are not installed.") from e
+
+# Number of bytes fetched per ranged request when reading a file
+DEFAULT_BLOCK_SIZE = 5 * 1024 * 1024
+
+
+class BailoFileSystem(AbstractFileSystem):
+    """Read the files of model releases through fsspec, as ``bailo://<model_id>/<semver>/<filename>``.
+
+    Files are opened for random access, with each read fetching only the bytes it needs through HTTP Range requests,
+    so libraries such as pandas, pyarrow and dask can read straight from Bailo without downloading whole files.
+
+    .. code-block:: python
+
+       fs = BailoFileSystem(client=client)
+       fs.ls("yolo-abc123/1.0.0")
+       with fs.open("yolo-abc123/1.0.0/data.parquet", cache_type="blockcache", cache_options={"maxblocks": 8}) as f:
+           table = pyarrow.parquet.read_table(f)
+
+    :param client: A client object used to interact with Bailo, defaults to a new client for url
+    :param url: Url of bailo website, used if no client is given
+    :param block_size: Number of bytes fetched per request, defaults to DEFAULT_BLOCK_SIZE
+    ..note:: Opened files use fsspec's readahead cache by default. Any fsspec cache_type can be given to open, and the
+        blockcache type keeps at most maxblocks blocks in memory.
+    """
+
+    protocol = "bailo"
+    root_marker = ""
+
+    def __init__(
+        self,
+        client: Client | None = None,
+        url: str | None = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        if client is None:
+            if url is None:
+                raise BailoException("Either a client or a url is required.")
+            client = Client(url)
+
+        self.client = client
+        self.block_size = block_size
+
+    def ls(self, path: str, detail: bool = True, **kwargs) -> list[Any]:
+        """List models, the releases of a model, or the files of a release.
+
+        :param path: Empty for all models, otherwise a model ID, release or file path
+        :param detail: Return dictionaries of file information rather than paths, defaults to True
+        :return: List of file information or paths
+        """
+        path = self._strip_protocol(path).strip("/")
+        parts = path.split("/", 2) if path else []
+
+        if len(parts) == 3:
+            entries = [entry for entry in self._ls("/".join(parts[:2])) if entry["name"] == path]
+            if not entries:
+                raise FileNotFoundError(path)
+        else:
+            entries = self._ls(path)
+
+        if detail:
+            return entries
+        return [entry["name"] for entry in entries]
+
+    def _ls(self, path: str) -> list[dict[str, Any]]:
+        if path in self.dircache:
+            return self.dircache[path]
+
+        parts = path.split("/") if path else []
+        try:
+            if len(parts) == 0:
+                models = self.client.get_models()["models"]
+                entries = [{"name": model["id"], "size": 0, "type": "directory"} for model in models]
+            elif len(parts) == 1:
+                releases = self.client.get_all_releases(model_id=path)["releases"]
+                entries = [
+                    {"name": f"{path}/{release['semver']}", "size": 0, "type": "directory"} for release in releases
+                ]
+            else:
+                files = self.client.get_release(parts[0], parts[1])["release"]["files"]
+                entries = [
+                    {
+                        "name": f"{path}/{file['name']}",
+                        "size": file.get("size"),
+                        "type": "file",
+                        "id": file["_id"],
+                        "mime": file.get("mime"),
+                    }
+                    for file in files
+                ]
+        except BailoException as e:
+            raise FileNotFoundError(path) from e
+
+        self.dircache[path] = entries
+        return entries
+
+    def _open(
+        self,
+        path: str,
+        mode: str = "rb",
+        block_size: int | None = None,
+        autocommit: bool = True,
+        cache_options: dict[str, Any] | None = None,
+        **kwargs,
+    ) -> BailoFile:
+        if mode != "rb":
+            raise NotImplementedError("Bailo filesystems are read only, use Release.upload to add files.")
+
+        path = self._strip_protocol(path).strip("/")
+        return BailoFile(
+            self,
+            path,
+            mode,
+            block_size=block_size or self.block_size,
+            cache_options=cache_options,
+            size=self.info(path)["size"],
+            **kwargs,
+        )
+
+
+class BailoFile(AbstractBufferedFile):
+    """A read-only file in a model release, fetched in ranges as it is read."""
+
+    def _fetch_range(self, start: int, end: int) -> bytes:
+        model_id, semver, filename = self.path.split("/", 2)
+        return Release(self.fs.client, model_id, semver).read_range(filename, start, end)
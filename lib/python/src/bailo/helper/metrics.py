@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import numbers
+import os
+import tempfile
+from array import array
+from bisect import bisect_left
+from typing import Any, Iterator
+
+try:
+    import numpy as np
+
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
+# Number of values held in memory per metric before spilling to disk (if enabled)
+SPILL_SIZE = 65_536
+
+SUMMARIES = ("last", "min", "max", "mean")
+
+# Typecodes of numeric columns, from narrowest to widest
+NUMERIC = ("b", "q", "d")
+
+
+class MetricStore:
+    """Store metrics logged during an experiment run in columns, one per metric name.
+
+    Metrics are kept in typed arrays (of bools, ints or floats, matching the first value logged) alongside the call
+    they were logged in, rather than as a dictionary per call. A metric given a value of another type, or a
+    non-numeric value, is kept as a plain list instead. The store can also be used as a list of the dictionaries
+    originally logged.
+
+    :param spill_dir: Directory to create a temporary directory in, to spill metric columns to once they reach
+        spill_size values, defaults to None
+    :param spill_size: Number of values held in memory per metric before spilling, defaults to SPILL_SIZE
+
+    ..note:: Spilled columns are read back through memory-mapped files when NumPy is installed. They are deleted by
+        close, or once the store is garbage collected.
+    """
+
+    def __init__(self, spill_dir: str | None = None, spill_size: int = SPILL_SIZE) -> None:
+        self.spill_size = spill_size
+
+        self._values = {}
+        self._rows = {}
+        self._typecodes = {}
+        self._spilled = {}
+        self._stats = {}
+        # Step of each call to log
+        self._row_steps = array("q")
+
+        self._spill_dir = None
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._spill_dir = tempfile.TemporaryDirectory(prefix="bailo_metrics_", dir=spill_dir)
+
+    @property
+    def spill_dir(self) -> str | None:
+        return self._spill_dir.name if self._spill_dir is not None else None
+
+    def log(self, metrics: dict[str, Any], step: int | None = None) -> None:
+        """Append metrics to their columns.
+
+        :param metrics: Dictionary of metrics to be logged
+        :param step: Step the metrics were logged at, defaults to the number of previous calls
+        """
+        row = len(self._row_steps)
+        self._row_steps.append(row if step is None else step)
+
+        for key, value in metrics.items():
+            typecode = _typecode(value)
+            if key not in self._values:
+                self._values[key] = array(typecode) if typecode is not None else []
+                self._rows[key] = array("q")
+                self._typecodes[key] = typecode
+                self._spilled[key] = 0
+                if typecode is not None:
+                    self._stats[key] = [None, None, 0, 0]
+
+            elif self._typecodes[key] is not None and typecode != self._typecodes[key]:
+                if typecode is None:
+                    # Fall back to an in-memory list once a metric receives a value that is not a number
+                    self._retype(key, None)
+                    self._stats.pop(key)
+                elif NUMERIC.index(typecode) > NUMERIC.index(self._typecodes[key]):
+                    # Widen the column (as from ints to floats) so it keeps its summaries
+                    self._retype(key, typecode)
+
+            values = self._values[key]
+            values.append(value)
+            self._rows[key].append(row)
+
+            # Running min, max, sum and count so summaries never have to scan a column
+            stats = self._stats.get(key)
+            if stats is not None:
+                if stats[0] is None or value < stats[0]:
+                    stats[0] = value
+                if stats[1] is None or value > stats[1]:
+                    stats[1] = value
+                stats[2] += value
+                stats[3] += 1
+
+            self._spill(key)
+
+    def append(self, metrics: dict[str, Any]) -> None:
+        """Append metrics as with a list, see MetricStore.log.
+
+        :param metrics: Dictionary of metrics to be logged
+        """
+        self.log(metrics)
+
+    def keys(self) -> list[str]:
+        """Get the names of all logged metrics.
+
+        :return: List of metric names, in the order they were first logged
+        """
+        return list(self._values)
+
+    def values(self, key: str) -> Any:
+        """Get all values logged for a metric.
+
+        :param key: Metric name
+        :return: A NumPy array if available, otherwise an array or list of values
+        """
+        values = self._column(key, "values")
+        if self._typecodes[key] == "b":
+            return values.astype(bool) if numpy_available else [bool(value) for value in values]
+        return values
+
+    def steps(self, key: str) -> Any:
+        """Get the steps each value of a metric was logged at.
+
+        :param key: Metric name
+        :return: A NumPy array if available, otherwise an array of steps
+        """
+        rows = self._column(key, "rows")
+        if numpy_available:
+            return np.asarray(self._row_steps, dtype="q")[np.asarray(rows, dtype="q")]
+        return array("q", (self._row_steps[row] for row in rows))
+
+    def summary(self, key: str, stat: str = "last") -> Any:
+        """Summarise a metric without building per-step dictionaries or scanning its values.
+
+        :param key: Metric name
+        :param stat: One of last, min, max or mean, defaults to last
+        :return: The summarised value
+        """
+        if stat not in SUMMARIES:
+            raise ValueError(f"Unknown summary {stat}, expected one of {', '.join(SUMMARIES)}.")
+
+        if stat == "last":
+            values = self._values[key]
+            if len(values) > 0:
+                return self._python(key, values[-1])
+            return self._python(key, self._chunk(key, "values", self._spilled[key] - 1)[-1])
+        if key not in self._stats:
+            raise ValueError(f"Metric {key} is not numeric.")
+
+        low, high, total, count = self._stats[key]
+        return {"min": low, "max": high, "mean": total / count}[stat]
+
+    def summarise(self, stat: str = "last") -> dict[str, Any]:
+        """Summarise every metric.
+
+        :param stat: One of last, min, max or mean, defaults to last
+        :return: Dictionary of metric names to summarised values
+        """
+        return {key: self.summary(key, stat) for key in self._values}
+
+    def close(self) -> None:
+        """Delete any metric columns spilled to disk, after which the store can no longer be read."""
+        if self._spill_dir is not None:
+            self._spill_dir.cleanup()
+
+    def __enter__(self) -> MetricStore:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _retype(self, key: str, typecode: str | None) -> None:
+        values, rows = _to_list(self.values(key)), array("q", self._column(key, "rows"))
+        for kind in ("values", "rows"):
+            if self._spilled[key]:
+                os.remove(self._path(key, kind))
+
+        self._values[key] = array(typecode, values) if typecode is not None else values
+        self._rows[key], self._spilled[key], self._typecodes[key] = rows, 0, typecode
+
+        stats = self._stats.get(key)
+        if stats is not None and typecode is not None:
+            cast = float if typecode == "d" else int
+            stats[0], stats[1] = cast(stats[0]), cast(stats[1])
+        self._spill(key)
+
+    def _spill(self, key: str) -> None:
+        # Every spilled chunk holds exactly spill_size values, so chunks can be found by offset
+        values = self._values[key]
+        while self._spill_dir is not None and isinstance(values, array) and len(values) >= self.spill_size:
+            for kind, column in (("values", values), ("rows", self._rows[key])):
+                with open(self._path(key, kind), "ab") as f:
+                    column[: self.spill_size].tofile(f)
+                del column[: self.spill_size]
+            self._spilled[key] += 1
+
+    def _path(self, key: str, kind: str) -> str:
+        return os.path.join(self.spill_dir, f"{list(self._values).index(key)}.{kind}")
+
+    def _chunk(self, key: str, kind: str, chunk: int) -> Any:
+        typecode = self._typecodes[key] if kind == "values" else "q"
+        offset = chunk * self.spill_size * array(typecode).itemsize
+
+        if numpy_available:
+            return np.memmap(self._path(key, kind), dtype=typecode, mode="r", offset=offset, shape=self.spill_size)
+
+        column = array(typecode)
+        with open(self._path(key, kind), "rb") as f:
+            f.seek(offset)
+            column.fromfile(f, self.spill_size)
+        return column
+
+    def _chunks(self, key: str, kind: str) -> Iterator[Any]:
+        for chunk in range(self._spilled[key]):
+            yield self._chunk(key, kind, chunk)
+        yield self._values[key] if kind == "values" else self._rows[key]
+
+    def _column(self, key: str, kind: str) -> Any:
+        chunks = list(self._chunks(key, kind))
+        if not isinstance(chunks[-1], array):
+            return chunks[-1]
+        if numpy_available:
+            return np.concatenate([np.asarray(chunk, dtype=chunks[-1].typecode) for chunk in chunks])
+
+        column = array(chunks[-1].typecode)
+        for chunk in chunks:
+            column.extend(chunk)
+        return column
+
+    def _python(self, key: str, value: Any) -> Any:
+        # NumPy scalars read back from spilled columns are returned as the Python values originally logged
+        value = value.item() if hasattr(value, "item") else value
+        return bool(value) if self._typecodes[key] == "b" else value
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Iterate over logged metrics as one dictionary per call to log, in the form they were originally logged."""
+        cursors = []
+        for key in self._values:
+            column = zip(self._column(key, "rows"), self._column(key, "values"))
+            cursors.append([key, column, next(column, None)])
+
+        for row in range(len(self)):
+            metrics = {}
+            for cursor in cursors:
+                key, column, current = cursor
+                if current is not None and current[0] == row:
+                    metrics[key] = self._python(key, current[1])
+                    cursor[2] = next(column, None)
+            yield metrics
+
+    def __getitem__(self, index: int | slice) -> dict[str, Any] | list[dict[str, Any]]:
+        """Get the metrics of a call to log by index, or of a slice of calls, as with a list."""
+        if isinstance(index, slice):
+            return [self[row] for row in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("MetricStore index out of range")
+
+        metrics = {}
+        for key in self._values:
+            rows = self._column(key, "rows")
+            position = bisect_left(rows, index)
+            if position < len(rows) and rows[position] == index:
+                metrics[key] = self._python(key, self._column(key, "values")[position])
+        return metrics
+
+    def __len__(self) -> int:
+        return len(self._row_steps)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, MetricStore)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join(self._values)})"
+
+
+def _typecode(value: Any) -> str | None:
+    """Get the array typecode able to hold a value exactly, if any."""
+    if isinstance(value, (bool, np.bool_) if numpy_available else bool):
+        return "b"
+    if isinstance(value, numbers.Integral):
+        return "q" if -(2**63) <= value < 2**63 else None
+    if isinstance(value, numbers.Real):
+        return "d"
+    return None
+
+
+def _to_list(values: Any) -> list[Any]:
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+def summarise_runs(stores: list[MetricStore], key: str, stat: str = "last") -> Any:
+    """Summarise a metric across many runs.
+
+    :param stores: Metric stores of each run
+    :param key: Metric name
+    :param stat: One of last, min, max or mean, defaults to last
+    :return: A NumPy array if available, otherwise a list, of summaries with NaN for runs missing the metric
+    """
+    summaries = [store.summary(key, stat) if key in store else float("nan") for store in stores]
+    if numpy_available:
+        return np.asarray(summaries, dtype=float)
+    return summaries
+
+
+def rank(scores: Any, k: int | None = None, mode: str = "max") -> list[int]:
+    """Get the indexes of the best scores, ignoring NaN.
+
+    :param scores: Array or list of scores
+    :param k: Number of indexes to return, defaults to all
+    :param mode: Either max or min, for whether higher or lower scores are better, defaults to max
+    :return: List of indexes, best first
+    """
+    if mode not in ("max", "min"):
+        raise ValueError(f"Unknown mode {mode}, expected max or min.")
+
+    if numpy_available:
+        scores = np.asarray(scores, dtype=float)
+        valid = np.flatnonzero(~np.isnan(scores))
+        keys = -scores[valid] if mode == "max" else scores[valid]
+        if k is not None and k < len(valid):
+            partition = np.argpartition(keys, k - 1)[:k]
+            order = partition[np.argsort(keys[partition], kind="stable")]
+        else:
+            order = np.argsort(keys, kind="stable")
+        return valid[order].tolist()
+
+    valid = [index for index, score in enumerate(scores) if score == score]
+    ordered = sorted(valid, key=lambda index: scores[index], reverse=mode == "max")
+    return ordered if k is None else ordered[:k]
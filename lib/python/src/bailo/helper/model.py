@@ -3,13 +3,15 @@ from __future__ import annotations
 import os
 import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from bailo.core.client import Client
 from bailo.core.enums import EntryKind, ModelVisibility
 from bailo.core.exceptions import BailoException
-from bailo.core.utils import NestedDict
+from bailo.core.utils import MAX_WORKERS, NestedDict, compile_path
 from bailo.helper.entry import Entry
+from bailo.helper.metrics import SPILL_SIZE, MetricStore, rank, summarise_runs
 from bailo.helper.release import Release
 from semantic_version import Version
 
@@ -20,6 +22,9 @@ try:
 except ImportError:
     ml_flow = False
 
+# Number of runs to request per MLFlow search page
+MLFLOW_PAGE_SIZE = 1000
+
 
 class Model(Entry):
     """Represent a model within Bailo.
@@ -102,23 +107,34 @@ class Model(Entry):
 
         return model
 
-    def update_model_card(self, model_card: dict[str, Any] | None = None) -> None:
+    def update_model_card(
+        self, model_card: dict[str, Any] | None = None, validate: bool = False, force: bool = False
+    ) -> list[dict[str, Any]]:
         """Upload and retrieve any changes to the model card on Bailo.
 
         :param model_card: Model card dictionary, defaults to None
-
-        ..note:: If a model card is not provided, the current model card attribute value is used
+        :param validate: Validate the model card against its schema locally before uploading, defaults to False
+        :param force: Upload the model card even if it is unchanged, defaults to False
+        :raises SchemaValidationException: If validate is set and the model card is not valid
+        :return: List of JSON Patch operations describing what changed since the model card was last retrieved from
+                 Bailo, empty if nothing changed
+
+        ..note:: If a model card is not provided, the current model card attribute value is used. Nothing is uploaded
+                 if the model card matches the one last retrieved from Bailo, unless force is set. A model card that
+                 has never been retrieved from Bailo is always uploaded.
         """
-        self._update_card(card=model_card)
+        return self._update_card(card=model_card, validate=validate, force=force)
 
     def create_experiment(
         self,
+        spill_metrics: bool = False,
     ) -> Experiment:
         """Create an experiment locally
 
+        :param spill_metrics: Spill long metric histories to disk to keep memory flat, defaults to False
         :return: An experiment object
         """
-        return Experiment.create(model=self)
+        return Experiment.create(model=self, spill_metrics=spill_metrics)
 
     def create_release(
         self,
@@ -159,12 +175,8 @@ class Model(Entry):
         :return: List of Release objects
         """
         res = self.client.get_all_releases(model_id=self.model_id)
-        releases = []
-
-        for release in res["releases"]:
-            releases.append(self.get_release(version=release["semver"]))
 
-        return releases
+        return [Release._from_json(self.client, self.model_id, release) for release in res["releases"]]
 
     def get_release(self, version: Version | str) -> Release:
         """Call the Release.from_version method to return an existing release from Bailo.
@@ -229,6 +241,7 @@ class Experiment:
     """Represent an experiment locally.
 
     :param model: A Bailo model object which the experiment is being run on
+    :param spill_metrics: Spill long metric histories to disk to keep memory flat, defaults to False
     :param raw: Raw information about the experiment runs
 
     .. code-block:: python
@@ -248,24 +261,32 @@ class Experiment:
     def __init__(
         self,
         model: Model,
+        spill_metrics: bool = False,
     ):
         self.model = model
+        self.spill_metrics = spill_metrics
         self.raw = []
         self.run = -1
         self.temp_dir = os.path.join(tempfile.gettempdir(), "bailo_runs")
+        self.mlflow_tracking_uri = None
+
+        self._runs = {}
+        self._runs_source = None
 
     @classmethod
     def create(
         cls,
         model: Model,
+        spill_metrics: bool = False,
     ) -> Experiment:
         """Create an experiment locally.
 
         :param model: A Bailo model object which the experiment is being run on
+        :param spill_metrics: Spill long metric histories to disk to keep memory flat, defaults to False
         :return: Experiment object
         """
 
-        return cls(model=model)
+        return cls(model=model, spill_metrics=spill_metrics)
 
     def start_run(self, is_mlflow: bool = False):
         """Starts a new experiment run.
@@ -274,7 +295,18 @@ class Experiment:
         """
         self.run += 1
 
-        self.run_data = {"run": self.run, "params": [], "metrics": [], "artifacts": [], "dataset": ""}
+        # Spilled metrics are kept outside of temp_dir, which is cleared after publishing artifacts, and are deleted
+        # along with their MetricStore
+        spill_dir = tempfile.gettempdir() if self.spill_metrics else None
+        metrics = MetricStore(spill_dir=spill_dir, spill_size=SPILL_SIZE)
+        self.run_data = {
+            "run": self.run,
+            "params": [],
+            "metrics": metrics,
+            "artifacts": [],
+            "artifact_uris": [],
+            "dataset": "",
+        }
 
         self.raw.append(self.run_data)
 
@@ -288,12 +320,13 @@ class Experiment:
         """
         self.run_data["params"].append(params)
 
-    def log_metrics(self, metrics: dict[str, Any]):
+    def log_metrics(self, metrics: dict[str, Any], step: int | None = None):
         """Logs metrics to the current run.
 
         :param metrics: Dictionary of metrics to be logged
+        :param step: Training step the metrics were logged at, defaults to the number of previous calls
         """
-        self.run_data["metrics"].append(metrics)
+        self.run_data["metrics"].log(metrics, step=step)
 
     def log_artifacts(self, artifacts: list):
         """Logs artifacts to the current run.
@@ -309,55 +342,210 @@ class Experiment:
         """
         self.run_data["dataset"] = dataset
 
-    def from_mlflow(self, tracking_uri: str, experiment_id: str):
+    def from_mlflow(
+        self,
+        tracking_uri: str,
+        experiment_id: str,
+        filter_string: str = "",
+        lazy: bool = False,
+        max_workers: int = MAX_WORKERS,
+        page_size: int = MLFLOW_PAGE_SIZE,
+    ):
         """Imports information from an MLFlow Tracking experiment.
 
+        Runs are searched a page at a time and their artifacts are downloaded concurrently.
+
         :param tracking_uri: MLFlow Tracking server URI
         :param experiment_id: MLFlow Tracking experiment ID
+        :param filter_string: MLFlow search filter on metrics, params or tags (e.g. "metrics.accuracy > 0.8"), applied
+                              before any artifacts are downloaded, defaults to ""
+        :param lazy: Only record artifact URIs, and download them when the run is published, defaults to False
+        :param max_workers: Maximum number of concurrent artifact downloads, defaults to MAX_WORKERS
+        :param page_size: Number of runs to fetch per search request, defaults to MLFLOW_PAGE_SIZE
         :raises ImportError: Import error if MLFlow not installed
         """
         if ml_flow:
             client = mlflow.tracking.MlflowClient(tracking_uri=tracking_uri)
-            runs = client.search_runs(experiment_id)
-
-            for run in runs:
-                data = run.data
-                info = run.info
-                inputs = run.inputs
-
-                artifact_uri = info.artifact_uri
-                run_id = info.run_id
-                status = info.status
-                datasets = inputs.dataset_inputs
-                datasets_str = [dataset.name for dataset in datasets]
-
-                artifacts = []
-
-                # MLFlow run must be status FINISHED
-                if status != "FINISHED":
-                    continue
-
-                if len(mlflow.artifacts.list_artifacts(artifact_uri=artifact_uri)) > 0:
-                    mlflow_dir = os.path.join(self.temp_dir, f"mlflow_{run_id}")
-                    mlflow.artifacts.download_artifacts(artifact_uri=artifact_uri, dst_path=mlflow_dir)
-                    artifacts.append(mlflow_dir)
-
-                self.start_run(is_mlflow=True)
-                self.log_params(data.params)
-                self.log_metrics(data.metrics)
-                self.log_artifacts(artifacts)
-                self.log_dataset("".join(datasets_str))
-                self.run_data["run"] = info.run_id
+            self.mlflow_tracking_uri = tracking_uri
+
+            # MLFlow run must be status FINISHED
+            status_filter = "attributes.status = 'FINISHED'"
+            filter_string = f"{status_filter} AND {filter_string}" if filter_string else status_filter
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                imports = []
+                page_token = None
+                while True:
+                    runs = client.search_runs(
+                        [experiment_id], filter_string=filter_string, max_results=page_size, page_token=page_token
+                    )
+                    for run in runs:
+                        artifact_uri = run.info.artifact_uri
+                        if lazy:
+                            imports.append((run, None))
+                        else:
+                            future = executor.submit(self._download_mlflow_artifacts, artifact_uri, run.info.run_id)
+                            imports.append((run, future))
+
+                    page_token = runs.token
+                    if not page_token:
+                        break
+
+                for run, future in imports:
+                    data = run.data
+                    info = run.info
+                    datasets_str = [dataset.name for dataset in run.inputs.dataset_inputs]
+
+                    self.start_run(is_mlflow=True)
+                    self.log_params(data.params)
+                    self.log_metrics(data.metrics)
+                    if future is None:
+                        self.run_data["artifact_uris"].append(info.artifact_uri)
+                    else:
+                        self.log_artifacts(future.result())
+                    self.log_dataset("".join(datasets_str))
+                    self.run_data["run"] = info.run_id
         else:
             raise ImportError("Optional MLFlow dependencies (needed for this method) are not installed.")
 
-    def publish(self, mc_loc: str, run_id: str, semver: str = "0.1.0", notes: str = ""):
+    def filter_runs(self, params: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        """Get the runs whose logged parameters match the given values.
+
+        :param params: Dictionary of parameter names to values, or to callables returning whether a value matches,
+                       defaults to None
+        :return: List of matching runs
+        """
+        if not params:
+            return list(self.raw)
+
+        runs = []
+        for run in self.raw:
+            run_params = {}
+            for logged in run["params"]:
+                run_params.update(logged)
+
+            for key, expected in params.items():
+                if key not in run_params:
+                    break
+                actual = run_params[key]
+                if callable(expected):
+                    if not expected(actual):
+                        break
+                # MLFlow params are always strings, so fall back to comparing string forms
+                elif actual != expected and str(actual) != str(expected):
+                    break
+            else:
+                runs.append(run)
+
+        return runs
+
+    def top_runs(
+        self,
+        metric: str,
+        k: int | None = 1,
+        summary: str = "last",
+        mode: str = "max",
+        params: dict[str, Any] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Rank runs by a metric.
+
+        :param metric: Name of the metric to rank runs by
+        :param k: Number of runs to return, defaults to 1 (None for all runs)
+        :param summary: How to summarise each run's metric history (last, min, max or mean), defaults to last
+        :param mode: Whether higher (max) or lower (min) values are better, defaults to max
+        :param params: Only rank runs with matching parameters, see filter_runs, defaults to None
+        :return: List of runs, best first, excluding runs that did not log the metric
+        """
+        runs = self.filter_runs(params)
+        scores = summarise_runs([run["metrics"] for run in runs], metric, summary)
+
+        return [runs[index] for index in rank(scores, k=k, mode=mode)]
+
+    def best_run(
+        self,
+        metric: str,
+        summary: str = "last",
+        mode: str = "max",
+        params: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Get the best run by a metric.
+
+        :param metric: Name of the metric to rank runs by
+        :param summary: How to summarise each run's metric history (last, min, max or mean), defaults to last
+        :param mode: Whether higher (max) or lower (min) values are better, defaults to max
+        :param params: Only consider runs with matching parameters, see filter_runs, defaults to None
+        :raises BailoException: If no runs logged the metric
+        :return: The best run
+        """
+        runs = self.top_runs(metric, k=1, summary=summary, mode=mode, params=params)
+        if not runs:
+            raise BailoException(f"No runs have logged metric {metric}.")
+
+        return runs[0]
+
+    def publish_best(
+        self,
+        metric: str,
+        mc_loc: str,
+        summary: str = "last",
+        mode: str = "max",
+        params: dict[str, Any] | None = None,
+        **kwargs,
+    ) -> Any:
+        """Publishes the results of the best run by a metric to the model card.
+
+        :param metric: Name of the metric to rank runs by
+        :param mc_loc: Location of metrics in the model card (e.g. performance.performanceMetrics)
+        :param summary: How to summarise each run's metric history (last, min, max or mean), defaults to last
+        :param mode: Whether higher (max) or lower (min) values are better, defaults to max
+        :param params: Only consider runs with matching parameters, see filter_runs, defaults to None
+        :param kwargs: Further arguments passed to publish
+        :return: The ID of the published run
+        """
+        run_id = self.best_run(metric, summary=summary, mode=mode, params=params)["run"]
+        self.publish(mc_loc=mc_loc, run_id=run_id, **kwargs)
+
+        return run_id
+
+    def _get_run(self, run_id: str) -> dict[str, Any]:
+        # Runs are indexed by ID, and the index rebuilt whenever runs have been added or replaced
+        if self._runs_source is not self.raw or len(self._runs) != len(self.raw) or run_id not in self._runs:
+            self._runs = {run["run"]: run for run in self.raw}
+            self._runs_source = self.raw
+
+        try:
+            return self._runs[run_id]
+        except KeyError:
+            raise NameError(f"Run {run_id} does not exist.")
+
+    def _download_mlflow_artifacts(self, artifact_uri: str, run_id: str) -> list[str]:
+        if len(mlflow.artifacts.list_artifacts(artifact_uri=artifact_uri, tracking_uri=self.mlflow_tracking_uri)) == 0:
+            return []
+
+        mlflow_dir = os.path.join(self.temp_dir, f"mlflow_{run_id}")
+        mlflow.artifacts.download_artifacts(
+            artifact_uri=artifact_uri, dst_path=mlflow_dir, tracking_uri=self.mlflow_tracking_uri
+        )
+        return [mlflow_dir]
+
+    def publish(
+        self,
+        mc_loc: str,
+        run_id: str,
+        semver: str = "0.1.0",
+        notes: str = "",
+        summary: str | None = None,
+        max_workers: int = MAX_WORKERS,
+    ):
         """Publishes a given experiments results to the model card.
 
         :param mc_loc: Location of metrics in the model card (e.g. performance.performanceMetrics)
         :param run_id: Local experiment run ID to be selected
         :param semver: Semantic version of release to create (if artifacts present), defaults to 0.1.0 or next
         :param notes: Notes for release, defaults to ""
+        :param summary: Publish one value per metric (last, min, max or mean) instead of every logged value,
+                        defaults to None
+        :param max_workers: Maximum number of artifacts to upload concurrently, defaults to MAX_WORKERS
 
         ..note:: mc_loc is dependent on the model card schema being used
         """
@@ -368,28 +556,30 @@ class Experiment:
         mc = NestedDict(mc)
 
         if len(self.raw) > 0:
-            for run in self.raw:
-                if run["run"] == run_id:
-                    sel_run = run
-                    break
-            else:
-                raise NameError(f"Run {run_id} does not exist.")
+            sel_run = self._get_run(run_id)
         else:
             raise BailoException(f"This experiment has no runs to publish.")
 
         values = []
 
-        for metric in sel_run["metrics"]:
-            for k, v in metric.items():
+        if summary is None:
+            for metric in sel_run["metrics"]:
+                for k, v in metric.items():
+                    values.append({"name": k, "value": v})
+        else:
+            for k, v in sel_run["metrics"].summarise(summary).items():
                 values.append({"name": k, "value": v})
 
         # Updating the model card
         parsed_values = [{"dataset": sel_run["dataset"], "datasetMetrics": values}]
-        mc[tuple(mc_loc.split("."))] = parsed_values
+        mc[compile_path(mc_loc)] = parsed_values
         self.model.update_model_card(model_card=mc)
 
         # Creating a release and uploading artifacts (if artifacts present)
-        artifacts = sel_run["artifacts"]
+        artifacts = list(sel_run["artifacts"])
+        for artifact_uri in sel_run.get("artifact_uris", []):
+            artifacts.extend(self._download_mlflow_artifacts(artifact_uri, sel_run["run"]))
+
         if len(artifacts) > 0:
             # Create new release
             try:
@@ -402,8 +592,7 @@ class Experiment:
             notes = f"{notes} (Run ID: {run_id})"
             release_new = self.model.create_release(version=release_new_version, minor=True, notes=notes)
 
-            for artifact in artifacts:
-                release_new.upload(path=artifact)
+            release_new.upload_all(artifacts, max_workers=max_workers)
 
             if os.path.exists(self.temp_dir) and os.path.isdir(self.temp_dir):
                 shutil.rmtree(self.temp_dir)
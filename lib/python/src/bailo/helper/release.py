@@ -3,17 +3,35 @@ from __future__ import annotations
 import os
 import fnmatch
 import shutil
-from io import BytesIO
-from typing import Any, Union
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BufferedReader, BytesIO
+from typing import Any, Iterator, Union
 from tqdm import tqdm
 from tqdm.utils import CallbackIOWrapper
 
 from bailo.core.client import Client
-from bailo.core.exceptions import BailoException
-from bailo.core.utils import NO_COLOR
+from bailo.core.enums import FsyncPolicy
+from bailo.core.exceptions import BailoException, ResponseException
+from bailo.core.utils import MAX_WORKERS, NO_COLOR, Throttle
+from bailo.helper._archive import ZIP_CHUNK_SIZE, _is_extracted, _ZipExtractor, _zip_stream
+from bailo.helper._compression import (
+    ZSTD_LEVEL,
+    _compress_stream,
+    _decompress_stream,
+    _is_compressible,
+    zstandard_available,
+)
+from bailo.helper._files import UPLOAD_CHUNK_SIZE, _MappedFile, _RemoteFile
 from semantic_version import Version
 
 BLOCK_SIZE = 1024
+# Number of bytes fetched per ranged request when reading a remote archive
+ARCHIVE_BLOCK_SIZE = 1024 * 1024
+# Number of bytes written between each flush to disk when downloading with FsyncPolicy.PERIODIC
+FSYNC_INTERVAL = 64 * 1024 * 1024
+# Suffix added to the names of files compressed with zstd on upload, and removed when they are decompressed
+COMPRESSED_SUFFIX = ".zst"
 
 
 class Release:
@@ -122,6 +140,13 @@ class Release:
         """
         res = client.get_release(model_id, str(version))["release"]
 
+        return cls._from_json(client, model_id, res, version)
+
+    @classmethod
+    def _from_json(cls, client: Client, model_id: str, res: dict[str, Any], version: Version | str | None = None):
+        if version is None:
+            version = res["semver"]
+
         model_card_version = res["modelCardVersion"]
         notes = res["notes"]
         files = res["fileIds"]
@@ -141,20 +166,57 @@ class Release:
             draft,
         )
 
-    def download(self, filename: str, write: bool = True, path: str | None = None) -> Any:
+    def download(
+        self,
+        filename: str,
+        write: bool = True,
+        path: str | None = None,
+        chunk_size: int = BLOCK_SIZE,
+        bandwidth: float | Throttle | None = None,
+        fsync: FsyncPolicy | str = FsyncPolicy.NONE,
+        extract: bool = False,
+        decompress: bool = True,
+    ) -> Any:
         """Returns a response object given the file name and optionally writes file to disk.
 
         :param filename: The name of the file to retrieve
         :param write: Bool to determine if writing file to disk, defaults to True
         :param path: Local path to write file to (if write set to True)
+        :param chunk_size: Number of bytes to write to disk at a time, defaults to BLOCK_SIZE
+        :param bandwidth: Maximum bytes per second (or a Throttle), defaults to the client limit
+        :param fsync: When to flush the file to disk (none, at the end or periodically), defaults to none
+        :param extract: Extract a zip file into the directory at path as it downloads, defaults to False
+        :param decompress: Decompress a file uploaded with compression as it downloads, defaults to True
 
         :return: A JSON response object
+        ..note:: The file is written to path.part, preallocated where supported, and only renamed to path once complete.
+            When extracting, the default path is the file name without its extension.
+        ..note:: Files uploaded with compression can be downloaded by their original name, and are written there
+            decompressed. The response itself is always left compressed.
         """
-        res = self.client.get_download_by_filename(self.model_id, str(self.version), filename)
+        try:
+            res = self.client.get_download_by_filename(self.model_id, str(self.version), filename)
+        except BailoException as e:
+            # Only a missing file may have been uploaded compressed under another name
+            if e.status_code != 404 or not decompress or filename.endswith(COMPRESSED_SUFFIX):
+                raise
+            try:
+                res = self.client.get_download_by_filename(
+                    self.model_id, str(self.version), filename + COMPRESSED_SUFFIX
+                )
+            except BailoException as compressed_error:
+                if compressed_error.status_code != 404:
+                    raise
+                raise e from None
+            filename += COMPRESSED_SUFFIX
+
+        compressed = decompress and filename.endswith(COMPRESSED_SUFFIX)
+        if write and compressed and not zstandard_available:
+            raise ImportError("Optional zstandard dependencies (needed for this download) are not installed.")
 
         if write:
             if path is None:
-                path = filename
+                path = local_name(filename, extract, decompress)
             total_size = int(res.headers.get("content-length", 0))
 
             if NO_COLOR:
@@ -162,34 +224,182 @@ class Release:
             else:
                 colour = "green"
 
+            throttle = self._throttle(bandwidth)
+            description = f"downloading {filename} as {path}"
             with tqdm(
                 total=total_size,
                 unit="B",
                 unit_scale=True,
                 unit_divisor=BLOCK_SIZE,
-                postfix=f"downloading {filename} as {path}",
+                postfix=_postfix(description, throttle.limit),
                 colour=colour,
+                disable=not self.client.progress,
             ) as t:
-                with open(path, "wb") as f:
-                    for data in res.iter_content(BLOCK_SIZE):
-                        t.update(len(data))
-                        f.write(data)
+                update = _progress(t, throttle, description)
+                chunks = res.iter_content(chunk_size)
+                if compressed:
+                    # Progress follows the compressed bytes received, as the decompressed size is not known
+                    chunks, update, total_size = _decompress_stream(chunks, update), _ignore, 0
+
+                if extract:
+                    extractor = _ZipExtractor(path, FsyncPolicy(fsync))
+                    try:
+                        for data in chunks:
+                            update(len(data))
+                            extractor.feed(data)
+                    except BaseException:
+                        extractor.abort()
+                        raise
+                    extractor.close()
+                else:
+                    # A decoded body is longer than the content-length the server sent for it
+                    exact = not compressed and "content-length" in res.headers and "content-encoding" not in res.headers
+                    _write_atomic(path, chunks, total_size, FsyncPolicy(fsync), update, exact=exact)
 
         return res
 
-    def download_all(self, path: str = os.getcwd(), include: list | str = None, exclude: list | str = None):
+    def read_range(self, filename: str, start: int, end: int) -> bytes:
+        """Read part of a file without downloading the rest of it.
+
+        :param filename: The name of the file to read from
+        :param start: Offset of the first byte to read
+        :param end: Offset of the byte after the last to read
+        :return: The bytes read, which may be fewer than requested at the end of the file
+        ..note:: If the server ignores ranges, the file is streamed only as far as end and the rest discarded.
+        """
+        if start >= end:
+            return b""
+
+        res = self.client.get_download_by_filename(
+            self.model_id, str(self.version), filename, byte_range=(start, end - 1)
+        )
+        if res.status_code == 206:
+            return res.content
+
+        data = bytearray()
+        offset = 0
+        try:
+            for chunk in res.iter_content(ZIP_CHUNK_SIZE):
+                data += chunk[max(start - offset, 0) : end - offset]
+                offset += len(chunk)
+                if offset >= end:
+                    break
+        finally:
+            res.close()
+        return bytes(data)
+
+    def list_archive(self, filename: str) -> list[zipfile.ZipInfo]:
+        """List the members of a zip file in the release, such as an uploaded directory, without downloading it.
+
+        :param filename: The name of the zip file
+        :return: List of ZipInfo objects describing each member
+        ..note:: Only the end of the archive holding its central directory is read, using ranged requests.
+        """
+        with zipfile.ZipFile(self._open_remote(filename)) as archive:
+            return archive.infolist()
+
+    def extract_member(self, filename: str, member: str, path: str | None = None) -> str:
+        """Extract a single member of a zip file in the release, without downloading the rest of the archive.
+
+        :param filename: The name of the zip file
+        :param member: The name of the member within the zip file
+        :param path: Local path to write the member to, defaults to the member's file name
+        :return: The path written to
+        ..note:: The central directory and the member are read using ranged requests and decompressed as they arrive.
+        """
+        if path is None:
+            path = os.path.basename(member)
+
+        with zipfile.ZipFile(self._open_remote(filename)) as archive:
+            with archive.open(member) as source, open(f"{path}.part", "wb") as f:
+                shutil.copyfileobj(source, f, ZIP_CHUNK_SIZE)
+        os.replace(f"{path}.part", path)
+
+        return path
+
+    def _open_remote(self, filename: str) -> BufferedReader:
+        files = self.client.get_release(self.model_id, str(self.version))["release"]["files"]
+        sizes = [file["size"] for file in files if file["name"] == filename]
+        if not sizes:
+            raise BailoException(f"Release has no file named {filename}.")
+
+        return BufferedReader(_RemoteFile(self, filename, sizes[0]), buffer_size=ARCHIVE_BLOCK_SIZE)
+
+    def download_all(
+        self,
+        path: str = os.getcwd(),
+        include: list | str = None,
+        exclude: list | str = None,
+        max_workers: int = MAX_WORKERS,
+        chunk_size: int = BLOCK_SIZE,
+        resume: bool = False,
+        bandwidth: float | None = None,
+        fsync: FsyncPolicy | str = FsyncPolicy.NONE,
+        extract: bool = False,
+        decompress: bool = True,
+    ) -> list[str]:
         """Writes all files to disk given a local directory.
 
         :param include: List or string of fnmatch statements for file names to include, defaults to None
         :param exclude: List or string of fnmatch statements for file names to exclude, defaults to None
         :param path: Local directory to write files to
+        :param max_workers: Maximum number of concurrent downloads, defaults to MAX_WORKERS
+        :param chunk_size: Number of bytes to write to disk at a time, defaults to BLOCK_SIZE
+        :param resume: Skip files that already exist locally with the expected size, and zip files already fully
+            extracted, defaults to False
+        :param bandwidth: Maximum bytes per second for each download, defaults to the client limit
+        :param fsync: When to flush each file to disk (none, at the end or periodically), defaults to none
+        :param extract: Extract zip files into a directory named after them as they download, defaults to False
+        :param decompress: Decompress files uploaded with compression as they download, defaults to True
         :raises BailoException: If the release has no files assigned to it
+        :return: List of names of the files downloaded
         ..note:: Fnmatch statements support Unix shell-style wildcards.
         """
+        files_metadata = self.select_files(include, exclude)
+        if resume:
+            files_metadata = [
+                file_metadata
+                for file_metadata in files_metadata
+                if not is_complete(
+                    os.path.join(path, local_name(file_metadata["name"], extract, decompress)),
+                    # Only files written as they were uploaded have a known size locally
+                    file_metadata.get("size")
+                    if local_name(file_metadata["name"], extract, decompress) == file_metadata["name"]
+                    else None,
+                )
+            ]
+        file_names = [file_metadata["name"] for file_metadata in files_metadata]
+
+        os.makedirs(path, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(
+                executor.map(
+                    lambda file: self.download(
+                        filename=file,
+                        path=os.path.join(path, local_name(file, extract, decompress)),
+                        chunk_size=chunk_size,
+                        bandwidth=bandwidth,
+                        fsync=fsync,
+                        extract=_extracts(_decompressed_name(file, decompress), extract),
+                        decompress=decompress,
+                    ),
+                    file_names,
+                )
+            )
+
+        return file_names
+
+    def select_files(self, include: list | str = None, exclude: list | str = None) -> list[dict[str, Any]]:
+        """Get the metadata of the files in the release matching fnmatch statements.
+
+        :param include: List or string of fnmatch statements for file names to include, defaults to None
+        :param exclude: List or string of fnmatch statements for file names to exclude, defaults to None
+        :raises BailoException: If the release has no files assigned to it
+        :return: List of file metadata, as returned by Bailo
+        """
         files_metadata = self.client.get_release(self.model_id, str(self.version))["release"]["files"]
         if files_metadata == []:
             raise BailoException("Release has no associated files.")
-        file_names = [file_metadata["name"] for file_metadata in files_metadata]
 
         if isinstance(include, str):
             include = [include]
@@ -197,62 +407,205 @@ class Release:
             exclude = [exclude]
 
         if include is not None:
-            file_names = [file for file in file_names if any([fnmatch.fnmatch(file, pattern) for pattern in include])]
+            files_metadata = [
+                file for file in files_metadata if any([fnmatch.fnmatch(file["name"], pattern) for pattern in include])
+            ]
 
         if exclude is not None:
-            file_names = [
-                file for file in file_names if not any([fnmatch.fnmatch(file, pattern) for pattern in exclude])
+            files_metadata = [
+                file
+                for file in files_metadata
+                if not any([fnmatch.fnmatch(file["name"], pattern) for pattern in exclude])
             ]
 
-        os.makedirs(path, exist_ok=True)
-        for file in file_names:
-            file_path = os.path.join(path, file)
-            self.download(filename=file, path=file_path)
+        return files_metadata
 
-    def upload(self, path: str, data: BytesIO | None = None) -> str:
+    def upload(
+        self,
+        path: str,
+        data: BytesIO | None = None,
+        bandwidth: float | Throttle | None = None,
+        compress: bool | int = False,
+    ) -> str:
         """Upload a file to the release.
 
         :param path: The path, or name of file or directory to be uploaded
         :param data: A BytesIO object if not loading from disk
+        :param bandwidth: Maximum bytes per second (or a Throttle), defaults to the client limit
+        :param compress: Compress the file with multi-threaded zstd, either True for ZSTD_LEVEL or a zstd level,
+            defaults to False
 
         :return: The unique file ID of the file uploaded
         ..note:: If path provided is a directory, it will be uploaded as a zip
+        ..note:: Compressed files are named with a .zst suffix, and are decompressed by Release.download. Files that
+            look already compressed, judged by the entropy of samples taken through them, are uploaded as they are.
         """
-        name = os.path.split(path)[-1]
+        file_id = self._upload(path, data, bandwidth, compress)
 
-        if data is None:
-            if is_zip := os.path.isdir(path):
-                shutil.make_archive(name, "zip", path)
-                path = f"{name}.zip"
-                name = path
+        self.files.append(file_id)
+        self.update()
+        return file_id
 
-            data = open(path, "rb")
+    def upload_all(
+        self,
+        paths: list[str],
+        max_workers: int = MAX_WORKERS,
+        bandwidth: float | None = None,
+        compress: bool | int = False,
+    ) -> list[str]:
+        """Upload many files to the release concurrently, then update the release once.
+
+        :param paths: The paths of files or directories to be uploaded
+        :param max_workers: Maximum number of concurrent uploads, defaults to MAX_WORKERS
+        :param bandwidth: Maximum bytes per second for each upload, defaults to the client limit
+        :param compress: Compress the files with zstd, either True for ZSTD_LEVEL or a zstd level, see Release.upload,
+            defaults to False
+
+        :return: The unique file IDs of the files uploaded, in the same order as paths
+        :raises BailoException: If any upload fails, after deleting the files already uploaded
+        ..note:: Directories are streamed as zips while being archived
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._upload, path, bandwidth=bandwidth, compress=compress) for path in paths]
+            try:
+                file_ids = [future.result() for future in futures]
+            except BaseException:
+                # Files uploaded before the failure would otherwise be left on Bailo outside of any release
+                for future in futures:
+                    future.cancel()
+                for future in futures:
+                    if not future.cancelled() and future.exception() is None:
+                        self.__delete_orphan(future.result())
+                raise
+
+        self.files.extend(file_ids)
+        self.update()
+        return file_ids
 
-            if is_zip:
-                os.remove(path)
+    def __delete_orphan(self, file_id: str) -> None:
+        try:
+            self.client.delete_file(model_id=self.model_id, file_id=file_id)
+        except (BailoException, ResponseException):
+            # Cleanup is best effort, the original upload error is the one raised
+            pass
 
-        old_file_position = data.tell()
-        data.seek(0, os.SEEK_END)
-        size = data.tell()
-        data.seek(old_file_position, os.SEEK_SET)
+    def _upload(
+        self,
+        path: str,
+        data: BytesIO | None = None,
+        bandwidth: float | Throttle | None = None,
+        compress: bool | int = False,
+    ) -> str:
+        name = os.path.split(os.path.normpath(path))[-1]
+        throttle = self._throttle(bandwidth)
+        if compress and not zstandard_available:
+            raise ImportError("Optional zstandard dependencies (needed for this upload) are not installed.")
+        level = ZSTD_LEVEL if compress is True else compress
 
         if NO_COLOR:
             colour = "white"
         else:
             colour = "blue"
 
+        if data is None and os.path.isdir(path):
+            name = f"{name}.zip"
+            if level:
+                # zstd compresses the whole archive across every core, so entries are stored rather than deflated
+                name += COMPRESSED_SUFFIX
+                chunks = _compress_stream(_zip_stream(path, compression=zipfile.ZIP_STORED), level)
+            else:
+                chunks = _zip_stream(path)
+            with tqdm(
+                total=None,
+                unit="B",
+                unit_scale=True,
+                unit_divisor=BLOCK_SIZE,
+                postfix=_postfix(f"uploading {name}", throttle.limit),
+                colour=colour,
+                disable=not self.client.progress,
+            ) as t:
+                update = _progress(t, throttle, f"uploading {name}")
+                stream = (update(len(chunk)) or chunk for chunk in chunks)
+                res = self.client.simple_upload(self.model_id, name, stream).json()
+            return res["file"]["id"]
+
+        if level and data is None and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                compressible = _is_compressible(f, os.path.getsize(path))
+            if compressible:
+                name += COMPRESSED_SUFFIX
+                with tqdm(
+                    total=os.path.getsize(path),
+                    unit="B",
+                    unit_scale=True,
+                    unit_divisor=BLOCK_SIZE,
+                    postfix=_postfix(f"uploading {name}", throttle.limit),
+                    colour=colour,
+                    disable=not self.client.progress,
+                ) as t:
+                    # Progress and bandwidth follow the file as it is read, as the compressed size is not known
+                    chunks = _MappedFile(path, callback=_progress(t, throttle, f"uploading {name}"))
+                    res = self.client.simple_upload(self.model_id, name, _compress_stream(chunks, level)).json()
+                return res["file"]["id"]
+
+        if data is None and os.path.getsize(path) > 0:
+            with tqdm(
+                total=os.path.getsize(path),
+                unit="B",
+                unit_scale=True,
+                unit_divisor=BLOCK_SIZE,
+                postfix=_postfix(f"uploading {name}", throttle.limit),
+                colour=colour,
+                disable=not self.client.progress,
+            ) as t:
+                body = _MappedFile(path, callback=_progress(t, throttle, f"uploading {name}"))
+                res = self.client.simple_upload(self.model_id, name, body).json()
+            return res["file"]["id"]
+
+        if data is None:
+            with open(path, "rb") as f:
+                return self._upload(path, f, throttle, compress)
+
+        old_file_position = data.tell()
+        data.seek(0, os.SEEK_END)
+        size = data.tell()
+        data.seek(old_file_position, os.SEEK_SET)
+
+        if level and _is_compressible(data, size):
+            name += COMPRESSED_SUFFIX
+            with tqdm(
+                total=size,
+                unit="B",
+                unit_scale=True,
+                unit_divisor=BLOCK_SIZE,
+                postfix=_postfix(f"uploading {name}", throttle.limit),
+                colour=colour,
+                disable=not self.client.progress,
+            ) as t:
+                update = _progress(t, throttle, f"uploading {name}")
+                chunks = (update(len(chunk)) or chunk for chunk in iter(lambda: data.read(UPLOAD_CHUNK_SIZE), b""))
+                res = self.client.simple_upload(self.model_id, name, _compress_stream(chunks, level)).json()
+            return res["file"]["id"]
+
         with tqdm(
-            total=size, unit="B", unit_scale=True, unit_divisor=BLOCK_SIZE, postfix=f"uploading {name}", colour=colour
+            total=size,
+            unit="B",
+            unit_scale=True,
+            unit_divisor=BLOCK_SIZE,
+            postfix=_postfix(f"uploading {name}", throttle.limit),
+            colour=colour,
+            disable=not self.client.progress,
         ) as t:
-            wrapped_buffer = CallbackIOWrapper(t.update, data, "read")
+            wrapped_buffer = CallbackIOWrapper(_progress(t, throttle, f"uploading {name}"), data, "read")
             res = self.client.simple_upload(self.model_id, name, wrapped_buffer).json()
 
-        self.files.append(res["file"]["id"])
-        self.update()
-        if not isinstance(data, BytesIO):
-            data.close()
         return res["file"]["id"]
 
+    def _throttle(self, bandwidth: float | Throttle | None) -> Throttle:
+        if isinstance(bandwidth, Throttle):
+            return bandwidth
+        return Throttle(bandwidth, parent=self.client.bandwidth)
+
     def update(self) -> Any:
         """Update the any changes to this release on Bailo.
 
@@ -313,3 +666,113 @@ class Release:
 
     def __hash__(self) -> int:
         return hash((self.model_id, self.version))
+
+
+def _postfix(description: str, limit: float | None) -> str:
+    if limit is None:
+        return description
+    return f"{description}, limited to {tqdm.format_sizeof(limit, divisor=BLOCK_SIZE)}B/s"
+
+
+def _progress(t: tqdm, throttle: Throttle, description: str):
+    """Build a callback that throttles a transfer and reports its progress, including any change to its limit."""
+    shown = throttle.limit
+
+    def update(size: int) -> None:
+        nonlocal shown
+        throttle.consume(size)
+        if throttle.limit != shown:
+            shown = throttle.limit
+            t.set_postfix_str(_postfix(description, shown), refresh=False)
+        t.update(size)
+
+    return update
+
+
+def _write_atomic(
+    path: str, chunks: Iterator[bytes], size: int, fsync: FsyncPolicy, callback, exact: bool = False
+) -> None:
+    """Write chunks to a preallocated temporary file, then rename it to path so a partial file is never left there.
+
+    :raises BailoException: If exact and the chunks did not add up to size, as when a connection closes early
+    """
+    part = f"{path}.part"
+    try:
+        with open(part, "wb") as f:
+            if size > 0 and hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(f.fileno(), 0, size)
+                except OSError:
+                    # Not every filesystem supports preallocation
+                    pass
+
+            written = unsynced = 0
+            for data in chunks:
+                callback(len(data))
+                f.write(data)
+                written += len(data)
+                unsynced += len(data)
+                if fsync == FsyncPolicy.PERIODIC and unsynced >= FSYNC_INTERVAL:
+                    f.flush()
+                    os.fsync(f.fileno())
+                    unsynced = 0
+
+            if exact and written != size:
+                raise BailoException(f"Download of {path} ended after {written} of {size} bytes.")
+
+            # Drop any preallocated space beyond what the server actually sent
+            f.truncate(written)
+            if fsync != FsyncPolicy.NONE:
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        if os.path.exists(part):
+            os.remove(part)
+        raise
+
+    os.replace(part, path)
+    if fsync != FsyncPolicy.NONE and hasattr(os, "O_DIRECTORY"):
+        # Make the rename itself durable
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _extracts(filename: str, extract: bool) -> bool:
+    return extract and filename.lower().endswith(".zip")
+
+
+def _decompressed_name(filename: str, decompress: bool) -> str:
+    if decompress and filename.endswith(COMPRESSED_SUFFIX):
+        return filename[: -len(COMPRESSED_SUFFIX)]
+    return filename
+
+
+def local_name(filename: str, extract: bool = False, decompress: bool = True) -> str:
+    """Get the name a release file is written to locally by Release.download_all.
+
+    :param filename: Name of the file in the release
+    :param extract: Whether zip files are extracted into a directory, defaults to False
+    :param decompress: Whether compressed files are decompressed, defaults to True
+    :return: The local name, after any decompression and extraction
+    """
+    name = _decompressed_name(filename, decompress)
+    return os.path.splitext(name)[0] if _extracts(name, extract) else name
+
+
+def _ignore(size: int) -> None:
+    pass
+
+
+def is_complete(path: str, size: int | None = None) -> bool:
+    """Check whether a file has already been downloaded.
+
+    :param path: Local path of the file, or of the directory a zip file was extracted into
+    :param size: Expected size of the file, defaults to None to accept any size
+    :return: True if the file exists with the expected size, or the zip file was fully extracted
+    """
+    if os.path.isdir(path):
+        return _is_extracted(path)
+    return os.path.isfile(path) and (size is None or os.path.getsize(path) == size)
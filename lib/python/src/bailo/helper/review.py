@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
+
+from bailo.core.client import Client
+from bailo.core.utils import MAX_WORKERS
+
+
+class Review:
+    """Represent a review within Bailo.
+
+    A review is either for a specific release or for an access request.
+
+    :param client: A client object used to interact with Bailo
+    :param model_id: The unique model ID of the model being reviewed
+    :param role: The role that the review has been requested from
+    :param kind: Kind of review (e.g. release or access)
+    :param semver: Semantic version of the release being reviewed, defaults to None
+    :param access_request_id: Unique ID of the access request being reviewed, defaults to None
+    :param responses: A list of responses given to the review, defaults to []
+    :param created_at: When the review was created, defaults to None
+    :param updated_at: When the review was last updated, defaults to None
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        model_id: str,
+        role: str,
+        kind: str,
+        semver: str | None = None,
+        access_request_id: str | None = None,
+        responses: list[dict[str, Any]] | None = None,
+        created_at: str | None = None,
+        updated_at: str | None = None,
+    ) -> None:
+        if responses is None:
+            responses = []
+
+        self.client = client
+        self.model_id = model_id
+        self.role = role
+        self.kind = kind
+        self.semver = semver
+        self.access_request_id = access_request_id
+        self.responses = responses
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def list(
+        cls,
+        client: Client,
+        active: bool = True,
+        model_ids: list[str] | None = None,
+        max_workers: int = MAX_WORKERS,
+    ) -> list[Review]:
+        """Return all reviews from Bailo, fetching each model's reviews concurrently.
+
+        :param client: A client object used to interact with Bailo
+        :param active: Only return reviews that are still active, defaults to True
+        :param model_ids: A list of unique model IDs to fetch reviews for, defaults to all models
+        :param max_workers: Maximum number of concurrent requests, defaults to MAX_WORKERS
+        :return: A de-duplicated list of Review objects
+        """
+        if model_ids is None:
+            pages = [client.get_reviews(active=active)]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pages = list(
+                    executor.map(lambda model_id: client.get_reviews(active=active, model_id=model_id), set(model_ids))
+                )
+
+        reviews = {}
+        for page in pages:
+            for res in page["reviews"]:
+                review = cls._from_json(client, res)
+                reviews[review.key] = review
+
+        return list(reviews.values())
+
+    @classmethod
+    def _from_json(cls, client: Client, res: dict[str, Any]) -> Review:
+        return cls(
+            client=client,
+            model_id=res["modelId"],
+            role=res["role"],
+            kind=res["kind"],
+            semver=res.get("semver"),
+            access_request_id=res.get("accessRequestId"),
+            responses=res.get("responses"),
+            created_at=res.get("createdAt"),
+            updated_at=res.get("updatedAt"),
+        )
+
+    @property
+    def key(self) -> tuple[str, str | None, str | None, str]:
+        """A tuple that uniquely identifies the review."""
+        return (self.model_id, self.semver, self.access_request_id, self.role)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({str(self)})"
+
+    def __str__(self) -> str:
+        subject = f"v{self.semver}" if self.semver is not None else self.access_request_id
+        return f"{self.model_id} {subject} ({self.role})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, self.__class__):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+
+class ReviewIndex:
+    """An in-memory index of reviews for fast lookups by model, release and role.
+
+    .. code-block:: python
+
+       index = ReviewIndex(client, model_ids=["yolo-abc123", "resnet-def456"])
+       index.refresh()
+       pending = index.get(model_id="yolo-abc123", semver="1.0.0")
+       changes = index.refresh()
+
+    :param client: A client object used to interact with Bailo
+    :param active: Only index reviews that are still active, defaults to True
+    :param model_ids: A list of unique model IDs to index reviews for, defaults to all models
+    :param max_workers: Maximum number of concurrent requests, defaults to MAX_WORKERS
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        active: bool = True,
+        model_ids: list[str] | None = None,
+        max_workers: int = MAX_WORKERS,
+    ) -> None:
+        self.client = client
+        self.active = active
+        self.model_ids = model_ids
+        self.max_workers = max_workers
+
+        self._reviews = {}
+        self._by_model = {}
+        self._by_release = {}
+        self._by_role = {}
+
+    def refresh(self) -> dict[str, list[Review]]:
+        """Fetch reviews from Bailo and apply any changes since the last fetch to the index.
+
+        Reviews whose last update time is unchanged are left untouched.
+
+        :return: Dictionary of added, updated and removed reviews
+        """
+        latest = {
+            review.key: review
+            for review in Review.list(
+                self.client, active=self.active, model_ids=self.model_ids, max_workers=self.max_workers
+            )
+        }
+        changes = {"added": [], "updated": [], "removed": []}
+
+        for key in set(self._reviews) - set(latest):
+            changes["removed"].append(self._remove(key))
+
+        for key, review in latest.items():
+            current = self._reviews.get(key)
+            if current is None:
+                changes["added"].append(review)
+            elif current.updated_at != review.updated_at:
+                self._remove(key)
+                changes["updated"].append(review)
+            else:
+                continue
+            self._add(review)
+
+        return changes
+
+    def get(
+        self,
+        model_id: str | None = None,
+        semver: str | None = None,
+        role: str | None = None,
+    ) -> list[Review]:
+        """Get reviews matching all of the given criteria.
+
+        :param model_id: Unique model ID, defaults to None
+        :param semver: Semantic version of a release, requires model_id, defaults to None
+        :param role: Reviewing role (e.g. mtr), defaults to None
+        :return: List of matching Review objects
+        """
+        if semver is not None:
+            candidates = self._by_release.get((model_id, str(semver)), {})
+        elif model_id is not None:
+            candidates = self._by_model.get(model_id, {})
+        elif role is not None:
+            candidates = self._by_role.get(str(role), {})
+        else:
+            candidates = self._reviews
+
+        if role is None:
+            return list(candidates.values())
+        return [review for review in candidates.values() if review.role == str(role)]
+
+    def _add(self, review: Review) -> None:
+        self._reviews[review.key] = review
+        self._by_model.setdefault(review.model_id, {})[review.key] = review
+        self._by_role.setdefault(review.role, {})[review.key] = review
+        if review.semver is not None:
+            self._by_release.setdefault((review.model_id, review.semver), {})[review.key] = review
+
+    def _remove(self, key: tuple) -> Review:
+        review = self._reviews.pop(key)
+        self._by_model[review.model_id].pop(key)
+        self._by_role[review.role].pop(key)
+        if review.semver is not None:
+            self._by_release[(review.model_id, review.semver)].pop(key)
+        return review
+
+    def __len__(self) -> int:
+        return len(self._reviews)
+
+    def __iter__(self) -> Iterator[Review]:
+        return iter(list(self._reviews.values()))
+
+    def __contains__(self, review: Review) -> bool:
+        return review.key in self._reviews
@@ -1,9 +1,30 @@
 from __future__ import annotations
 
-from typing import Any
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable
 
 from bailo.core.client import Client
 from bailo.core.enums import SchemaKind
+from bailo.core.exceptions import SchemaValidationException
+
+try:
+    import jsonschema
+
+    json_schema_validation = True
+except ImportError:
+    json_schema_validation = False
+
+# Maximum number of compiled validators kept in memory
+VALIDATOR_CACHE_SIZE = 128
+
+# Compiled validators by hash of their JSON schema, so a changed schema never reuses a stale validator
+_validators = OrderedDict()
+# Hash of the JSON schema last seen for each (url, schema ID), used by Schema.validate_metadata
+_schema_hashes = OrderedDict()
+_validators_lock = threading.Lock()
 
 
 class Schema:
@@ -89,14 +110,100 @@ class Schema:
 
         return schema
 
+    @classmethod
+    def validate_metadata(cls, client: Client, schema_id: str, metadata: Any) -> None:
+        """Validate metadata locally against a schema on Bailo, without refetching a cached schema.
+
+        :param client: A client object used to interact with Bailo
+        :param schema_id: A unique schema ID
+        :param metadata: Metadata object, defined by the schema
+        :raises SchemaValidationException: If the metadata is not valid against the schema
+        """
+        if not json_schema_validation:
+            raise ImportError("Optional jsonschema dependencies (needed for this method) are not installed.")
+
+        with _validators_lock:
+            schema_hash = _schema_hashes.get((client.url, schema_id))
+        validator = _get_validator(schema_hash) if schema_hash is not None else None
+        if validator is None:
+            validator = cls.from_id(client=client, schema_id=schema_id)._validator()
+
+        errors = _errors(validator, metadata)
+        if errors:
+            raise SchemaValidationException(errors)
+
+    def validate(self, metadata: Any) -> None:
+        """Validate metadata locally against the schema.
+
+        :param metadata: Metadata object, defined by the schema
+        :raises SchemaValidationException: If the metadata is not valid against the schema
+        """
+        errors = _errors(self._validator(), metadata)
+        if errors:
+            raise SchemaValidationException(errors)
+
+    def validate_many(self, items: Iterable[Any]) -> list[list[str]]:
+        """Validate many metadata objects locally against the schema.
+
+        :param items: An iterable of metadata objects, defined by the schema
+        :return: A list of validation errors for each item, empty if the item is valid
+        """
+        validator = self._validator()
+        return [_errors(validator, metadata) for metadata in items]
+
+    def _validator(self):
+        if not json_schema_validation:
+            raise ImportError("Optional jsonschema dependencies (needed for this method) are not installed.")
+
+        schema_hash = _hash(self.json_schema)
+        _remember(_schema_hashes, (self.client.url, self.schema_id), schema_hash)
+
+        validator = _get_validator(schema_hash)
+        if validator is None:
+            validator_class = jsonschema.validators.validator_for(self.json_schema)
+            validator_class.check_schema(self.json_schema)
+            validator = validator_class(self.json_schema)
+            _remember(_validators, schema_hash, validator)
+
+        return validator
+
     def __unpack(self, res) -> None:
         self.schema_id = res["id"]
         self.name = res["name"]
         self.description = res["description"]
         kind = res["kind"]
         self.json_schema = res["jsonSchema"]
+        _remember(_schema_hashes, (self.client.url, self.schema_id), _hash(self.json_schema))
 
         if kind == "model":
             self.kind = SchemaKind.MODEL
         if kind == "accessRequest":
             self.kind = SchemaKind.ACCESS_REQUEST
+
+
+def _hash(json_schema: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(json_schema, sort_keys=True).encode()).hexdigest()
+
+
+def _remember(cache: OrderedDict, key: Any, value: Any) -> None:
+    with _validators_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > VALIDATOR_CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def _get_validator(key: str):
+    with _validators_lock:
+        validator = _validators.get(key)
+        if validator is not None:
+            _validators.move_to_end(key)
+    return validator
+
+
+def _errors(validator, metadata: Any) -> list[str]:
+    errors = []
+    for error in sorted(validator.iter_errors(metadata), key=lambda e: list(map(str, e.absolute_path))):
+        path = ".".join(map(str, error.absolute_path)) or "<root>"
+        errors.append(f"{path}: {error.message}")
+    return errors
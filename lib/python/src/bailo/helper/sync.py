@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from urllib.parse import urlparse
+
+from bailo.core.client import Client
+from bailo.core.enums import EntryKind, FsyncPolicy
+from bailo.core.utils import MAX_WORKERS, TokenBucket
+from bailo.helper.release import _write_atomic
+from semantic_version import Version
+from tqdm.utils import CallbackIOWrapper
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+# Number of bytes written to disk at a time when downloading files
+CHUNK_SIZE = 1024 * 1024
+
+
+class Mirror:
+    """Mirror models, model cards, releases and files from Bailo into a local directory.
+
+    Model, card and release metadata are recorded in a manifest at the root of the directory, and each file is
+    stored once per model under ``<model_id>/files/<file_id>/<name>``. Bailo never changes the contents of a file ID,
+    so repeated syncs only transfer files that are not already held locally with the expected size and hash.
+
+    .. code-block:: python
+
+       mirror = Mirror(client, "/data/bailo-mirror")
+       plan = mirror.sync(["yolo-abc123"], dry_run=True)
+       mirror.sync(["yolo-abc123"])
+
+    :param client: A client object used to interact with Bailo
+    :param path: Local directory to mirror into
+    :param max_workers: Maximum number of concurrent requests and transfers, defaults to MAX_WORKERS
+    """
+
+    def __init__(self, client: Client, path: str, max_workers: int = MAX_WORKERS) -> None:
+        self.client = client
+        self.path = path
+        self.max_workers = max_workers
+
+        self.manifest = self._read_manifest()
+
+    def plan(self, model_ids: list[str], verify: bool = False) -> dict[str, Any]:
+        """Work out what a sync would transfer, without changing anything locally.
+
+        :param model_ids: Unique model IDs to mirror
+        :param verify: Re-hash local files rather than trusting their recorded size, defaults to False
+        :return: Dictionary of the latest model metadata, files to download, files to remove and bytes to transfer
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            remote = dict(zip(model_ids, executor.map(self._fetch_model, model_ids)))
+
+        download, remove = [], []
+        for model_id, entry in remote.items():
+            local_files = self.manifest["models"].get(model_id, {}).get("files", {})
+            for file_id, file in entry["files"].items():
+                if not self._is_current(local_files.get(file_id), file, verify):
+                    download.append({"model_id": model_id, "file_id": file_id, **file})
+            for file_id, file in local_files.items():
+                if file_id not in entry["files"]:
+                    remove.append({"model_id": model_id, "file_id": file_id, **file})
+
+        return {
+            "models": remote,
+            "download": download,
+            "remove": remove,
+            "bytes": sum(file["size"] or 0 for file in download),
+        }
+
+    def sync(self, model_ids: list[str], dry_run: bool = False, prune: bool = True, verify: bool = False):
+        """Bring the local mirror up to date with Bailo.
+
+        :param model_ids: Unique model IDs to mirror
+        :param dry_run: Only return the plan, without transferring anything, defaults to False
+        :param prune: Remove local files no longer in any release, defaults to True
+        :param verify: Re-hash local files rather than trusting their recorded size, defaults to False
+        :return: The plan that was carried out, see Mirror.plan
+        """
+        plan = self.plan(model_ids, verify=verify)
+        if dry_run:
+            return plan
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            hashes = list(executor.map(self._download, plan["download"]))
+
+        for file, sha256 in zip(plan["download"], hashes):
+            plan["models"][file["model_id"]]["files"][file["file_id"]]["sha256"] = sha256
+
+        for model_id, entry in plan["models"].items():
+            local_files = self.manifest["models"].get(model_id, {}).get("files", {})
+            for file_id, file in entry["files"].items():
+                if file["sha256"] is None:
+                    file["sha256"] = local_files[file_id]["sha256"]
+            if not prune:
+                for file_id, file in local_files.items():
+                    entry["files"].setdefault(file_id, file)
+
+            self.manifest["models"][model_id] = entry
+
+        if prune:
+            for file in plan["remove"]:
+                shutil.rmtree(os.path.join(self.path, os.path.dirname(file["path"])), ignore_errors=True)
+
+        self._write_manifest()
+        return plan
+
+    def file_path(self, model_id: str, file_id: str) -> str:
+        """Get the local path of a mirrored file.
+
+        :param model_id: Unique model ID
+        :param file_id: Unique file ID
+        :return: Absolute path of the file
+        """
+        return os.path.join(self.path, self.manifest["models"][model_id]["files"][file_id]["path"])
+
+    def _fetch_model(self, model_id: str) -> dict[str, Any]:
+        model = self.client.get_model(model_id=model_id)["model"]
+        releases = self.client.get_all_releases(model_id=model_id)["releases"]
+
+        card = model.pop("card", None)
+        entry = {"model": model, "card": card, "releases": {}, "files": {}}
+        for release in releases:
+            for file in release.pop("files", []):
+                entry["files"][file["_id"]] = {
+                    "name": file["name"],
+                    "size": file.get("size"),
+                    "mime": file.get("mime"),
+                    "path": os.path.join(model_id, "files", file["_id"], os.path.basename(file["name"])),
+                    "sha256": None,
+                }
+            release.pop("model", None)
+            entry["releases"][release["semver"]] = release
+
+        return entry
+
+    def _is_current(self, local: dict[str, Any] | None, remote: dict[str, Any], verify: bool) -> bool:
+        if local is None or local.get("sha256") is None:
+            return False
+
+        path = os.path.join(self.path, local["path"])
+        if not os.path.isfile(path) or (remote["size"] is not None and os.path.getsize(path) != remote["size"]):
+            return False
+        return not verify or _sha256(path) == local["sha256"]
+
+    def _download(self, file: dict[str, Any]) -> str:
+        path = os.path.join(self.path, file["path"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        res = self.client.get_download_file(model_id=file["model_id"], file_id=file["file_id"])
+        digest = hashlib.sha256()
+        chunks = (digest.update(data) or data for data in res.iter_content(CHUNK_SIZE))
+        # A decoded body is longer than the content-length the server sent for it
+        exact = "content-length" in res.headers and "content-encoding" not in res.headers
+        # Written alongside the final path and renamed, so an interrupted sync never leaves a partial file in place
+        _write_atomic(
+            path,
+            chunks,
+            int(res.headers.get("content-length", 0)),
+            FsyncPolicy.NONE,
+            self.client.bandwidth.consume,
+            exact=exact,
+        )
+
+        return digest.hexdigest()
+
+    def _read_manifest(self) -> dict[str, Any]:
+        try:
+            with open(os.path.join(self.path, MANIFEST_NAME)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"version": MANIFEST_VERSION, "url": self.client.url, "models": {}}
+
+    def _write_manifest(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path, MANIFEST_NAME)
+        with open(f"{path}.part", "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(f"{path}.part", path)
+
+
+class Replicator:
+    """Recreate the models, model cards, releases and files of a local mirror in a Bailo instance.
+
+    Progress is checkpointed to a file in the mirror directory after every step, so an interrupted replication
+    resumes where it left off and never uploads the same file twice.
+
+    .. code-block:: python
+
+       replicator = Replicator(prod_client, "/data/bailo-mirror", rate=20)
+       model_ids = replicator.replicate()
+
+    :param client: A client object for the Bailo instance to replicate into
+    :param path: Local directory of a mirror created by Mirror
+    :param max_workers: Maximum number of models and, separately, files handled concurrently, defaults to MAX_WORKERS
+    :param rate: Maximum number of requests per second across all threads, defaults to unlimited
+    :param team_id: Team to create models in if the mirror does not record one, defaults to Uncategorised
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        path: str,
+        max_workers: int = MAX_WORKERS,
+        rate: float | None = None,
+        team_id: str = "Uncategorised",
+    ) -> None:
+        self.client = client
+        self.path = path
+        self.max_workers = max_workers
+        self.team_id = team_id
+
+        self._limiter = TokenBucket(rate) if rate else None
+        self._lock = threading.Lock()
+
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            self.manifest = json.load(f)
+
+        destination = urlparse(client.url).netloc.replace(":", "_")
+        self.checkpoint_path = os.path.join(path, f"replication-{destination}.json")
+        try:
+            with open(self.checkpoint_path) as f:
+                self.checkpoint = json.load(f)
+        except FileNotFoundError:
+            self.checkpoint = {"models": {}}
+
+    def replicate(self, model_ids: list[str] | None = None) -> dict[str, str]:
+        """Replicate models from the mirror.
+
+        :param model_ids: Unique model IDs in the mirror to replicate, defaults to every mirrored model
+        :return: Dictionary of mirrored model IDs to the IDs of the replicated models
+        """
+        if model_ids is None:
+            model_ids = list(self.manifest["models"])
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as files_executor:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as models_executor:
+                replicated = models_executor.map(
+                    lambda model_id: self._replicate_model(model_id, files_executor), model_ids
+                )
+                return dict(zip(model_ids, replicated))
+
+    def _replicate_model(self, model_id: str, files_executor: ThreadPoolExecutor) -> str:
+        entry = self.manifest["models"][model_id]
+        with self._lock:
+            progress = self.checkpoint["models"].setdefault(
+                model_id, {"id": None, "schema": False, "card_version": None, "files": {}, "releases": []}
+            )
+
+        if progress["id"] is None:
+            model = entry["model"]
+            self._limit()
+            res = self.client.post_model(
+                name=model["name"],
+                kind=EntryKind(model.get("kind", "model")),
+                description=model["description"],
+                team_id=model.get("teamId", self.team_id),
+                visibility=model.get("visibility"),
+            )
+            self._save(progress, "id", res["model"]["id"])
+        new_id = progress["id"]
+
+        card = entry["card"]
+        if card is not None and not progress["schema"]:
+            self._limit()
+            self.client.model_card_from_schema(model_id=new_id, schema_id=card["schemaId"])
+            self._save(progress, "schema", True)
+        if card is not None and progress["card_version"] is None:
+            self._limit()
+            res = self.client.put_model_card(model_id=new_id, metadata=card.get("metadata", {}))
+            self._save(progress, "card_version", res["card"]["version"])
+
+        pending = [file_id for file_id in entry["files"] if file_id not in progress["files"]]
+        for file_id, new_file_id in zip(
+            pending, files_executor.map(lambda file_id: self._upload(model_id, new_id, file_id), pending)
+        ):
+            self._save(progress["files"], file_id, new_file_id)
+
+        for semver in sorted(entry["releases"], key=Version):
+            if semver in progress["releases"]:
+                continue
+            release = entry["releases"][semver]
+            self._limit()
+            self.client.post_release(
+                model_id=new_id,
+                release_version=semver,
+                notes=release.get("notes", ""),
+                file_ids=[progress["files"][file_id] for file_id in release.get("fileIds", [])],
+                images=release.get("images", []),
+                model_card_version=progress["card_version"],
+                minor=release.get("minor", False),
+                draft=release.get("draft", False),
+            )
+            with self._lock:
+                progress["releases"].append(semver)
+                self._write_checkpoint()
+
+        return new_id
+
+    def _upload(self, model_id: str, new_id: str, file_id: str) -> str:
+        file = self.manifest["models"][model_id]["files"][file_id]
+        self._limit()
+        with open(os.path.join(self.path, file["path"]), "rb") as f:
+            wrapped_buffer = CallbackIOWrapper(self.client.bandwidth.consume, f, "read")
+            res = self.client.simple_upload(new_id, file["name"], wrapped_buffer).json()
+        return res["file"]["id"]
+
+    def _limit(self) -> None:
+        if self._limiter is not None:
+            self._limiter.acquire()
+
+    def _save(self, progress: dict[str, Any], key: str, value: Any) -> None:
+        with self._lock:
+            progress[key] = value
+            self._write_checkpoint()
+
+    def _write_checkpoint(self) -> None:
+        with open(f"{self.checkpoint_path}.part", "w") as f:
+            json.dump(self.checkpoint, f, indent=2, sort_keys=True)
+        os.replace(f"{self.checkpoint_path}.part", self.checkpoint_path)
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while data := f.read(CHUNK_SIZE):
+            digest.update(data)
+    return digest.hexdigest()
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import gzip
+import json
+import shutil
+import ssl
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from bailo import Agent, PkiAgent, TokenAgent
+from bailo.core.exceptions import BailoException
+
+URL = "https://example.com/api/v2/model/test_id"
+
+
+def test_agent_limits_concurrent_metadata_requests(mocker):
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def request(*args, **kwargs):
+        with lock:
+            in_flight.append(args)
+            peak.append(len(in_flight))
+        time.sleep(0.02)
+        with lock:
+            in_flight.pop()
+        return mocker.Mock(status_code=200)
+
+    agent = Agent(max_in_flight=2)
+    mocker.patch.object(agent.transport, "request", side_effect=request)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: agent.get("https://example.com/api/v2/models"), range(8)))
+
+    assert max(peak) == 2
+
+
+def test_agent_budgets_are_separate(requests_mock):
+    requests_mock.get("https://example.com/download", content=b"data")
+    requests_mock.get("https://example.com/api/v2/models", json={})
+    agent = Agent(max_transfers=1)
+
+    res = agent.get("https://example.com/download", stream=True)
+    # The transfer holds its slot until consumed, without blocking metadata calls
+    assert agent.get("https://example.com/api/v2/models").json() == {}
+    assert not agent.transfer_budget._semaphore.acquire(blocking=False)
+
+    assert b"".join(res.iter_content(2)) == b"data"
+    assert agent.transfer_budget._semaphore.acquire(blocking=False)
+
+
+def test_agent_releases_slot_on_error(requests_mock):
+    requests_mock.get("https://example.com/api/v2/models", status_code=404, json={"error": {"message": "Not found"}})
+    agent = Agent(max_in_flight=1)
+
+    for _ in range(2):
+        with pytest.raises(BailoException):
+            agent.get("https://example.com/api/v2/models")
+
+
+def test_agent_limit_at_runtime():
+    agent = TokenAgent(access_key="access", secret_key="secret", rate=10)
+    assert agent.metadata_budget.rate == 10
+
+    agent.limit(max_transfers=4)
+
+    assert agent.metadata_budget.rate is None
+    assert agent.transfer_budget.max_in_flight == 4
+
+
+def response(status_code, content):
+    res = requests.Response()
+    res.status_code = status_code
+    res._content = content
+    return res
+
+
+def test_agent_coalesces_identical_gets(mocker):
+    def request(*args, **kwargs):
+        time.sleep(0.1)
+        return response(200, b'{"model": {"id": "test_id"}}')
+
+    agent = Agent(coalesce=True)
+    send = mocker.patch.object(agent.transport, "request", side_effect=request)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(lambda i: agent.get(URL, params={"page": i % 2}).json(), range(8)))
+
+    assert send.call_count == 2
+    # Every caller gets a result of its own to modify
+    assert all(model == {"model": {"id": "test_id"}} for model in models)
+    assert len({id(model) for model in models}) == 8
+
+    # Nothing is shared once the request has finished
+    agent.get(URL, params={"page": 0})
+    assert send.call_count == 3
+
+
+def test_agent_coalesced_errors(mocker):
+    def request(*args, **kwargs):
+        time.sleep(0.1)
+        return response(404, b'{"error": {"message": "Not found"}}')
+
+    agent = Agent(coalesce=True)
+    send = mocker.patch.object(agent.transport, "request", side_effect=request)
+
+    def get(_):
+        with pytest.raises(BailoException, match="Not found"):
+            agent.get(URL)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(get, range(4)))
+
+    assert send.call_count == 1
+    assert agent._in_flight == {}
+
+
+def openssl(*args):
+    subprocess.run(["openssl", *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def pki(tmp_path):
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is not installed")
+
+    ec = ["-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1", "-nodes"]
+    openssl("req", "-x509", *ec, "-keyout", tmp_path / "ca.key", "-out", tmp_path / "ca.crt", "-subj", "/CN=ca")
+    (tmp_path / "san.ext").write_text("subjectAltName=DNS:localhost")
+    ca = [
+        "-CA",
+        tmp_path / "ca.crt",
+        "-CAkey",
+        tmp_path / "ca.key",
+        "-CAcreateserial",
+        "-extfile",
+        tmp_path / "san.ext",
+    ]
+    for name in ("server", "client"):
+        csr, crt, key = (tmp_path / f"{name}.{suffix}" for suffix in ("csr", "crt", "key"))
+        openssl("req", *ec, "-keyout", key, "-out", csr, "-subj", f"/CN={name}")
+        openssl("x509", "-req", "-in", csr, *ca, "-out", crt)
+
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(tmp_path / "server.crt", tmp_path / "server.key")
+    context.load_verify_locations(tmp_path / "ca.crt")
+    context.verify_mode = ssl.CERT_REQUIRED
+
+    resumed = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            resumed.append(self.connection.session_reused)
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("localhost", 0), Handler)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield {
+        "url": f"https://localhost:{server.server_address[1]}",
+        "cert": str(tmp_path / "client.crt"),
+        "key": str(tmp_path / "client.key"),
+        "auth": str(tmp_path / "ca.crt"),
+        "resumed": resumed,
+    }
+    server.shutdown()
+    server.server_close()
+
+
+def test_pki_agent_resumes_tls_sessions(pki, mocker):
+    agent = PkiAgent(cert=pki["cert"], key=pki["key"], auth=pki["auth"], share_sessions=False)
+    load_cert_chain = mocker.spy(ssl.SSLContext, "load_cert_chain")
+
+    # The server closes every connection, so each request needs a new handshake
+    for _ in range(3):
+        assert agent.get(f"{pki['url']}/api/v2/models").json() == {}
+
+    assert pki["resumed"] == [False, True, True]
+    load_cert_chain.assert_not_called()
+
+
+def test_pki_agents_share_sessions(pki):
+    first = PkiAgent(cert=pki["cert"], key=pki["key"], auth=pki["auth"])
+    second = PkiAgent(cert=pki["cert"], key=pki["key"], auth=pki["auth"])
+    separate = PkiAgent(cert=pki["cert"], key=pki["key"], auth=pki["auth"], share_sessions=False)
+
+    for agent in (first, second, separate):
+        agent.get(f"{pki['url']}/api/v2/models")
+
+    assert first.ssl_context is second.ssl_context
+    assert separate.ssl_context is not first.ssl_context
+    assert pki["resumed"] == [False, True, False]
+
+
+def test_agent_compresses_large_json(requests_mock):
+    requests_mock.put(URL, json={})
+    card = {"metrics": [{"name": "accuracy", "value": 0.5}] * 100}
+
+    Agent().put(URL, json=card)
+    assert "Content-Encoding" not in requests_mock.last_request.headers
+
+    agent = Agent(compression="gzip")
+    agent.put(URL, json={"small": True})
+    assert "Content-Encoding" not in requests_mock.last_request.headers
+    assert requests_mock.last_request.json() == {"small": True}
+
+    agent.put(URL, json=card)
+    assert requests_mock.last_request.headers["Content-Encoding"] == "gzip"
+    assert requests_mock.last_request.headers["Content-Type"] == "application/json"
+    assert json.loads(gzip.decompress(requests_mock.last_request.body)) == card
+
+
+def test_agent_falls_back_to_uncompressed(requests_mock):
+    def put(request, context):
+        if "Content-Encoding" in request.headers:
+            context.status_code = 415
+            return {"error": {"message": "Unsupported content encoding"}}
+        return {}
+
+    requests_mock.put(URL, json=put)
+    agent = Agent(compression="gzip")
+    card = {"metrics": [{"name": "accuracy", "value": 0.5}] * 100}
+
+    assert agent.put(URL, json=card).json() == {}
+    assert requests_mock.last_request.json() == card
+    assert agent.compression is None
+    assert requests_mock.call_count == 2
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import struct
+
+import pytest
+from bailo import Checkpoint, Client, Release
+from bailo.core.exceptions import BailoException
+
+URL = "https://example.com/api/v2/model/test_id/release/1.0.0"
+
+
+def safetensors(tensors):
+    header, data = {}, b""
+    for name, blob in tensors.items():
+        header[name] = {"dtype": "U8", "shape": [len(blob)], "data_offsets": [len(data), len(data) + len(blob)]}
+        data += blob
+    header["__metadata__"] = {"format": "pt"}
+    encoded = json.dumps(header).encode()
+    return struct.pack("<Q", len(encoded)) + encoded + data
+
+
+def serve(requests_mock, files):
+    requests_mock.get(
+        URL,
+        json={"release": {"files": [{"_id": name, "name": name, "size": len(blob)} for name, blob in files.items()]}},
+    )
+    mocks = {}
+    for name, blob in files.items():
+
+        def content(request, context, blob=blob):
+            if "Range" not in request.headers:
+                return blob
+            start, end = (int(offset) for offset in request.headers["Range"][len("bytes=") :].split("-"))
+            context.status_code = 206
+            return blob[start : end + 1]
+
+        mocks[name] = requests_mock.get(f"{URL}/file/{name}/download", content=content)
+    return mocks
+
+
+@pytest.fixture
+def sharded(requests_mock):
+    shard_1 = safetensors({"embed": b"a" * 100, "layer.0": b"b" * 200_000})
+    shard_2 = safetensors({"layer.1": b"c" * 50, "head": b"d" * 10})
+    index = {
+        "metadata": {},
+        "weight_map": {
+            "embed": "model-1.safetensors",
+            "layer.0": "model-1.safetensors",
+            "layer.1": "model-2.safetensors",
+            "head": "model-2.safetensors",
+        },
+    }
+    mocks = serve(
+        requests_mock,
+        {
+            "model.safetensors.index.json": json.dumps(index).encode(),
+            "model-1.safetensors": shard_1,
+            "model-2.safetensors": shard_2,
+        },
+    )
+    checkpoint = Checkpoint(Release(client=Client("https://example.com"), model_id="test_id", version="1.0.0"))
+    return checkpoint, mocks
+
+
+def test_tensors(sharded):
+    checkpoint, mocks = sharded
+
+    tensors = checkpoint.tensors()
+
+    assert checkpoint.shards() == ["model-1.safetensors", "model-2.safetensors"]
+    assert set(tensors) == {"embed", "layer.0", "layer.1", "head"}
+    assert tensors["head"]["shape"] == [10]
+    # Only the headers were read
+    assert all(
+        request.headers["Range"].startswith("bytes=0-") for request in mocks["model-1.safetensors"].request_history
+    )
+
+
+def test_tensors_reads_only_needed_shards(sharded):
+    checkpoint, mocks = sharded
+
+    assert list(checkpoint.tensors(["head"])) == ["head"]
+    assert mocks["model-1.safetensors"].call_count == 0
+    with pytest.raises(BailoException):
+        checkpoint.tensors(["missing"])
+
+
+def test_read_and_extract(sharded, tmp_path):
+    checkpoint, mocks = sharded
+
+    data = checkpoint.read(["head", "layer.1", "embed"])
+    assert data == {"head": b"d" * 10, "layer.1": b"c" * 50, "embed": b"a" * 100}
+
+    path = checkpoint.extract(str(tmp_path / "subset.safetensors"), checkpoint.match("layer.1", "h*"))
+    with open(path, "rb") as f:
+        (size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(size))
+        assert (8 + size) % 8 == 0
+        assert f.read() == b"c" * 50 + b"d" * 10
+    assert header["head"]["data_offsets"] == [50, 60]
+
+
+def test_download_only_needed_shards(sharded, tmp_path):
+    checkpoint, _ = sharded
+
+    names = checkpoint.download(str(tmp_path), tensors=["head"])
+
+    assert sorted(names) == ["model-2.safetensors", "model.safetensors.index.json"]
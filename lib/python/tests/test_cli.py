@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import os
+
+from bailo.cli import main
+
+URL = "https://example.com"
+
+
+def release_json(files):
+    return {
+        "semver": "1.0.0",
+        "modelCardVersion": 1,
+        "notes": "",
+        "fileIds": [file["_id"] for file in files],
+        "files": files,
+        "images": [],
+        "minor": False,
+        "draft": False,
+    }
+
+
+def mock_release(requests_mock, files):
+    requests_mock.get(f"{URL}/api/v2/model/test_id/release/1.0.0", json={"release": release_json(files)})
+    for file in files:
+        requests_mock.get(
+            f"{URL}/api/v2/model/test_id/release/1.0.0/file/{file['name']}/download",
+            content=b"x" * file["size"],
+        )
+
+
+def run(capsys, *argv):
+    code = main(["--url", URL, "--no-progress", *argv])
+    out, err = capsys.readouterr()
+    return code, json.loads(out or err)
+
+
+def test_release_ls(requests_mock, capsys):
+    files = [{"_id": "file_1", "name": "a.txt", "size": 3}]
+    requests_mock.get(f"{URL}/api/v2/model/test_id/releases", json={"releases": [release_json(files)]})
+
+    code, summary = run(capsys, "release", "ls", "test_id")
+
+    assert code == 0
+    assert summary["command"] == "release"
+    assert summary["releases"][0]["version"] == "1.0.0"
+    assert summary["releases"][0]["files"] == 1
+    assert "seconds" in summary
+
+
+def test_download_resume(requests_mock, capsys, tmp_path):
+    files = [{"_id": "file_1", "name": "a.txt", "size": 3}, {"_id": "file_2", "name": "b.txt", "size": 5}]
+    mock_release(requests_mock, files)
+    (tmp_path / "a.txt").write_bytes(b"xxx")
+
+    code, summary = run(capsys, "download", "test_id", "1.0.0", "--path", str(tmp_path), "--resume")
+
+    assert code == 0
+    assert summary["files"] == ["b.txt"]
+    assert summary["bytes"] == 5
+    assert (tmp_path / "b.txt").read_bytes() == b"xxxxx"
+
+
+def test_download_cache(requests_mock, capsys, tmp_path):
+    files = [{"_id": "file_1", "name": "a.txt", "size": 3}]
+    mock_release(requests_mock, files)
+    cache = tmp_path / "cache"
+
+    for destination in ("first", "second"):
+        code, summary = run(
+            capsys, "download", "test_id", "1.0.0", "--path", str(tmp_path / destination), "--cache", str(cache)
+        )
+        assert code == 0
+        assert (tmp_path / destination / "a.txt").read_bytes() == b"xxx"
+
+    assert summary["cached"] == 1
+    assert summary["bytes"] == 0
+    assert os.path.isfile(cache / "test_id" / "files" / "file_1" / "a.txt")
+    assert len([request for request in requests_mock.request_history if "download" in request.url]) == 1
+
+
+def test_error_summary(requests_mock, capsys):
+    requests_mock.get(
+        f"{URL}/api/v2/model/test_id/release/1.0.0", status_code=404, json={"error": {"message": "Not found"}}
+    )
+
+    code, summary = run(capsys, "download", "test_id", "1.0.0")
+
+    assert code == 1
+    assert summary == {"command": "download", "error": "Not found"}
+
+
+def test_upload(requests_mock, capsys, tmp_path):
+    mock_release(requests_mock, [])
+    requests_mock.post(f"{URL}/api/v2/model/test_id/files/upload/simple", json={"file": {"id": "file_id"}})
+    requests_mock.put(f"{URL}/api/v2/model/test_id/release/1.0.0", json={"release": release_json([])})
+    (tmp_path / "weights").mkdir()
+    (tmp_path / "weights" / "model.pth").write_bytes(b"x" * 10)
+    (tmp_path / "config.json").write_text("{}")
+
+    code, summary = run(capsys, "upload", "test_id", "1.0.0", str(tmp_path / "weights"), str(tmp_path / "config.json"))
+
+    assert code == 0
+    assert summary["bytes"] == 12
+    # Progress bars are hidden for this client only, rather than for the whole process
+    assert "TQDM_DISABLE" not in os.environ
+
+
+def test_errors_are_json(requests_mock, capsys, tmp_path, mocker):
+    mock_release(requests_mock, [])
+
+    code, summary = run(capsys, "upload", "test_id", "1.0.0", str(tmp_path / "missing.bin"))
+
+    assert code == 1
+    assert summary["command"] == "upload"
+    assert "missing.bin" in summary["error"]
+
+    mocker.patch("bailo.cli.HttpxTransport", side_effect=ImportError("Optional httpx dependencies are not installed."))
+    code, summary = run(capsys, "--http2", "release", "ls", "test_id")
+
+    assert code == 1
+    assert "httpx" in summary["error"]
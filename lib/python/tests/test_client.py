@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import json
+import threading
+
+import pytest
 
 from bailo import Client, ModelVisibility, SchemaKind
 from bailo.core.enums import EntryKind
@@ -354,3 +357,51 @@ def test_patch_access_request(requests_mock):
     )
 
     assert result == {"success": True}
+
+
+def test_concurrent_client(requests_mock):
+    for model_id in ("a", "b", "c"):
+        requests_mock.get(f"https://example.com/api/v2/model/{model_id}", json={"model": {"id": model_id}})
+
+    client = Client("https://example.com")
+    with client.concurrent(max_workers=2) as pool:
+        future = pool.get_model(model_id="a")
+        models = list(pool.map(client.get_model, ["a", "b", "c"]))
+        names = list(pool.map("get_model", ["c"]))
+
+    assert future.result() == {"model": {"id": "a"}}
+    assert [model["model"]["id"] for model in models] == ["a", "b", "c"]
+    assert names == [{"model": {"id": "c"}}]
+
+
+def test_concurrent_client_bounds_queue():
+    release = threading.Event()
+    pool = Client("https://example.com").concurrent(max_workers=1, max_queued=1)
+
+    running = pool.submit(release.wait)
+    queued = pool.submit(release.wait)
+    # A third call has to wait for room in the queue
+    blocked = threading.Thread(target=pool.submit, args=(release.wait,))
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+
+    release.set()
+    blocked.join()
+    assert running.result() and queued.result()
+    pool.shutdown()
+
+
+def test_concurrent_client_cancels_on_error():
+    release = threading.Event()
+    pool = Client("https://example.com").concurrent(max_workers=1, max_queued=4)
+
+    with pytest.raises(RuntimeError):
+        with pool:
+            running = pool.submit(release.wait, 5)
+            queued = [pool.submit(release.wait, 5) for _ in range(3)]
+            threading.Timer(0.1, release.set).start()
+            raise RuntimeError()
+
+    assert running.result()
+    assert all(future.cancelled() for future in queued)
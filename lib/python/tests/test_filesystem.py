@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pytest
+from bailo import Client
+
+fsspec = pytest.importorskip("fsspec")
+from bailo.helper.filesystem import BailoFileSystem
+
+URL = "https://example.com/api/v2/model/test_id/release/1.0.0"
+CONTENT = bytes(range(256)) * 64
+
+
+@pytest.fixture
+def fs(requests_mock):
+    requests_mock.get(
+        URL,
+        json={"release": {"files": [{"_id": "file_1", "name": "data.parquet", "size": len(CONTENT), "mime": "x"}]}},
+    )
+    return BailoFileSystem(client=Client("https://example.com"), block_size=1024, skip_instance_cache=True)
+
+
+def ranged(request, context):
+    start, end = (int(offset) for offset in request.headers["Range"][len("bytes=") :].split("-"))
+    context.status_code = 206
+    return CONTENT[start : end + 1]
+
+
+def test_ls(fs):
+    assert fs.ls("bailo://test_id/1.0.0", detail=False) == ["test_id/1.0.0/data.parquet"]
+    assert fs.info("test_id/1.0.0/data.parquet")["size"] == len(CONTENT)
+
+    with pytest.raises(FileNotFoundError):
+        fs.info("test_id/1.0.0/missing.parquet")
+
+
+def test_read_footer_with_ranges(fs, requests_mock):
+    download = requests_mock.get(f"{URL}/file/data.parquet/download", content=ranged)
+
+    with fs.open("bailo://test_id/1.0.0/data.parquet") as f:
+        f.seek(-8, 2)
+        footer = f.read()
+
+    assert footer == CONTENT[-8:]
+    assert download.call_count == 1
+    assert download.last_request.headers["Range"] == f"bytes={len(CONTENT) - 8}-{len(CONTENT) - 1}"
+
+
+def test_block_cache(fs, requests_mock):
+    download = requests_mock.get(f"{URL}/file/data.parquet/download", content=ranged)
+
+    with fs.open("test_id/1.0.0/data.parquet", cache_type="blockcache", cache_options={"maxblocks": 2}) as f:
+        f.seek(100)
+        assert f.read(10) == CONTENT[100:110]
+        f.seek(200)
+        assert f.read(10) == CONTENT[200:210]
+
+    assert download.call_count == 1
+
+
+def test_read_without_range_support(fs, requests_mock):
+    requests_mock.get(f"{URL}/file/data.parquet/download", content=CONTENT)
+
+    with fs.open("test_id/1.0.0/data.parquet") as f:
+        f.seek(3000)
+        assert f.read(10) == CONTENT[3000:3010]
+
+
+def test_read_only(fs):
+    with pytest.raises(NotImplementedError):
+        fs.open("test_id/1.0.0/new.bin", "wb")
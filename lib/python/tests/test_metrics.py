@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+
+import pytest
+from bailo.helper import metrics as metrics_module
+from bailo.helper.metrics import MetricStore, rank, summarise_runs
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "array"])
+def use_numpy(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(metrics_module, "numpy_available", request.param)
+    return request.param
+
+
+def test_metric_store_summaries(use_numpy):
+    store = MetricStore()
+    for step, loss in enumerate([4.0, 2.0, 3.0, 1.0]):
+        store.log({"loss": loss, "accuracy": step / 4})
+
+    assert len(store) == 4
+    assert store.keys() == ["loss", "accuracy"]
+    assert store.summarise("last") == {"loss": 1.0, "accuracy": 0.75}
+    assert store.summary("loss", "min") == 1.0
+    assert store.summary("loss", "max") == 4.0
+    assert store.summary("loss", "mean") == 2.5
+    assert list(store.steps("loss")) == [0, 1, 2, 3]
+
+    with pytest.raises(ValueError):
+        store.summary("loss", "median")
+
+
+def test_metric_store_iterates_as_logged(use_numpy):
+    store = MetricStore()
+    store.log({"loss": 1.0, "accuracy": 0.5})
+    store.log({"loss": 0.5}, step=10)
+
+    assert list(store) == [{"loss": 1.0, "accuracy": 0.5}, {"loss": 0.5}]
+
+
+def test_metric_store_non_numeric(use_numpy):
+    store = MetricStore()
+    store.log({"label": 1.0})
+    store.log({"label": "best"})
+
+    assert list(store.values("label")) == [1.0, "best"]
+    assert store.summary("label") == "best"
+    with pytest.raises(ValueError):
+        store.summary("label", "max")
+
+
+def test_metric_store_keeps_types(use_numpy):
+    store = MetricStore()
+    store.log({"epoch": 1, "loss": 0.5, "best": True})
+    store.log({"epoch": 2, "loss": 0.25, "best": False})
+
+    assert list(store) == [{"epoch": 1, "loss": 0.5, "best": True}, {"epoch": 2, "loss": 0.25, "best": False}]
+    assert type(store[0]["epoch"]) is int
+    assert type(store[1]["best"]) is bool
+    assert store.summary("epoch", "max") == 2
+    assert store.summary("best") is False
+
+    store.log({"epoch": 2**64})
+
+    assert list(store.values("epoch")) == [1, 2, 2**64]
+
+
+def test_metric_store_widens_numbers(use_numpy, tmp_path):
+    store = MetricStore(spill_dir=str(tmp_path), spill_size=2)
+    for accuracy in [True, 0, 2, 0.5]:
+        store.log({"accuracy": accuracy})
+
+    assert list(store.values("accuracy")) == [1.0, 0.0, 2.0, 0.5]
+    assert type(store[0]["accuracy"]) is float
+    assert store.summary("accuracy", "min") == 0.0
+    assert store.summary("accuracy", "max") == 2.0
+    assert store.summary("accuracy", "mean") == 0.875
+
+    # Narrower values are stored in the wider column
+    store.log({"accuracy": 1})
+    assert store[-1] == {"accuracy": 1.0}
+    assert store.summary("accuracy", "max") == 2.0
+
+
+def test_metric_store_without_numpy(monkeypatch):
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    try:
+        module = importlib.reload(metrics_module)
+        assert not module.numpy_available
+
+        store = module.MetricStore()
+        store.log({"loss": 1.0, "epoch": 1, "best": True})
+
+        assert list(store) == [{"loss": 1.0, "epoch": 1, "best": True}]
+    finally:
+        monkeypatch.undo()
+        importlib.reload(metrics_module)
+
+
+def test_metric_store_is_list_compatible(use_numpy):
+    store = MetricStore()
+    store.log({"loss": 1.0}, step=0)
+    store.log({"loss": 0.5}, step=0)
+    store.append({"accuracy": 0.9})
+
+    assert len(store) == 3
+    assert store[0] == {"loss": 1.0}
+    assert store[-1] == {"accuracy": 0.9}
+    assert store[:2] == [{"loss": 1.0}, {"loss": 0.5}]
+    assert store == [{"loss": 1.0}, {"loss": 0.5}, {"accuracy": 0.9}]
+    assert list(store.steps("loss")) == [0, 0]
+    with pytest.raises(IndexError):
+        store[3]
+
+
+def test_metric_store_spills_to_disk(use_numpy, tmp_path):
+    store = MetricStore(spill_dir=str(tmp_path), spill_size=10)
+    for step in range(25):
+        store.log({"loss": float(step), "step": step})
+
+    assert len(os.listdir(store.spill_dir)) == 4
+    assert list(store.values("loss")) == [float(step) for step in range(25)]
+    assert list(store.steps("loss")) == list(range(25))
+    assert store.summary("loss", "mean") == 12.0
+    assert store.summary("loss", "max") == 24.0
+    assert store[12] == {"loss": 12.0, "step": 12}
+
+    for step in range(25, 30):
+        store.log({"loss": float(step), "step": step})
+
+    assert store.summary("loss") == 29.0
+    assert store.summary("step") == 29
+    assert list(store)[-1] == {"loss": 29.0, "step": 29}
+
+    store.close()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_rank_runs(use_numpy):
+    stores = []
+    for losses in [[3.0, 2.0], [5.0, 1.0], [], [2.5, 2.5]]:
+        store = MetricStore()
+        for loss in losses:
+            store.log({"loss": loss})
+        stores.append(store)
+
+    scores = summarise_runs(stores, "loss", "min")
+
+    assert rank(scores, mode="min") == [1, 0, 3]
+    assert rank(scores, k=2, mode="min") == [1, 0]
+    assert rank(summarise_runs(stores, "loss", "mean"), k=1) == [1]
+    assert rank(summarise_runs(stores, "missing")) == []
+
+    with pytest.raises(ValueError):
+        rank(scores, mode="best")
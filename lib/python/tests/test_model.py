@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import os
+
 import pytest
 from bailo import Client, Experiment, Model, Datacard, ModelVisibility
-from bailo.core.exceptions import BailoException
+from bailo.core.exceptions import BailoException, SchemaValidationException
 from bailo.core.utils import NestedDict
 
 
@@ -16,6 +18,176 @@ def test_create_experiment_from_model(local_model):
     assert isinstance(experiment, Experiment)
 
 
+def test_update_model_card_validates_locally(local_model, requests_mock):
+    pytest.importorskip("jsonschema")
+    requests_mock.get(
+        "https://example.com/api/v2/schema/minimal-schema",
+        json={
+            "schema": {
+                "id": "minimal-schema",
+                "name": "test",
+                "description": "test",
+                "kind": "model",
+                "jsonSchema": {"type": "object", "properties": {"overview": {"type": "object"}}},
+            }
+        },
+    )
+    put = requests_mock.put("https://example.com/api/v2/model/test-id/model-cards", json={})
+    local_model.model_card_schema = "minimal-schema"
+
+    with pytest.raises(SchemaValidationException):
+        local_model.update_model_card(model_card={"overview": "invalid"}, validate=True)
+
+    assert not put.called
+
+
+def test_update_model_card_skips_unchanged(local_model, requests_mock):
+    card = {"overview": {"modelSummary": "test"}}
+    put = requests_mock.put(
+        "https://example.com/api/v2/model/test-id/model-cards",
+        json={"card": {"version": 1, "schemaId": "test", "metadata": card}},
+    )
+
+    assert local_model.update_model_card(model_card=card) == [{"op": "replace", "path": "", "value": card}]
+    assert put.call_count == 1
+
+    # Mutating the card in place is still picked up as a change
+    local_model.model_card["overview"]["modelSummary"] = "changed"
+    assert local_model.diff_card() == [{"op": "replace", "path": "/overview/modelSummary", "value": "changed"}]
+
+    local_model.model_card = {"overview": {"modelSummary": "test"}}
+    assert local_model.update_model_card() == []
+    assert put.call_count == 1
+
+    local_model.update_model_card(force=True)
+    assert put.call_count == 2
+
+
+def test_publish_experiment_summary(local_model, requests_mock):
+    put = requests_mock.put(
+        "https://example.com/api/v2/model/test-id/model-cards",
+        json={"card": {"version": 2, "schemaId": "test", "metadata": {}}},
+    )
+    local_model.model_card = {"overview": {}}
+
+    experiment = local_model.create_experiment()
+    experiment.start_run()
+    for accuracy in [0.5, 0.9, 0.7]:
+        experiment.log_metrics({"accuracy": accuracy})
+    experiment.log_dataset("test_dataset")
+    experiment.publish(mc_loc="performance.performanceMetrics", run_id=0, summary="max")
+
+    metrics = put.last_request.json()["metadata"]["performance"]["performanceMetrics"]
+    assert metrics == [{"dataset": "test_dataset", "datasetMetrics": [{"name": "accuracy", "value": 0.9}]}]
+
+
+def test_get_latest_release_single_request(local_model, requests_mock):
+    release_json = {"modelCardVersion": 1, "notes": "", "fileIds": [], "images": [], "minor": False, "draft": False}
+    releases = requests_mock.get(
+        "https://example.com/api/v2/model/test-id/releases",
+        json={"releases": [{**release_json, "semver": semver} for semver in ["1.0.0", "1.10.0", "1.2.0"]]},
+    )
+
+    assert str(local_model.get_latest_release().version) == "1.10.0"
+    assert releases.call_count == 1
+
+
+def test_experiment_run_lookup(local_model):
+    experiment = local_model.create_experiment()
+    for _ in range(3):
+        experiment.start_run()
+
+    assert experiment._get_run(2) is experiment.raw[2]
+
+    experiment.raw = experiment.raw[:1]
+    with pytest.raises(NameError):
+        experiment._get_run(2)
+
+
+def test_experiment_top_runs(local_model):
+    experiment = local_model.create_experiment()
+    for lr, accuracies in [(0.1, [0.5, 0.6]), (0.01, [0.7, 0.65]), ("0.01", [0.4, 0.8]), (0.001, [])]:
+        experiment.start_run()
+        experiment.log_params({"lr": lr})
+        for accuracy in accuracies:
+            experiment.log_metrics({"accuracy": accuracy})
+
+    assert [run["run"] for run in experiment.top_runs("accuracy", k=None)] == [2, 1, 0]
+    assert [run["run"] for run in experiment.top_runs("accuracy", k=2, summary="max")] == [2, 1]
+    assert [run["run"] for run in experiment.top_runs("accuracy", k=None, mode="min")] == [0, 1, 2]
+    assert [run["run"] for run in experiment.top_runs("accuracy", k=None, params={"lr": 0.01})] == [2, 1]
+    assert experiment.best_run("accuracy", summary="mean", params={"lr": lambda lr: float(lr) > 0.005})["run"] == 1
+
+    with pytest.raises(BailoException):
+        experiment.best_run("loss")
+
+
+def test_experiment_publish_best(local_model, requests_mock):
+    put = requests_mock.put(
+        "https://example.com/api/v2/model/test-id/model-cards",
+        json={"card": {"version": 2, "schemaId": "test", "metadata": {}}},
+    )
+    local_model.model_card = {"overview": {}}
+    experiment = local_model.create_experiment()
+    for accuracy in [0.5, 0.9, 0.7]:
+        experiment.start_run()
+        experiment.log_metrics({"accuracy": accuracy})
+
+    assert experiment.publish_best("accuracy", mc_loc="performance.performanceMetrics") == 1
+
+    metrics = put.last_request.json()["metadata"]["performance"]["performanceMetrics"]
+    assert metrics[0]["datasetMetrics"] == [{"name": "accuracy", "value": 0.9}]
+
+
+@pytest.fixture
+def mlflow_file_store(tmp_path, test_path, monkeypatch):
+    mlflow = pytest.importorskip("mlflow")
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    tracking_uri = (tmp_path / "mlruns").as_uri()
+    mlflow_client = mlflow.tracking.MlflowClient(tracking_uri=tracking_uri)
+    experiment_id = mlflow_client.create_experiment(name="file-store", artifact_location=(tmp_path / "art").as_uri())
+
+    for accuracy in [0.5, 0.7, 0.9]:
+        run = mlflow_client.create_run(experiment_id)
+        mlflow_client.log_metric(run.info.run_id, "accuracy", accuracy)
+        mlflow_client.log_artifact(run.info.run_id, str(test_path))
+        mlflow_client.set_terminated(run.info.run_id)
+
+    unfinished = mlflow_client.create_run(experiment_id)
+    mlflow_client.log_metric(unfinished.info.run_id, "accuracy", 1.0)
+
+    return tracking_uri, experiment_id
+
+
+def test_import_experiment_from_mlflow_file_store(local_model, mlflow_file_store, tmp_path):
+    tracking_uri, experiment_id = mlflow_file_store
+    experiment = local_model.create_experiment()
+    experiment.temp_dir = str(tmp_path / "runs")
+
+    experiment.from_mlflow(tracking_uri, experiment_id, filter_string="metrics.accuracy > 0.6", page_size=1)
+
+    assert sorted(run["metrics"].summary("accuracy") for run in experiment.raw) == [0.7, 0.9]
+    for run in experiment.raw:
+        assert run["artifact_uris"] == []
+        assert os.path.exists(os.path.join(run["artifacts"][0], "artifacts", "test.pth"))
+
+
+def test_import_experiment_from_mlflow_lazy(local_model, mlflow_file_store, tmp_path):
+    tracking_uri, experiment_id = mlflow_file_store
+    experiment = local_model.create_experiment()
+    experiment.temp_dir = str(tmp_path / "runs")
+
+    experiment.from_mlflow(tracking_uri, experiment_id, lazy=True)
+
+    assert len(experiment.raw) == 3
+    assert not os.path.exists(experiment.temp_dir)
+    run = experiment.raw[0]
+    assert run["artifacts"] == []
+
+    artifacts = experiment._download_mlflow_artifacts(run["artifact_uris"][0], run["run"])
+    assert os.path.exists(os.path.join(artifacts[0], "artifacts", "test.pth"))
+
+
 @pytest.mark.integration
 @pytest.mark.parametrize(
     ("name", "description", "team_id", "visibility"),
@@ -193,3 +365,14 @@ def test_publish_experiment_without_runs(standard_experiment):
 
     with pytest.raises(BailoException):
         standard_experiment.publish(mc_loc="performance.performanceMetrics", run_id=run_id)
+
+
+def test_update_model_card_never_retrieved(local_model, requests_mock):
+    put = requests_mock.put(
+        "https://example.com/api/v2/model/test-id/model-cards",
+        json={"card": {"version": 1, "schemaId": "test", "metadata": {}}},
+    )
+
+    # Without a card retrieved from Bailo there is nothing to compare against, so the card is always sent
+    local_model.update_model_card()
+    assert put.call_count == 1
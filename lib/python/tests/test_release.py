@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+import os
+import re
+import zipfile
+from io import BytesIO, RawIOBase
+
 import pytest
 from bailo import Client, Release
+from bailo.helper._archive import _ZipExtractor, _zip_stream
+from bailo.helper._compression import _is_compressible
+from bailo.helper._files import _MappedFile
 from bailo.core.exceptions import BailoException, ResponseException
 from semantic_version import Version
 
@@ -20,6 +28,83 @@ def test_release():
     assert isinstance(release, Release)
 
 
+def test_upload_all_updates_release_once(requests_mock, tmp_path):
+    upload = requests_mock.post(
+        "https://example.com/api/v2/model/test/files/upload/simple",
+        [{"json": {"file": {"id": f"file-{i}"}}} for i in range(3)],
+    )
+    put = requests_mock.put("https://example.com/api/v2/model/test/release/1.0.0", json={"release": {}})
+    paths = []
+    for i in range(3):
+        (tmp_path / f"test{i}.txt").write_text("test")
+        paths.append(str(tmp_path / f"test{i}.txt"))
+
+    release = Release(client=Client("https://example.com"), model_id="test", version="1.0.0")
+    file_ids = release.upload_all(paths, max_workers=3)
+
+    assert sorted(file_ids) == ["file-0", "file-1", "file-2"]
+    assert upload.call_count == 3
+    assert put.call_count == 1
+    assert release.files == file_ids
+
+
+def test_upload_all_deletes_uploads_on_failure(requests_mock, tmp_path):
+    upload = requests_mock.post(
+        "https://example.com/api/v2/model/test/files/upload/simple",
+        [
+            {"json": {"file": {"id": "file-0"}}},
+            {"status_code": 500, "json": {"error": {"message": "Upload failed"}}},
+            {"json": {"file": {"id": "file-2"}}},
+        ],
+    )
+    delete = requests_mock.delete(re.compile("https://example.com/api/v2/model/test/files/.*"), json={})
+    put = requests_mock.put("https://example.com/api/v2/model/test/release/1.0.0", json={"release": {}})
+    paths = []
+    for i in range(3):
+        (tmp_path / f"test{i}.txt").write_text("test")
+        paths.append(str(tmp_path / f"test{i}.txt"))
+
+    release = Release(client=Client("https://example.com"), model_id="test", version="1.0.0")
+    with pytest.raises(BailoException):
+        release.upload_all(paths, max_workers=1)
+
+    # Every upload that succeeded is deleted, whether or not it was still pending when the failure was seen
+    deleted = [request.path.rsplit("/", 1)[-1] for request in delete.request_history]
+    assert "file-0" in deleted
+    assert len(deleted) == upload.call_count - 1
+    assert put.call_count == 0
+    assert release.files == []
+
+
+def test_upload_all_directories(requests_mock, tmp_path):
+    requests_mock.post("https://example.com/api/v2/model/test/files/upload/simple", json={"file": {"id": "file-id"}})
+    put = requests_mock.put("https://example.com/api/v2/model/test/release/1.0.0", json={"release": {}})
+    (tmp_path / "weights").mkdir()
+    (tmp_path / "weights" / "model.pth").write_bytes(b"weights")
+    (tmp_path / "config.json").write_text("{}")
+
+    release = Release(client=Client("https://example.com"), model_id="test", version="1.0.0")
+    file_ids = release.upload_all([str(tmp_path / "weights"), str(tmp_path / "config.json")])
+
+    assert file_ids == ["file-id", "file-id"]
+    assert put.call_count == 1
+    assert put.last_request.json()["fileIds"] == ["file-id", "file-id"]
+
+
+def test_zip_stream(tmp_path):
+    (tmp_path / "nested" / "empty").mkdir(parents=True)
+    (tmp_path / "nested" / "data.bin").write_bytes(bytes(range(256)) * 1000)
+    (tmp_path / "config.json").write_text('{"test": true}')
+
+    chunks = list(_zip_stream(str(tmp_path), chunk_size=1024))
+
+    assert all(chunks)
+    with zipfile.ZipFile(BytesIO(b"".join(chunks))) as archive:
+        assert sorted(archive.namelist()) == ["config.json", "nested/", "nested/data.bin", "nested/empty/"]
+        assert archive.read("nested/data.bin") == bytes(range(256)) * 1000
+        assert archive.testzip() is None
+
+
 @pytest.mark.integration
 @pytest.mark.parametrize(
     ("version", "model_card_version", "notes", "files", "images", "minor", "draft"),
@@ -91,3 +176,287 @@ def create_two_release_with_same_semver(integration_client, example_model):
             model_card_version=1,
             notes="test",
         )
+
+
+def test_download_throttled_by_client(requests_mock, mocker, tmp_path):
+    sleep = mocker.patch("bailo.core.utils.time.sleep")
+    requests_mock.get(
+        "https://example.com/api/v2/model/test/release/1.0.0/file/weights.bin/download",
+        content=b"x" * 4096,
+        headers={"content-length": "4096"},
+    )
+    client = Client("https://example.com", bandwidth=1024)
+    release = Release(client=client, model_id="test", version="1.0.0")
+
+    release.download("weights.bin", path=str(tmp_path / "weights.bin"), chunk_size=1024)
+
+    assert (tmp_path / "weights.bin").read_bytes() == b"x" * 4096
+    assert sleep.call_count == 3
+
+
+def test_mapped_file(tmp_path):
+    path = tmp_path / "weights.bin"
+    path.write_bytes(b"abcdefghij")
+    sizes = []
+
+    body = _MappedFile(str(path), chunk_size=4, callback=sizes.append)
+    chunks = [bytes(chunk) for chunk in body]
+
+    assert len(body) == 10
+    assert chunks == [b"abcd", b"efgh", b"ij"]
+    assert sizes == [4, 4, 2]
+
+
+def test_upload_sends_mapped_file(requests_mock, tmp_path):
+    upload = requests_mock.post(
+        "https://example.com/api/v2/model/test/files/upload/simple", json={"file": {"id": "file-1"}}
+    )
+    requests_mock.put("https://example.com/api/v2/model/test/release/1.0.0", json={})
+    path = tmp_path / "weights.bin"
+    path.write_bytes(b"x" * 100)
+
+    release = Release(client=Client("https://example.com"), model_id="test", version="1.0.0")
+
+    assert release.upload(str(path)) == "file-1"
+    assert isinstance(upload.last_request.body, _MappedFile)
+    assert upload.last_request.headers["Content-Length"] == "100"
+
+
+def test_download_is_atomic(requests_mock, mocker, tmp_path):
+    fsync = mocker.spy(os, "fsync")
+    url = "https://example.com/api/v2/model/test/release/1.0.0/file/weights.bin/download"
+    requests_mock.get(url, content=b"x" * 8192, headers={"content-length": "8192"})
+    release = Release(client=Client("https://example.com"), model_id="test", version="1.0.0")
+    path = tmp_path / "weights.bin"
+
+    release.download("weights.bin", path=str(path), fsync="end")
+
+    assert path.read_bytes() == b"x" * 8192
+    assert not (tmp_path / "weights.bin.part").exists()
+    assert fsync.call_count == 2
+
+    # A body shorter than its content-length is never renamed into place
+    path.unlink()
+    requests_mock.get(url, content=b"x" * 4096, headers={"content-length": "8192"})
+
+    with pytest.raises(BailoException):
+        release.download("weights.bin", path=str(path), fsync="end")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_failure_leaves_no_file(requests_mock, mocker, tmp_path):
+    requests_mock.get(
+        "https://example.com/api/v2/model/test/release/1.0.0/file/weights.bin/download", content=b"x" * 4096
+    )
+    mocker.patch("bailo.helper.release._progress", return_value=mocker.Mock(side_effect=ConnectionError))
+    release = Release(client=Client("https://example.com"), model_id="test", version="1.0.0")
+    path = tmp_path / "weights.bin"
+
+    with pytest.raises(ConnectionError):
+        release.download("weights.bin", path=str(path))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_list_archive_and_extract_member(requests_mock, tmp_path):
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("model/weights.bin", os.urandom(4 * 1024 * 1024))
+        archive.writestr("model/config.json", b'{"layers": 12}' * 100, compress_type=zipfile.ZIP_DEFLATED)
+    content = buffer.getvalue()
+    sent = []
+
+    def ranged(request, context):
+        start, end = (int(offset) for offset in request.headers["Range"][len("bytes=") :].split("-"))
+        context.status_code = 206
+        sent.append(len(content[start : end + 1]))
+        return content[start : end + 1]
+
+    requests_mock.get(
+        "https://example.com/api/v2/model/test/release/1.0.0",
+        json={"release": {"files": [{"_id": "file-1", "name": "model.zip", "size": len(content)}]}},
+    )
+    requests_mock.get("https://example.com/api/v2/model/test/release/1.0.0/file/model.zip/download", content=ranged)
+    release = Release(client=Client("https://example.com"), model_id="test", version="1.0.0")
+
+    assert [info.filename for info in release.list_archive("model.zip")] == ["model/weights.bin", "model/config.json"]
+
+    path = release.extract_member("model.zip", "model/config.json", str(tmp_path / "config.json"))
+    with open(path, "rb") as f:
+        assert f.read() == b'{"layers": 12}' * 100
+    # Only the central directory and the member were transferred, not the 4 MiB of weights
+    assert sum(sent) < 64 * 1024
+
+    with pytest.raises(BailoException):
+        release.list_archive("missing.zip")
+
+
+def zip_bytes(files, unseekable=True):
+    buffer = BytesIO()
+    with zipfile.ZipFile(_Unseekable(buffer) if unseekable else buffer, "w") as archive:
+        for name, data in files.items():
+            info = zipfile.ZipInfo(name)
+            info.compress_type = zipfile.ZIP_DEFLATED if data else zipfile.ZIP_STORED
+            if name.endswith("/"):
+                archive.writestr(info, b"")
+            else:
+                with archive.open(info, "w") as f:
+                    f.write(data)
+    return buffer.getvalue()
+
+
+class _Unseekable(RawIOBase):
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        return self.buffer.write(b)
+
+
+@pytest.mark.parametrize("unseekable", [True, False])
+def test_zip_extractor(tmp_path, unseekable):
+    files = {"config/": b"", "config/model.json": b'{"a": 1}' * 1000, "weights.bin": os.urandom(100_000), "empty": b""}
+    content = zip_bytes(files, unseekable)
+
+    extractor = _ZipExtractor(str(tmp_path / "out"))
+    for offset in range(0, len(content), 7):
+        extractor.feed(content[offset : offset + 7])
+    extractor.close()
+
+    for name, data in files.items():
+        if not name.endswith("/"):
+            assert (tmp_path / "out" / name).read_bytes() == data
+    assert not list((tmp_path / "out").rglob("*.part"))
+
+
+def test_zip_extractor_rejects_traversal(tmp_path):
+    content = zip_bytes({"../escape.txt": b"data"})
+
+    with pytest.raises(BailoException):
+        _ZipExtractor(str(tmp_path / "out")).feed(content)
+
+    assert not (tmp_path / "escape.txt").exists()
+
+
+def test_zip_extractor_truncated(tmp_path):
+    content = zip_bytes({"weights.bin": os.urandom(10_000)})
+    extractor = _ZipExtractor(str(tmp_path / "out"))
+    extractor.feed(content[:5000])
+
+    with pytest.raises(BailoException):
+        extractor.close()
+    assert list((tmp_path / "out").iterdir()) == []
+
+
+def test_download_all_extract(requests_mock, tmp_path):
+    source = tmp_path / "source"
+    (source / "nested").mkdir(parents=True)
+    (source / "nested" / "a.txt").write_text("hello")
+    (source / "b.txt").write_text("world")
+    content = b"".join(_zip_stream(str(source)))
+
+    requests_mock.get(
+        "https://example.com/api/v2/model/test/release/1.0.0",
+        json={"release": {"files": [{"_id": "file-1", "name": "source.zip", "size": len(content)}]}},
+    )
+    requests_mock.get("https://example.com/api/v2/model/test/release/1.0.0/file/source.zip/download", content=content)
+    release = Release(client=Client("https://example.com"), model_id="test", version="1.0.0")
+
+    assert release.download_all(str(tmp_path / "out"), extract=True) == ["source.zip"]
+    assert (tmp_path / "out" / "source" / "nested" / "a.txt").read_text() == "hello"
+    assert (tmp_path / "out" / "source" / "b.txt").read_text() == "world"
+    assert not (tmp_path / "out" / "source.zip").exists()
+
+    # Fully extracted archives are skipped when resuming, but partly extracted ones are not
+    assert release.download_all(str(tmp_path / "out"), extract=True, resume=True) == []
+    (tmp_path / "out" / ".source.extracted").unlink()
+    assert release.download_all(str(tmp_path / "out"), extract=True, resume=True) == ["source.zip"]
+
+
+def mock_uploads(requests_mock):
+    uploads = {}
+
+    def upload(request, context):
+        body = request.body
+        uploads[request.qs["name"][0]] = body if isinstance(body, bytes) else b"".join(bytes(chunk) for chunk in body)
+        return {"file": {"id": f"file-{len(uploads)}"}}
+
+    requests_mock.post("https://example.com/api/v2/model/test/files/upload/simple", json=upload)
+    requests_mock.put("https://example.com/api/v2/model/test/release/1.0.0", json={"release": {}})
+    return uploads
+
+
+def test_is_compressible():
+    text = b"name,accuracy\n" + b"".join(b"run-%d,0.%d\n" % (i, i) for i in range(100000))
+    random = os.urandom(1024 * 1024)
+
+    assert _is_compressible(BytesIO(text), len(text))
+    assert not _is_compressible(BytesIO(random), len(random))
+    assert not _is_compressible(BytesIO(b""), 0)
+
+
+def test_upload_compressed_and_download(requests_mock, tmp_path):
+    pytest.importorskip("zstandard")
+    uploads = mock_uploads(requests_mock)
+    text = b"".join(b"run-%d,0.%d\n" % (i, i) for i in range(100000))
+    (tmp_path / "metrics.csv").write_bytes(text)
+    (tmp_path / "random.bin").write_bytes(os.urandom(1024 * 1024))
+
+    release = Release(client=Client("https://example.com"), model_id="test", version="1.0.0")
+    release.upload_all([str(tmp_path / "metrics.csv"), str(tmp_path / "random.bin")], compress=9)
+
+    # Data that looks already compressed is uploaded as it is
+    assert sorted(uploads) == ["metrics.csv.zst", "random.bin"]
+    assert len(uploads["metrics.csv.zst"]) < len(text) / 4
+
+    download = "https://example.com/api/v2/model/test/release/1.0.0/file/{}/download"
+    requests_mock.get(download.format("metrics.csv"), status_code=404, json={"error": {"message": "Not found"}})
+    requests_mock.get(download.format("metrics.csv.zst"), content=uploads["metrics.csv.zst"])
+
+    # Compressed files can be downloaded by their original name
+    release.download("metrics.csv", path=str(tmp_path / "downloaded.csv"), chunk_size=1024)
+    assert (tmp_path / "downloaded.csv").read_bytes() == text
+
+    release.download("metrics.csv.zst", path=str(tmp_path / "raw.csv.zst"), decompress=False)
+    assert (tmp_path / "raw.csv.zst").read_bytes() == uploads["metrics.csv.zst"]
+
+
+def test_download_only_falls_back_on_missing_files(requests_mock, tmp_path):
+    download = "https://example.com/api/v2/model/test/release/1.0.0/file/{}/download"
+    requests_mock.get(download.format("weights.bin"), status_code=403, json={"error": {"message": "Forbidden"}})
+    compressed = requests_mock.get(download.format("weights.bin.zst"), content=b"")
+
+    release = Release(client=Client("https://example.com"), model_id="test", version="1.0.0")
+    with pytest.raises(BailoException, match="Forbidden") as e:
+        release.download("weights.bin", path=str(tmp_path / "weights.bin"))
+
+    assert e.value.status_code == 403
+    assert compressed.call_count == 0
+
+
+def test_upload_compressed_directory_and_extract(requests_mock, tmp_path):
+    pytest.importorskip("zstandard")
+    uploads = mock_uploads(requests_mock)
+    (tmp_path / "weights" / "nested").mkdir(parents=True)
+    (tmp_path / "weights" / "nested" / "config.json").write_text('{"layers": 12}' * 1000)
+    (tmp_path / "weights" / "model.onnx").write_bytes(bytes(range(256)) * 1000)
+
+    release = Release(client=Client("https://example.com"), model_id="test", version="1.0.0")
+    release.upload(str(tmp_path / "weights"), compress=True)
+
+    content = uploads["weights.zip.zst"]
+    requests_mock.get(
+        "https://example.com/api/v2/model/test/release/1.0.0",
+        json={"release": {"files": [{"_id": "file-1", "name": "weights.zip.zst", "size": len(content)}]}},
+    )
+    requests_mock.get(
+        "https://example.com/api/v2/model/test/release/1.0.0/file/weights.zip.zst/download", content=content
+    )
+
+    assert release.download_all(str(tmp_path / "out"), extract=True) == ["weights.zip.zst"]
+    assert (tmp_path / "out" / "weights" / "nested" / "config.json").read_text() == '{"layers": 12}' * 1000
+    assert (tmp_path / "out" / "weights" / "model.onnx").read_bytes() == bytes(range(256)) * 1000
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from bailo import Client, Review, ReviewIndex
+
+
+def review_json(model_id="test_id", semver="1.0.0", role="mtr", updated_at="2024-01-01T00:00:00.000Z"):
+    return {
+        "modelId": model_id,
+        "semver": semver,
+        "kind": "release",
+        "role": role,
+        "responses": [],
+        "createdAt": "2024-01-01T00:00:00.000Z",
+        "updatedAt": updated_at,
+    }
+
+
+def test_review():
+    client = Client("https://example.com")
+
+    review = Review(client=client, model_id="test_id", role="mtr", kind="release", semver="1.0.0")
+
+    assert isinstance(review, Review)
+
+
+def test_list_reviews_deduplicates(requests_mock):
+    requests_mock.get(
+        "https://example.com/api/v2/reviews?modelId=test_id",
+        json={"reviews": [review_json(), review_json()]},
+    )
+    requests_mock.get(
+        "https://example.com/api/v2/reviews?modelId=other_id",
+        json={"reviews": [review_json(model_id="other_id", role="msro")]},
+    )
+
+    client = Client("https://example.com")
+    reviews = Review.list(client, model_ids=["test_id", "other_id", "test_id"])
+
+    assert len(reviews) == 2
+    assert requests_mock.call_count == 2
+
+
+def test_review_index_lookups(requests_mock):
+    requests_mock.get(
+        "https://example.com/api/v2/reviews",
+        json={
+            "reviews": [
+                review_json(),
+                review_json(role="msro"),
+                review_json(semver="2.0.0"),
+                review_json(model_id="other_id"),
+            ]
+        },
+    )
+
+    index = ReviewIndex(Client("https://example.com"))
+    index.refresh()
+
+    assert len(index) == 4
+    assert len(index.get(model_id="test_id")) == 3
+    assert len(index.get(model_id="test_id", semver="1.0.0")) == 2
+    assert len(index.get(model_id="test_id", semver="1.0.0", role="msro")) == 1
+    assert len(index.get(role="mtr")) == 3
+    assert index.get(model_id="missing_id") == []
+
+
+def test_review_index_refresh_returns_changes(requests_mock):
+    requests_mock.get(
+        "https://example.com/api/v2/reviews",
+        json={"reviews": [review_json(), review_json(semver="2.0.0")]},
+    )
+
+    index = ReviewIndex(Client("https://example.com"))
+    changes = index.refresh()
+    assert len(changes["added"]) == 2
+
+    requests_mock.get(
+        "https://example.com/api/v2/reviews",
+        json={"reviews": [review_json(updated_at="2024-02-01T00:00:00.000Z"), review_json(semver="3.0.0")]},
+    )
+    changes = index.refresh()
+
+    assert [str(review.semver) for review in changes["added"]] == ["3.0.0"]
+    assert [str(review.semver) for review in changes["updated"]] == ["1.0.0"]
+    assert [str(review.semver) for review in changes["removed"]] == ["2.0.0"]
+    assert index.get(model_id="test_id", semver="2.0.0") == []
+    assert index.get(model_id="test_id", semver="1.0.0")[0].updated_at == "2024-02-01T00:00:00.000Z"
@@ -4,8 +4,9 @@ import random
 import string
 
 import pytest
-from example_schemas import MINIMAL_JSON_SCHEMA
+from example_schemas import METRICS_JSON_SCHEMA, MINIMAL_JSON_SCHEMA
 from bailo import Client, Schema, SchemaKind
+from bailo.core.exceptions import SchemaValidationException
 
 
 def random_generator(N=10):
@@ -28,6 +29,76 @@ def test_schema():
     assert isinstance(schema, Schema)
 
 
+def test_validate_many():
+    pytest.importorskip("jsonschema")
+    schema = Schema(
+        client=Client("https://example.com"),
+        schema_id="metrics",
+        name="test",
+        description="test description",
+        kind=SchemaKind.MODEL,
+        json_schema=METRICS_JSON_SCHEMA,
+    )
+
+    errors = schema.validate_many(
+        [
+            {"overview": {"modelSummary": "summary"}},
+            {"overview": {"modelSummary": ""}},
+            {"overview": {"unknown": 1}, "performance": {"performanceMetrics": [{"dataset": 1}]}},
+        ]
+    )
+
+    assert errors[0] == []
+    assert len(errors[1]) == 1
+    assert errors[1][0].startswith("overview.modelSummary:")
+    assert len(errors[2]) == 2
+
+    with pytest.raises(SchemaValidationException):
+        schema.validate({"overview": {"modelSummary": ""}})
+
+
+def test_validate_metadata_caches_schema(requests_mock):
+    pytest.importorskip("jsonschema")
+    requests_mock.get(
+        "https://example.com/api/v2/schema/cached-schema",
+        json={
+            "schema": {
+                "id": "cached-schema",
+                "name": "test",
+                "description": "test",
+                "kind": "model",
+                "jsonSchema": MINIMAL_JSON_SCHEMA,
+            }
+        },
+    )
+    client = Client("https://example.com")
+
+    Schema.validate_metadata(client, "cached-schema", {"overview": {"modelOverview": "test"}})
+    with pytest.raises(SchemaValidationException):
+        Schema.validate_metadata(client, "cached-schema", {"overview": {"modelOverview": 1}})
+
+    assert requests_mock.call_count == 1
+
+
+def test_validator_follows_schema_content():
+    pytest.importorskip("jsonschema")
+    client = Client("https://example.com")
+    json_schema = {"type": "object", "properties": {"size": {"type": "string"}}}
+    schema = Schema(client, "changing-schema", "test", "test", SchemaKind.MODEL, json_schema)
+    schema.validate({"size": "large"})
+
+    # A schema with the same ID but different content is never given the old validator
+    changed = Schema(
+        client, "changing-schema", "test", "test", SchemaKind.MODEL, {"properties": {"size": {"type": "integer"}}}
+    )
+    changed.validate({"size": 1})
+    with pytest.raises(SchemaValidationException):
+        changed.validate({"size": "large"})
+
+    schema.json_schema["properties"]["size"]["type"] = "boolean"
+    schema.validate({"size": True})
+
+
 @pytest.mark.integration
 @pytest.mark.parametrize(
     ("name", "description", "kind", "json_schema"),
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+from bailo import Client
+from bailo.core.exceptions import BailoException, ResponseException
+from bailo.helper.sync import Mirror, Replicator
+
+
+@pytest.fixture
+def mirror_mocks(requests_mock):
+    files = [
+        {"_id": "file-1", "name": "weights.pth", "size": 7, "mime": "application/octet-stream"},
+        {"_id": "file-2", "name": "config.json", "size": 2, "mime": "application/json"},
+    ]
+    release = {
+        "modelId": "test-id",
+        "semver": "1.0.0",
+        "notes": "",
+        "minor": False,
+        "draft": False,
+        "modelCardVersion": 1,
+        "images": [],
+        "fileIds": ["file-1", "file-2"],
+    }
+    requests_mock.get(
+        "https://example.com/api/v2/model/test-id",
+        json={
+            "model": {
+                "id": "test-id",
+                "name": "test",
+                "description": "test",
+                "kind": "model",
+                "card": {"schemaId": "test-schema", "version": 1, "metadata": {"overview": {}}},
+            }
+        },
+    )
+    releases = requests_mock.get(
+        "https://example.com/api/v2/model/test-id/releases", json={"releases": [{**release, "files": files}]}
+    )
+    downloads = {
+        file["_id"]: requests_mock.get(
+            f"https://example.com/api/v2/model/test-id/file/{file['_id']}/download", content=content
+        )
+        for file, content in zip(files, [b"weights", b"{}"])
+    }
+    return releases, downloads, release, files
+
+
+def test_mirror_sync_is_incremental(mirror_mocks, tmp_path):
+    releases, downloads, release, files = mirror_mocks
+    mirror = Mirror(Client("https://example.com"), str(tmp_path))
+
+    plan = mirror.sync(["test-id"], dry_run=True)
+    assert [file["file_id"] for file in plan["download"]] == ["file-1", "file-2"]
+    assert plan["bytes"] == 9
+    assert not os.path.exists(tmp_path / "manifest.json")
+
+    mirror.sync(["test-id"])
+    with open(mirror.file_path("test-id", "file-1"), "rb") as f:
+        assert f.read() == b"weights"
+    with open(tmp_path / "manifest.json") as f:
+        manifest = json.load(f)
+    assert manifest["models"]["test-id"]["card"]["schemaId"] == "test-schema"
+    assert manifest["models"]["test-id"]["releases"]["1.0.0"]["fileIds"] == ["file-1", "file-2"]
+
+    # A fresh mirror over the same directory picks up the manifest and transfers nothing
+    plan = Mirror(Client("https://example.com"), str(tmp_path)).sync(["test-id"])
+    assert plan["download"] == []
+    assert downloads["file-1"].call_count == 1
+
+    # Local corruption is only spotted when verifying hashes
+    with open(mirror.file_path("test-id", "file-1"), "wb") as f:
+        f.write(b"corrupt")
+    assert mirror.plan(["test-id"])["download"] == []
+    assert [file["file_id"] for file in mirror.plan(["test-id"], verify=True)["download"]] == ["file-1"]
+
+
+def test_mirror_sync_rejects_truncated_files(mirror_mocks, requests_mock, tmp_path):
+    requests_mock.get(
+        "https://example.com/api/v2/model/test-id/file/file-1/download",
+        content=b"weig",
+        headers={"content-length": "7"},
+    )
+    mirror = Mirror(Client("https://example.com"), str(tmp_path))
+
+    with pytest.raises(BailoException):
+        mirror.sync(["test-id"])
+
+    path = tmp_path / "test-id" / "files" / "file-1" / "weights.pth"
+    assert not path.exists()
+    assert not (tmp_path / "test-id" / "files" / "file-1" / "weights.pth.part").exists()
+
+
+def test_mirror_sync_prunes_removed_files(mirror_mocks, requests_mock, tmp_path):
+    releases, downloads, release, files = mirror_mocks
+    mirror = Mirror(Client("https://example.com"), str(tmp_path))
+    mirror.sync(["test-id"])
+    removed_path = mirror.file_path("test-id", "file-2")
+
+    requests_mock.get(
+        "https://example.com/api/v2/model/test-id/releases",
+        json={"releases": [{**release, "fileIds": ["file-1"], "files": files[:1]}]},
+    )
+    plan = mirror.sync(["test-id"])
+
+    assert [file["file_id"] for file in plan["remove"]] == ["file-2"]
+    assert not os.path.exists(removed_path)
+    assert list(mirror.manifest["models"]["test-id"]["files"]) == ["file-1"]
+
+
+def test_replicator_resumes_from_checkpoint(mirror_mocks, requests_mock, tmp_path):
+    Mirror(Client("https://example.com"), str(tmp_path)).sync(["test-id"])
+
+    post_model = requests_mock.post("https://dest.com/api/v2/models", json={"model": {"id": "new-id"}})
+    from_schema = requests_mock.post("https://dest.com/api/v2/model/new-id/setup/from-schema", json={})
+    put_card = requests_mock.put(
+        "https://dest.com/api/v2/model/new-id/model-cards", json={"card": {"version": 1, "schemaId": "test-schema"}}
+    )
+    upload = requests_mock.post(
+        "https://dest.com/api/v2/model/new-id/files/upload/simple",
+        [{"json": {"file": {"id": "new-file-1"}}}, {"json": {"file": {"id": "new-file-2"}}}],
+    )
+    post_release = requests_mock.post(
+        "https://dest.com/api/v2/model/new-id/releases", [{"status_code": 500}, {"json": {"release": {}}}]
+    )
+
+    with pytest.raises(ResponseException):
+        Replicator(Client("https://dest.com"), str(tmp_path), rate=100).replicate()
+
+    assert upload.call_count == 2
+    assert os.path.exists(tmp_path / "replication-dest.com.json")
+
+    assert Replicator(Client("https://dest.com"), str(tmp_path)).replicate() == {"test-id": "new-id"}
+
+    assert post_model.call_count == 1
+    assert from_schema.call_count == 1
+    assert put_card.last_request.json() == {"metadata": {"overview": {}}}
+    assert upload.call_count == 2
+    assert post_release.call_count == 2
+    release = post_release.last_request.json()
+    assert release["semver"] == "1.0.0"
+    assert sorted(release["fileIds"]) == ["new-file-1", "new-file-2"]
+    assert release["modelCardVersion"] == 1
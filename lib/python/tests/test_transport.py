@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import shutil
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pytest
+from bailo import Agent, TokenAgent
+from bailo.core.exceptions import BailoException
+from bailo.core.transport import RequestsTransport
+
+httpx = pytest.importorskip("httpx")
+from bailo.core.transport import HttpxTransport
+
+
+@pytest.fixture
+def sent(mocker):
+    requests = []
+
+    def handler(request):
+        request.read()
+        requests.append(request)
+        if request.url.path == "/missing":
+            return httpx.Response(404, json={"error": {"message": "Not found"}})
+        return httpx.Response(200, json={"ok": True}, headers={"content-length": "11"})
+
+    mocker.patch.object(HttpxTransport, "_client", return_value=httpx.Client(transport=httpx.MockTransport(handler)))
+    return requests
+
+
+def test_httpx_transport_matches_requests_arguments(sent):
+    agent = TokenAgent(access_key="access", secret_key="secret", transport=HttpxTransport())
+
+    res = agent.get("https://example.com/api/v2/reviews", params={"active": True, "modelId": None})
+
+    assert res.json() == {"ok": True}
+    assert str(sent[0].url) == "https://example.com/api/v2/reviews?active=True"
+    assert sent[0].headers["authorization"] == "Basic " + base64.b64encode(b"access:secret").decode()
+
+
+def test_httpx_transport_streams(sent):
+    agent = Agent(transport=HttpxTransport())
+
+    res = agent.post("https://example.com/upload", data=BytesIO(b"x" * 100), stream=True)
+
+    assert b"".join(res.iter_content(4)) == b'{"ok":true}'
+    assert sent[0].headers["content-length"] == "100"
+    assert sent[0].content == b"x" * 100
+
+
+def test_httpx_transport_releases_transfers(sent):
+    agent = Agent(transport=HttpxTransport(), max_transfers=1)
+
+    responses = []
+
+    def transfer_twice():
+        for _ in range(2):
+            responses.append(agent.post("https://example.com/upload", data=b"x", stream=True).json())
+
+    # A transfer slot held after the body was read would leave the second transfer waiting forever
+    thread = threading.Thread(target=transfer_twice, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert responses == [{"ok": True}, {"ok": True}]
+
+
+def test_httpx_transport_errors(sent):
+    agent = Agent(transport=HttpxTransport())
+
+    with pytest.raises(BailoException, match="Not found"):
+        agent.get("https://example.com/missing")
+
+
+# Per-request delay of the stand-in server, roughly a round trip to a remote Bailo instance
+BENCHMARK_LATENCY = 0.02
+BENCHMARK_REQUESTS = 400
+BENCHMARK_THREADS = 32
+
+
+@pytest.fixture
+def h2_server(tmp_path):
+    pytest.importorskip("hypercorn")
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is not installed")
+
+    crt, key = tmp_path / "server.crt", tmp_path / "server.key"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1", "-nodes"]
+        + ["-keyout", key, "-out", crt, "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost"],
+        check=True,
+        capture_output=True,
+    )
+
+    versions = []
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        versions.append(scope["http_version"])
+        await asyncio.sleep(BENCHMARK_LATENCY)
+        body = b'{"model": {"id": "test-id"}}'
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        port = sock.getsockname()[1]
+
+    config = Config()
+    config.bind = [f"localhost:{port}"]
+    config.certfile, config.keyfile = str(crt), str(key)
+    config.alpn_protocols = ["h2", "http/1.1"]
+
+    loop = asyncio.new_event_loop()
+    stop = asyncio.Event()
+    thread = threading.Thread(
+        target=loop.run_until_complete, args=(serve(app, config, shutdown_trigger=stop.wait),), daemon=True
+    )
+    thread.start()
+    for _ in range(100):
+        try:
+            socket.create_connection(("localhost", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+
+    yield f"https://localhost:{port}", crt, versions
+
+    loop.call_soon_threadsafe(stop.set)
+    thread.join(timeout=5)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("transport", [RequestsTransport, HttpxTransport], ids=["http1.1", "http2"])
+def test_transport_benchmark(h2_server, transport):
+    """Many small concurrent requests, as made by the release and file helpers.
+
+    Run with ``pytest -m benchmark -s`` to see the timings.
+    """
+    url, ca, versions = h2_server
+    agent = Agent(verify=str(ca), transport=transport())
+
+    def get(_):
+        return agent.get(f"{url}/api/v2/model/test-id").json()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(BENCHMARK_THREADS) as pool:
+        results = list(pool.map(get, range(BENCHMARK_REQUESTS)))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"\n{transport.__name__}: {BENCHMARK_REQUESTS} requests from {BENCHMARK_THREADS} threads in {elapsed:.2f}s "
+        f"({BENCHMARK_REQUESTS / elapsed:.0f} req/s, HTTP/{', '.join(sorted(set(versions)))})"
+    )
+    assert results == [{"model": {"id": "test-id"}}] * BENCHMARK_REQUESTS
+    assert set(versions) == ({"2"} if transport is HttpxTransport else {"1.1"})
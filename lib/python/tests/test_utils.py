@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import pickle
+import time
+
+import pytest
+from bailo.core.utils import NestedDict, Throttle, TokenBucket, compile_path, json_diff
+
+
+def test_json_diff_unchanged():
+    card = {"overview": {"tags": ["a", "b"], "summary": "test"}}
+
+    assert json_diff(card, {"overview": {"tags": ["a", "b"], "summary": "test"}}) == []
+
+
+def test_json_diff_nested_changes():
+    old = {"overview": {"tags": ["a", "b"], "summary": "test", "old": 1}, "metrics": [{"value": 1}, {"value": 2}]}
+    new = {
+        "overview": {"tags": ["a", "b", "c"], "summary": "test", "new/key": 2},
+        "metrics": [{"value": 1}, {"value": 3}],
+    }
+
+    assert json_diff(old, new) == [
+        {"op": "replace", "path": "/overview/tags", "value": ["a", "b", "c"]},
+        {"op": "remove", "path": "/overview/old"},
+        {"op": "add", "path": "/overview/new~1key", "value": 2},
+        {"op": "replace", "path": "/metrics/1/value", "value": 3},
+    ]
+
+
+def test_json_diff_type_change():
+    assert json_diff({"value": 1}, {"value": True}) == [{"op": "replace", "path": "/value", "value": True}]
+    assert json_diff(None, {"value": 1}) == [{"op": "replace", "path": "", "value": {"value": 1}}]
+
+
+def test_compile_path():
+    assert compile_path("performance.performanceMetrics") == ("performance", "performanceMetrics")
+    assert compile_path("performance.performanceMetrics") is compile_path("performance.performanceMetrics")
+
+
+def test_nested_dict_get_and_set():
+    card = NestedDict({"overview": {"tags": ["a"], "summary": "test"}})
+
+    assert card[("overview", "tags", 0)] == "a"
+    assert card.get(("overview", "missing")) is None
+    assert card.get(("overview", "tags", 5), "default") == "default"
+    assert card.get("overview") == {"tags": ["a"], "summary": "test"}
+
+    card[("performance", "metrics")] = [1]
+    card[("overview", "tags", 0)] = "b"
+
+    assert card == {"overview": {"tags": ["b"], "summary": "test"}, "performance": {"metrics": [1]}}
+
+
+def test_nested_dict_copy_on_write():
+    original = {"overview": {"summary": "test"}, "performance": {"metrics": []}, "untouched": {"large": [1, 2, 3]}}
+    card = NestedDict(original)
+
+    card[("overview", "summary")] = "changed"
+    overview = card["overview"]
+    card[("overview", "name")] = "name"
+
+    assert original == {
+        "overview": {"summary": "test"},
+        "performance": {"metrics": []},
+        "untouched": {"large": [1, 2, 3]},
+    }
+    assert card["overview"] is overview
+    assert card["untouched"] is original["untouched"]
+    assert card["performance"] is original["performance"]
+
+
+def test_nested_dict_copies_replaced_containers():
+    card = NestedDict({"overview": {"summary": "test"}})
+    card[("overview", "summary")] = "changed"
+
+    # A container set in place of a copied one belongs to the caller, and is copied again before being written to
+    replacement = {"summary": "replacement"}
+    card[("overview",)] = replacement
+    card[("overview", "summary")] = "changed"
+
+    assert replacement == {"summary": "replacement"}
+    assert card == {"overview": {"summary": "changed"}}
+    assert list(card._owned) == [("overview",)]
+
+    replacement = {"summary": "replacement"}
+    card["overview"] = replacement
+    card.set_many({("overview", "summary"): "changed"})
+
+    assert replacement == {"summary": "replacement"}
+
+
+def test_nested_dict_pickles():
+    card = NestedDict({"overview": {"summary": "test"}})
+    card[("overview", "summary")] = "changed"
+
+    restored = pickle.loads(pickle.dumps(card))
+    restored[("overview", "name")] = "name"
+
+    assert isinstance(restored, NestedDict)
+    assert restored == {"overview": {"summary": "changed", "name": "name"}}
+    assert card == {"overview": {"summary": "changed"}}
+
+
+def test_nested_dict_set_many():
+    original = {"overview": {"summary": "test"}}
+    card = NestedDict(original)
+
+    card.set_many(
+        {
+            ("overview", "summary"): "changed",
+            "overview.tags": ["a"],
+            ("performance", "metrics", "accuracy"): 0.9,
+            ("performance", "metrics", "loss"): 0.1,
+            ("performance", "dataset"): "test",
+        }
+    )
+
+    assert original == {"overview": {"summary": "test"}}
+    assert card == {
+        "overview": {"summary": "changed", "tags": ["a"]},
+        "performance": {"metrics": {"accuracy": 0.9, "loss": 0.1}, "dataset": "test"},
+    }
+
+    card.set_many(
+        {
+            ("performance", "metrics", "accuracy"): 1.0,
+            ("performance", "metrics"): {},
+            ("performance", "metrics", "f1"): 0.5,
+        }
+    )
+
+    assert card["performance"] == {"metrics": {"f1": 0.5}, "dataset": "test"}
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, capacity=1)
+
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    assert time.monotonic() - start >= 0.05
+
+
+def test_throttle_limit_and_runtime_change(mocker):
+    sleep = mocker.patch("bailo.core.utils.time.sleep")
+    parent = Throttle(rate=1000)
+    throttle = Throttle(parent=parent)
+
+    assert throttle.limit == 1000
+    throttle.consume(3000)
+    assert sleep.call_args[0][0] == pytest.approx(2, abs=0.1)
+
+    throttle.rate = 500
+    parent.rate = None
+    assert throttle.limit == 500
+    sleep.reset_mock()
+    throttle.consume(100)
+    sleep.assert_not_called()